@@ -8,4 +8,17 @@ class BaseController:
     def __init__(self):
         self.app_settings = get_settings()
 
+    @property
+    def uses_shared_collection(self) -> bool:
+        """True when all files share VECTORDB_SHARED_COLLECTION instead of a collection each."""
+        return bool(self.app_settings.VECTORDB_SHARED_COLLECTION)
+
+    def get_collection_name(self, file_name: str) -> str:
+        """Returns the vector DB collection holding the chunks of an uploaded file."""
+        return self.app_settings.VECTORDB_SHARED_COLLECTION or os.path.splitext(file_name)[0]
+
+    def get_source_filter(self, file_name: str):
+        """Returns the metadata filter selecting a file's chunks in its collection, or None if the collection holds only that file."""
+        return {"source": file_name} if self.uses_shared_collection else None
+
         
@@ -1,25 +1,182 @@
 import os
+import re
 import json
+import asyncio
+import bisect
 import logging
+from functools import lru_cache
 from .BaseController import BaseController
-from langchain_text_splitters import RecursiveCharacterTextSplitter
-import nltk
-from nltk.tokenize import sent_tokenize, word_tokenize
 from models.enums.ChunkingEnum import ChunkingEnum
+from helpers.chunk_file import ChunkFile, write_chunk_file
+from helpers.metrics import time_stage
+from helpers.text_tokenizers import get_sentence_tokenizer, sent_tokenize, word_tokenize
+from helpers.executors import run_in_pool
+from models.enums.PipelineStageEnum import PipelineStageEnum
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Separators RecursiveCharacterTextSplitter tries, in order
+RECURSIVE_SEPARATORS = ["\n\n", "\n", " ", ""]
+
+# Characters of context on each side of a candidate cut when checking it is a sentence break
+SENTENCE_CUT_WINDOW = 1000
+
+# Characters searched for a sentence cut after each target offset
+SENTENCE_CUT_SEARCH_CHARS = 20000
+
+# Whitespace where sentence cuts are tried, line breaks first
+LINE_BREAK_PATTERN = re.compile(r"\s*\n\s*")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def recursive_chunking(text: str, chunk_size: int, chunk_overlap: int) -> list:
+    """
+    Chunks text using RecursiveCharacterTextSplitter from LangChain.
+    Kept at module level so pieces of a document can be chunked in worker processes.
+
+    Args:
+        text (str): Input text.
+        chunk_size (int): Desired chunk size.
+        chunk_overlap (int): Overlap between chunks.
+
+    Returns:
+        list: List of chunked text segments.
+    """
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    text_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        is_separator_regex=False,
+    )
+    documents = text_splitter.create_documents([text])
+    chunked_texts = [doc.page_content for doc in documents]
+    return chunked_texts
+
+
+def group_sentences(sentences: list, chunk_size: int) -> list:
+    """
+    Groups sentences into chunks of at least `chunk_size` characters (the last one may be shorter).
+
+    Returns:
+        list: List of chunked text segments.
+    """
+    chunks = []
+    temp_chunk = []
+    char_count = 0
+
+    for sentence in sentences:
+        temp_chunk.append(sentence)
+        char_count += len(sentence)
+        if char_count >= chunk_size:
+            chunks.append(" ".join(temp_chunk))
+            temp_chunk = []
+            char_count = 0
+
+    if temp_chunk:
+        chunks.append(" ".join(temp_chunk))
+
+    return chunks
+
+
+def group_words(words: list, chunk_size: int) -> list:
+    """Groups words into chunks of `chunk_size` words."""
+    return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
+
+
+def _cuts_near_targets(candidates: list, text_length: int, n_pieces: int) -> list:
+    """Picks, for each evenly spaced target offset, the first candidate cut at or after it."""
+    cuts = []
+    for i in range(1, n_pieces):
+        index = bisect.bisect_left(candidates, text_length * i // n_pieces)
+        if index < len(candidates) and (not cuts or candidates[index] > cuts[-1]):
+            cuts.append(candidates[index])
+    return cuts
+
+
+def recursive_cut_points(text: str, chunk_size: int, n_pieces: int) -> list:
+    """
+    Offsets where the text can be cut so that recursively chunking each piece gives the
+    chunks of the whole text.
+
+    The splitter splits the text on the first separator found in it and merges the splits
+    with overlap. A split of at least `chunk_size` characters ends the merge and is chunked
+    on its own, so no overlap carries across its start: those starts are the safe cuts.
+    """
+    separator = next((separator for separator in RECURSIVE_SEPARATORS if separator and separator in text), "")
+    if not separator:
+        return []
+
+    # The separator is kept at the start of the split that follows it
+    starts = [match.start() for match in re.finditer(re.escape(separator), text)]
+    candidates = [start for start, end in zip(starts, starts[1:] + [len(text)]) if start > 0 and end - start >= chunk_size]
+    return _cuts_near_targets(candidates, len(text), n_pieces)
+
+
+def is_sentence_break(text: str, start: int, end: int, tokenizer) -> bool:
+    """
+    Whether the whitespace `text[start:end]` separates two sentences of the text.
+
+    Punkt decides each sentence break from the few tokens around it, so the sentences of a
+    window around the whitespace break there exactly when those of the whole text do.
+    """
+    window_start = max(0, start - SENTENCE_CUT_WINDOW)
+    window = text[window_start:end + SENTENCE_CUT_WINDOW]
+    spans = list(tokenizer.span_tokenize(window))
+    return any(previous_end == start - window_start and next_start == end - window_start
+               for (_, previous_end), (next_start, _) in zip(spans, spans[1:]))
+
+
+def sentence_cut_points(text: str, n_pieces: int, language: str = "english") -> list:
+    """
+    Offsets where the text can be cut so that tokenizing each piece into sentences or words
+    gives the sentences or words of the whole text: the starts of sentences that follow a
+    sentence break. Breaks at line ends are preferred, as paragraphs end there.
+    """
+    tokenizer = get_sentence_tokenizer(language)
+    cuts = []
+    for i in range(1, n_pieces):
+        target = len(text) * i // n_pieces
+        if cuts and cuts[-1] >= target:
+            continue
+        for pattern in (LINE_BREAK_PATTERN, WHITESPACE_PATTERN):
+            matches = pattern.finditer(text, target, target + SENTENCE_CUT_SEARCH_CHARS)
+            cut = next((match.end() for match in matches
+                        if match.end() < len(text) and is_sentence_break(text, match.start(), match.end(), tokenizer)), None)
+            if cut is not None:
+                cuts.append(cut)
+                break
+    return cuts
+
+
+def split_text_for_chunking(text: str, method: str, chunk_size: int, n_pieces: int) -> list:
+    """
+    Splits the text into up to `n_pieces` pieces of similar size, cut only where chunking
+    the pieces separately gives exactly the chunks of the whole text. Returns the whole
+    text as one piece when no such cut exists.
+    """
+    if n_pieces < 2:
+        return [text]
+    if method == ChunkingEnum.RECURSIVE.value:
+        cuts = recursive_cut_points(text, chunk_size, n_pieces)
+    else:
+        cuts = sentence_cut_points(text, n_pieces)
+    bounds = [0] + cuts + [len(text)]
+    return [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
 class ChunkController(BaseController):
-    
-    def __init__(self):
-        super().__init__()
-        nltk.download('punkt_tab')
 
+    @staticmethod
+    def get_chunk_file_name(file_name: str) -> str:
+        """Returns the name of the chunk file for an uploaded file."""
+        return os.path.splitext(file_name)[0] + "_chunks.bin"
 
     async def save_chunks(self, chunks: list[str], file_directory: str , file_name : str):
         """
-        Saves the chunked text into a JSON file for later retrieval.
+        Saves the chunked text into a binary chunk file for later retrieval.
 
         Args:
             chunks (list[str]): List of chunked text segments.
@@ -29,130 +186,105 @@ class ChunkController(BaseController):
         # Ensure the directory exists
         os.makedirs(file_directory, exist_ok=True)
 
-        # Define the file path (store as a JSON file)
+        # Define the file path (store as a binary chunk file)
         chunk_file_path = os.path.join(file_directory, file_name)
 
-        # Save chunks as a JSON file
-        with open(chunk_file_path, "w", encoding="utf-8") as f:
-            json.dump(chunks, f, ensure_ascii=False, indent=4)
+        # Save chunks as length-prefixed UTF-8 with an offsets table
+        write_chunk_file(chunk_file_path, chunks)
 
         return True
         
-    async def load_chunks(self, file_directory: str , file_name : str) -> list[str]:
+    async def load_chunks(self, file_directory: str , file_name : str):
         """
-        Loads chunked text from a previously saved JSON file.
+        Loads chunked text from a previously saved chunk file.
+
+        Binary chunk files are memory-mapped and decoded lazily. If only a legacy
+        `_chunks.json` file exists, it is loaded instead.
 
         Args:
             file_directory (str): Directory where the chunk file is stored.
             file_name (str): Original file name to retrieve its chunks.
 
         Returns:
-            list[str]: List of chunked text segments.
+            Sequence[str]: The chunked text segments.
+
+        Raises:
+            FileNotFoundError: If no chunk file exists.
         """
         # Define the file path
         chunk_file_path = os.path.join(file_directory, file_name)
-        print(chunk_file_path)
-        # Check if the file exists
-        if not os.path.exists(chunk_file_path):
-            return {"status": "error", "message": "Chunk file chunks.json not found"}
+        legacy_chunk_file_path = os.path.splitext(chunk_file_path)[0] + ".json"
 
-        # Load chunks from JSON file
-        with open(chunk_file_path, "r", encoding="utf-8") as f:
-            chunks = json.load(f)
+        if os.path.exists(chunk_file_path) and not chunk_file_path.endswith(".json"):
+            return ChunkFile(chunk_file_path)
 
-        return chunks  # Returning list of strings
+        # Fall back to chunk files saved as JSON before the binary format
+        if os.path.exists(legacy_chunk_file_path):
+            logger.info(f"Loading legacy JSON chunk file {legacy_chunk_file_path}")
+            with open(legacy_chunk_file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        raise FileNotFoundError(f"Chunk file {chunk_file_path} not found")
 
     async def chunk_text(
         self, 
         text: str, 
         chunk_size: int = 100, 
         chunk_overlap: int = 20, 
-        method: str = "recursive"
+        method: str = "recursive",
+        parallel: bool = None
     ):
         """
         Main function to chunk text using different methods.
 
+        Long texts are cut into pieces chunked in parallel on the CPU worker pool. The
+        cuts only fall where serial chunking has no state to carry over: recursive pieces
+        start at splits where the splitter starts over, sentence and word pieces at
+        sentence starts, with sentences grouped over the whole text. The chunks are
+        identical either way.
+
         Args:
             text (str): The input text to be chunked.
             chunk_size (int): Size of each chunk.
             chunk_overlap (int): Overlap between chunks (for applicable methods).
             method (str): Chunking method ('recursive', 'fixed', 'sentence', 'word').
+            parallel (bool, optional): Chunk in parallel; by default, texts of at least
+                CHUNKING_PARALLEL_MIN_CHARS characters are.
 
         Returns:
             list: List of chunked text segments.
         """
-        if method == ChunkingEnum.RECURSIVE.value:
-            return self.__recursive_chunking(text, chunk_size, chunk_overlap)
-        elif method == ChunkingEnum.SENTENCE.value:
-            return self.__sentence_chunking(text, chunk_size)
-        elif method == ChunkingEnum.WORD.value:
-            return self.__word_chunking(text, chunk_size)
-        else:
-            raise ValueError(f"Invalid chunking method '{method}'. Choose from ['recursive', 'fixed', 'sentence', 'word'].")
+        with time_stage(PipelineStageEnum.CHUNKING):
+            if method not in (ChunkingEnum.RECURSIVE.value, ChunkingEnum.SENTENCE.value, ChunkingEnum.WORD.value):
+                raise ValueError(f"Invalid chunking method '{method}'. Choose from ['recursive', 'fixed', 'sentence', 'word'].")
 
+            if parallel is None:
+                min_chars = self.app_settings.CHUNKING_PARALLEL_MIN_CHARS
+                parallel = min_chars > 0 and len(text) >= min_chars
+            pieces = [text]
+            if parallel:
+                pieces = split_text_for_chunking(text, method, chunk_size, n_pieces=self.app_settings.CPU_POOL_WORKERS)
 
+            if method == ChunkingEnum.RECURSIVE.value:
+                piece_chunks = await self.__map_pieces(recursive_chunking, pieces, chunk_size, chunk_overlap)
+                return [chunk for chunks in piece_chunks for chunk in chunks]
+            elif method == ChunkingEnum.SENTENCE.value:
+                piece_sentences = await self.__map_pieces(sent_tokenize, pieces)
+                return group_sentences([sentence for sentences in piece_sentences for sentence in sentences], chunk_size)
+            else:
+                piece_words = await self.__map_pieces(word_tokenize, pieces)
+                return group_words([word for words in piece_words for word in words], chunk_size)
 
-    def __recursive_chunking(self, text: str, chunk_size: int, chunk_overlap: int):
-        """
-        Chunks text using RecursiveCharacterTextSplitter from LangChain.
+    @staticmethod
+    async def __map_pieces(func, pieces: list, *args) -> list:
+        """Applies `func` to every piece, in worker processes when there are several."""
+        if len(pieces) == 1:
+            return [func(pieces[0], *args)]
+        logger.info(f"Chunking {len(pieces)} pieces in parallel")
+        return await asyncio.gather(*[run_in_pool(WorkerPoolEnum.CPU, func, piece, *args) for piece in pieces])
 
-        Args:
-            text (str): Input text.
-            chunk_size (int): Desired chunk size.
-            chunk_overlap (int): Overlap between chunks.
-
-        Returns:
-            list: List of chunked text segments.
-        """
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            is_separator_regex=False,
-        )
-        documents = text_splitter.create_documents([text])
-        chunked_texts = [doc.page_content for doc in documents]
-        return chunked_texts
-
-    def __sentence_chunking(self, text: str, chunk_size: int):
-        """
-        Splits text into sentences and groups them into chunks of specified size.
-
-        Args:
-            text (str): Input text.
-            chunk_size (int): Desired chunk size in characters.
 
-        Returns:
-            list: List of chunked text segments.
-        """
-        sentences = sent_tokenize(text)
-        chunks = []
-        temp_chunk = []
-        char_count = 0
-
-        for sentence in sentences:
-            temp_chunk.append(sentence)
-            char_count += len(sentence)
-            if char_count >= chunk_size:
-                chunks.append(" ".join(temp_chunk))
-                temp_chunk = []
-                char_count = 0
-        
-        if temp_chunk:
-            chunks.append(" ".join(temp_chunk))
-
-        return chunks
-
-    def __word_chunking(self, text: str, chunk_size: int):
-        """
-        Splits text into word-based chunks.
-
-        Args:
-            text (str): Input text.
-            chunk_size (int): Desired number of words per chunk.
-
-        Returns:
-            list: List of chunked text segments.
-        """
-        words = word_tokenize(text)
-        return [" ".join(words[i:i+chunk_size]) for i in range(0, len(words), chunk_size)]
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_chunk_controller() -> ChunkController:
+    """Returns the ChunkController shared by every request; it holds no per-request state."""
+    return ChunkController()
@@ -1,7 +1,16 @@
 import os
 import json
+import hashlib
 import logging
+import numpy as np
 from .BaseController import BaseController
+from stores.vectordb.VectorDBInterface import VectorDBInterface
+from stores.embedding.EmbeddingInterface import EmbeddingInterface
+from stores.lexical.LexicalIndex import get_lexical_index_store
+from helpers.executors import run_in_pool
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
+from helpers.metrics import time_stage
+from models.enums.PipelineStageEnum import PipelineStageEnum
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,27 +22,175 @@ class EmbeddingController(BaseController):
         super().__init__()
 
     async def save_embeddings(self, file_directory: str , file_name : str, embeddings: list[list[float]]):
-        """Save embeddings to a local JSON file."""
+        """Save embeddings to a local float32 .npy file."""
         try:
             embedding_file_path = os.path.join(file_directory, file_name)
-            with open(embedding_file_path, "w") as f:
-                json.dump(embeddings, f)
+            matrix = np.asarray(embeddings, dtype=np.float32)
+            tmp_path = embedding_file_path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, embedding_file_path)
             logger.info(f"Embeddings saved successfully to {embedding_file_path}")
         except Exception as e:
             logger.error(f"Failed to save embeddings: {e}")
 
-    async def load_embeddings(self, file_directory: str , file_name : str) -> list[list[float]]:
-        """Load embeddings from a local JSON file."""
+    async def load_embeddings(self, file_directory: str , file_name : str) -> np.ndarray:
+        """
+        Load embeddings from a local file.
+        .npy files are memory-mapped read-only instead of read into memory; legacy JSON files are parsed.
+        """
         embedding_file_path = os.path.join(file_directory, file_name)
         if not os.path.exists(embedding_file_path):
             logger.error(f"File {embedding_file_path} does not exist.")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
         
         try:
-            with open(embedding_file_path, "r") as f:
-                embeddings = json.load(f)
+            if embedding_file_path.endswith(".json"):
+                with open(embedding_file_path, "r") as f:
+                    embeddings = np.asarray(json.load(f), dtype=np.float32)
+            else:
+                embeddings = np.load(embedding_file_path, mmap_mode="r")
             logger.info(f"Embeddings loaded successfully from {embedding_file_path}")
             return embeddings
         except Exception as e:
             logger.error(f"Failed to load embeddings: {e}")
-            return []
+            return np.empty((0, 0), dtype=np.float32)
+
+    @staticmethod
+    def generate_chunk_ids(chunks: list[str], seen: dict = None, namespace: str = None) -> list[str]:
+        """
+        Derive stable chunk IDs from chunk contents.
+
+        The ID is a hash of the chunk text; repeated chunks get a "-<n>" suffix for
+        their n-th repetition, so re-chunking the same file yields the same IDs.
+        Pass the same `seen` dict across calls to number repetitions over a stream of chunks.
+        A `namespace` (e.g. the source file in a shared collection) is hashed with the
+        text, so the same chunk in two files gets two IDs.
+        """
+        seen = {} if seen is None else seen
+        prefix = f"{namespace}\0" if namespace is not None else ""
+        chunk_ids = []
+        for chunk in chunks:
+            digest = hashlib.sha256((prefix + chunk).encode("utf-8")).hexdigest()[:32]
+            occurrence = seen.get(digest, 0)
+            seen[digest] = occurrence + 1
+            chunk_ids.append(digest if occurrence == 0 else f"{digest}-{occurrence}")
+        return chunk_ids
+
+    @staticmethod
+    def chunk_metadata(chunk_index: int, source: str = None, page: int = None) -> dict:
+        """Vector metadata of a chunk: its position in the document, and its source file and page when known."""
+        metadata = {"chunk_index": chunk_index}
+        if source is not None:
+            metadata["source"] = source
+        if page is not None:
+            metadata["page"] = page
+        return metadata
+
+    @staticmethod
+    def embedding_model_name(embedding_client: EmbeddingInterface) -> str:
+        """Identifies the embedding space of a client: its provider and model ID."""
+        model_id = getattr(embedding_client, "model_id", None)
+        return f"{type(embedding_client).__name__}:{getattr(model_id, 'value', model_id)}"
+
+    @staticmethod
+    async def reset_for_embedding_model(vectordb: VectorDBInterface, collection_name: str,
+                                        embedding_model: str, shared: bool = False) -> bool:
+        """
+        Checks the embedding model recorded with a collection against `embedding_model`.
+
+        Vectors of different models can't be compared, and a Chroma collection can't
+        change its dimension, so a collection embedded with another model is deleted,
+        for every chunk to be embedded again. Collections without a recorded model are
+        taken to match.
+
+        Returns:
+            bool: Whether the collection was deleted.
+
+        Raises:
+            ValueError: If a shared collection, which holds other files' vectors too, was
+                embedded with another model.
+        """
+        recorded = await run_in_pool(WorkerPoolEnum.IO, vectordb.get_embedding_model, collection_name)
+        if recorded is None or recorded == embedding_model:
+            return False
+        if shared:
+            raise ValueError(f"Collection '{collection_name}' holds embeddings of '{recorded}'; "
+                             f"it can't take embeddings of '{embedding_model}'.")
+        logger.info(f"Embedding model of '{collection_name}' changes from '{recorded}' to '{embedding_model}'; "
+                    "embedding every chunk again.")
+        await run_in_pool(WorkerPoolEnum.IO, vectordb.delete_collection, collection_name)
+        return True
+
+    async def reindex_collection(self,
+                                 vectordb: VectorDBInterface,
+                                 embedding_client: EmbeddingInterface,
+                                 collection_name: str,
+                                 chunks: list[str],
+                                 source: str = None,
+                                 shared: bool = False) -> dict:
+        """
+        Bring a collection in line with `chunks`, embedding and writing only what changed.
+
+        Chunks whose ID is already in the collection are not embedded again, though their
+        metadata is updated if their position moved; new chunks are embedded and added, and
+        vanished chunks are deleted. The vector DB publishes all of it together, so readers
+        never see a partial collection.
+        When the collection was embedded with another model, every chunk is embedded
+        again (see `reset_for_embedding_model`). The collection's lexical index is
+        updated and saved alongside.
+
+        Args:
+            source (str, optional): File the chunks come from, stored in their metadata.
+            shared (bool): The collection also holds other files' chunks. Chunk IDs are then
+                namespaced by `source`, only chunks of `source` are compared against, and the
+                lexical index is kept per file under the file's base name.
+
+        Returns:
+            dict: Number of added, deleted and unchanged chunks.
+        """
+        chunk_ids = self.generate_chunk_ids(chunks, namespace=source if shared else None)
+        where = {"source": source} if shared else None
+        existing_ids = set(await run_in_pool(WorkerPoolEnum.IO, vectordb.get_ids, collection_name, where=where))
+        embedding_model = self.embedding_model_name(embedding_client)
+        reset = await self.reset_for_embedding_model(vectordb, collection_name, embedding_model, shared)
+        kept_ids = set() if reset else existing_ids
+
+        new_positions = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in kept_ids]
+        delete_ids = list(existing_ids.difference(chunk_ids))
+
+        new_chunks = [chunks[i] for i in new_positions]
+        vectors = []
+        if new_chunks:
+            with time_stage(PipelineStageEnum.EMBEDDING):
+                vectors = await run_in_pool(WorkerPoolEnum.INFERENCE, embedding_client.generate_embedding, new_chunks)
+
+        kept_metadatas = {chunk_id: self.chunk_metadata(i, source) for i, chunk_id in enumerate(chunk_ids) if chunk_id in kept_ids}
+        if new_chunks or delete_ids or kept_metadatas:
+            with time_stage(PipelineStageEnum.VECTOR_INSERT):
+                await run_in_pool(WorkerPoolEnum.IO, vectordb.apply_changes,
+                                  collection_name=collection_name,
+                                  ids=[chunk_ids[i] for i in new_positions],
+                                  documents=new_chunks,
+                                  embeddings=vectors,
+                                  metadatas=[self.chunk_metadata(i, source) for i in new_positions],
+                                  delete_ids=[] if reset else delete_ids,
+                                  embedding_model=embedding_model,
+                                  kept_metadatas=kept_metadatas)
+
+        # Keep the lexical index in line, including chunks written before it existed
+        lexical_index_name = os.path.splitext(source)[0] if shared else collection_name
+        lexical_index_store = get_lexical_index_store()
+        lexical_index = lexical_index_store.get_index(lexical_index_name)
+        unindexed_positions = [i for i, chunk_id in enumerate(chunk_ids) if chunk_id not in lexical_index]
+        lexical_index.add_documents([chunk_ids[i] for i in unindexed_positions], [chunks[i] for i in unindexed_positions])
+        lexical_index.remove_documents(delete_ids)
+        if unindexed_positions or delete_ids:
+            await run_in_pool(WorkerPoolEnum.IO, lexical_index_store.save_index, lexical_index_name)
+
+        logger.info(f"Reindexed '{collection_name}': {len(new_chunks)} added, {len(delete_ids)} deleted.")
+        return {
+            "added": len(new_chunks),
+            "deleted": len(delete_ids),
+            "unchanged": len(chunk_ids) - len(new_chunks),
+        }
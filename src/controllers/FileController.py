@@ -2,11 +2,13 @@ import logging
 from fastapi import UploadFile, HTTPException
 from .BaseController import BaseController
 from models.enums.ResponseEnum import ResponseSignal
+from models.enums.PipelineStageEnum import PipelineStageEnum
+from helpers.metrics import observe_stage
 from werkzeug.utils import secure_filename
 import os 
 import uuid
 import shutil
-from langchain_community.document_loaders import PyPDFLoader
+import time
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -69,14 +71,23 @@ class FileController(BaseController):
             shutil.copyfileobj(file.file, buffer)
     
     async def load_file_content(self ,file_directory : str , file_name : str) :
+        pages = [page async for page in self.iter_file_pages(file_directory, file_name)]
+
+        return "".join(pages)
+
+    async def iter_file_pages(self, file_directory: str, file_name: str):
+        """Yields the text of the file one page at a time, parsing pages lazily."""
+        # langchain_community's loaders are slow to import; only parsing needs them
+        from langchain_community.document_loaders import PyPDFLoader
+
         loader = PyPDFLoader(os.path.join(file_directory, file_name))
-        
-        file_content = ""
 
+        # Each page is timed while it is parsed, not while the consumer works on it
+        started = time.perf_counter()
         async for page in loader.alazy_load():
-            file_content = file_content + page.page_content 
-
-        return file_content
+            observe_stage(PipelineStageEnum.PDF_PARSING, time.perf_counter() - started)
+            yield page.page_content
+            started = time.perf_counter()
     
     async def file_exists(self, file_directory: str, file_name: str) -> bool:
         return os.path.exists(os.path.join(file_directory, file_name))
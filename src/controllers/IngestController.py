@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+from .BaseController import BaseController
+from .EmbeddingController import EmbeddingController
+from stores.vectordb.VectorDBInterface import VectorDBInterface
+from stores.embedding.EmbeddingInterface import EmbeddingInterface
+from stores.lexical.LexicalIndex import get_lexical_index_store
+from helpers.executors import run_in_pool
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
+from helpers.metrics import time_stage
+from models.enums.PipelineStageEnum import PipelineStageEnum
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's output
+_END_OF_STREAM = object()
+
+class IngestController(BaseController):
+    """
+    Streams a document into the vector store page by page.
+
+    Pages are chunked as they are parsed, chunks are grouped into embedding batches and
+    every batch is written as soon as it is embedded:
+
+        pages -> chunker -> [batch queue] -> embedder -> [write queue] -> writer
+
+    The queues are bounded, so a slow embedder or vector DB pauses parsing instead of
+    letting chunks pile up in memory, and the first batches are searchable while later
+    pages are still being parsed.
+    """
+
+    def __init__(self):
+        super().__init__()
+
+    async def ingest(self,
+                     vectordb: VectorDBInterface,
+                     embedding_client: EmbeddingInterface,
+                     collection_name: str,
+                     pages: AsyncIterator[str],
+                     chunker: Callable[[str], Awaitable[List[str]]],
+                     batch_size: int = None,
+                     queue_size: int = None,
+                     on_progress: Optional[Callable[[dict], Awaitable[None]]] = None,
+                     source: str = None,
+                     shared: bool = False) -> dict:
+        """
+        Runs the ingestion pipeline for one document.
+
+        Chunks already in the collection are skipped and chunks that no longer appear in
+        the document are deleted once the whole document has been read, in the same write
+        that updates the page and position of skipped chunks that moved. A collection
+        embedded with another model is embedded again in full, as in
+        `EmbeddingController.reindex_collection`. The collection's
+        lexical index follows the written chunks and is saved at the end. Every chunk is
+        written with its page and position in the document as metadata.
+
+        Args:
+            vectordb (VectorDBInterface): Vector database to write to.
+            embedding_client (EmbeddingInterface): Client used to embed the chunks.
+            collection_name (str): Target collection.
+            pages (AsyncIterator[str]): Page texts, in document order.
+            chunker (Callable): Coroutine function splitting one page into chunks.
+            batch_size (int, optional): Chunks per embedding batch (default from settings).
+            queue_size (int, optional): Batches buffered between stages (default from settings).
+            on_progress (Callable, optional): Coroutine function awaited with a copy of the
+                counters whenever a page is parsed or a batch is embedded or written.
+            source (str, optional): File the document comes from, stored in the chunk metadata.
+            shared (bool): The collection also holds other files' chunks; see
+                `EmbeddingController.reindex_collection`.
+
+        Returns:
+            dict: Number of pages read, chunks embedded and added, deleted and unchanged chunks.
+        """
+        batch_size = batch_size or self.app_settings.INGEST_EMBEDDING_BATCH_SIZE
+        queue_size = queue_size or self.app_settings.INGEST_QUEUE_SIZE
+
+        where = {"source": source} if shared else None
+        existing_ids = set(await run_in_pool(WorkerPoolEnum.IO, vectordb.get_ids, collection_name, where=where))
+        embedding_model = EmbeddingController.embedding_model_name(embedding_client)
+        reset = await EmbeddingController.reset_for_embedding_model(vectordb, collection_name, embedding_model, shared)
+        kept_ids = set() if reset else existing_ids
+        seen_ids = set()
+        kept_metadatas = {}
+        lexical_index_name = os.path.splitext(source)[0] if shared else collection_name
+        lexical_index_store = get_lexical_index_store()
+        lexical_index = lexical_index_store.get_index(lexical_index_name)
+        stats = {"pages": 0, "embedded": 0, "added": 0, "deleted": 0, "unchanged": 0}
+
+        async def report_progress():
+            if on_progress is not None:
+                await on_progress(dict(stats))
+
+        batch_queue = asyncio.Queue(maxsize=queue_size)
+        write_queue = asyncio.Queue(maxsize=queue_size)
+
+        async def chunk_pages():
+            occurrences = {}
+            chunk_index = 0
+            batch_ids, batch_chunks, batch_metadatas = [], [], []
+            async for page in pages:
+                page_number = stats["pages"]
+                stats["pages"] += 1
+                if not page:
+                    continue
+                chunks = await chunker(page)
+                chunk_ids = EmbeddingController.generate_chunk_ids(chunks, seen=occurrences, namespace=source if shared else None)
+                for chunk_id, chunk in zip(chunk_ids, chunks):
+                    metadata = EmbeddingController.chunk_metadata(chunk_index, source, page_number)
+                    chunk_index += 1
+                    seen_ids.add(chunk_id)
+                    if chunk_id in kept_ids:
+                        kept_metadatas[chunk_id] = metadata
+                        stats["unchanged"] += 1
+                        if chunk_id not in lexical_index:
+                            lexical_index.add_documents([chunk_id], [chunk])
+                        continue
+                    batch_ids.append(chunk_id)
+                    batch_chunks.append(chunk)
+                    batch_metadatas.append(metadata)
+                    if len(batch_chunks) >= batch_size:
+                        await batch_queue.put((batch_ids, batch_chunks, batch_metadatas))
+                        batch_ids, batch_chunks, batch_metadatas = [], [], []
+                await report_progress()
+            if batch_chunks:
+                await batch_queue.put((batch_ids, batch_chunks, batch_metadatas))
+            await batch_queue.put(_END_OF_STREAM)
+
+        async def embed_batches():
+            while (batch := await batch_queue.get()) is not _END_OF_STREAM:
+                batch_ids, batch_chunks, batch_metadatas = batch
+                with time_stage(PipelineStageEnum.EMBEDDING):
+                    vectors = await run_in_pool(WorkerPoolEnum.INFERENCE, embedding_client.generate_embedding, batch_chunks)
+                stats["embedded"] += len(batch_chunks)
+                await report_progress()
+                await write_queue.put((batch_ids, batch_chunks, batch_metadatas, vectors))
+            await write_queue.put(_END_OF_STREAM)
+
+        async def write_batches():
+            while (batch := await write_queue.get()) is not _END_OF_STREAM:
+                batch_ids, batch_chunks, batch_metadatas, vectors = batch
+                with time_stage(PipelineStageEnum.VECTOR_INSERT):
+                    await run_in_pool(WorkerPoolEnum.IO, vectordb.apply_changes,
+                                      collection_name=collection_name,
+                                      ids=batch_ids,
+                                      documents=batch_chunks,
+                                      embeddings=vectors,
+                                      metadatas=batch_metadatas,
+                                      embedding_model=embedding_model)
+                lexical_index.add_documents(batch_ids, batch_chunks)
+                stats["added"] += len(batch_ids)
+                await report_progress()
+
+        stages = [asyncio.create_task(stage()) for stage in (chunk_pages, embed_batches, write_batches)]
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            # A failed stage would leave the others blocked on their queues
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+
+        delete_ids = list(existing_ids.difference(seen_ids))
+        if (delete_ids and not reset) or kept_metadatas:
+            with time_stage(PipelineStageEnum.VECTOR_INSERT):
+                await run_in_pool(WorkerPoolEnum.IO, vectordb.apply_changes,
+                                  collection_name=collection_name,
+                                  ids=[], documents=[], embeddings=[],
+                                  delete_ids=[] if reset else delete_ids,
+                                  kept_metadatas=kept_metadatas)
+        stats["deleted"] = len(delete_ids)
+
+        lexical_index.remove_documents(delete_ids)
+        await run_in_pool(WorkerPoolEnum.IO, lexical_index_store.save_index, lexical_index_name)
+
+        logger.info(f"Ingested {stats['pages']} pages into '{collection_name}': "
+                    f"{stats['added']} added, {stats['deleted']} deleted, {stats['unchanged']} unchanged.")
+        return stats
@@ -0,0 +1,232 @@
+import asyncio
+import functools
+import logging
+import os
+import time
+import uuid
+from typing import AsyncIterator, Optional
+from .BaseController import BaseController
+from .FileController import FileController
+from .ChunkController import get_chunk_controller
+from .IngestController import IngestController
+from models.JobModel import JobModel
+from models.db_schemes.JobSchema import JobSchema
+from models.enums.JobStatusEnum import JobStatusEnum
+from stores.vectordb.VectorDBInterface import VectorDBInterface
+from stores.embedding.EmbeddingProviderFactory import EmbeddingProviderFactory
+from helpers.executors import PoolSaturatedError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TERMINAL_JOB_STATUSES = (JobStatusEnum.COMPLETED, JobStatusEnum.FAILED, JobStatusEnum.CANCELLED)
+# Seconds a job waits before running again after a worker pool turned it away
+SATURATED_RETRY_DELAY = 1.0
+
+class JobController(BaseController):
+    """
+    Runs ingestion jobs in the background on a fixed number of worker tasks.
+
+    Job state lives in the JobModel store. Jobs that were pending or running when the
+    server stopped are queued again by `start`; since ingestion skips chunks that are
+    already in the collection, a resumed job only embeds what is still missing.
+
+    API keys are kept in memory only, so a job resumed after a restart runs without one
+    and the provider falls back to its environment configuration.
+
+    A job turned away by a saturated worker pool goes back to pending and is queued again
+    after `retry_delay` seconds, rather than failing like a request would.
+    """
+
+    def __init__(self, job_model: JobModel, vectordb: VectorDBInterface, workers: int = None,
+                 retry_delay: float = SATURATED_RETRY_DELAY):
+        super().__init__()
+        self.job_model = job_model
+        self.vectordb = vectordb
+        self.workers = workers or self.app_settings.INGEST_JOB_WORKERS
+        self.retry_delay = retry_delay
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._worker_tasks = []
+        self._running_jobs = {}
+        self._cancel_requested = set()
+        self._api_keys = {}
+
+    async def start(self):
+        """Queues unfinished jobs from the store and starts the workers."""
+        for job in await self.job_model.get_jobs([JobStatusEnum.PENDING, JobStatusEnum.RUNNING]):
+            if job.status == JobStatusEnum.RUNNING:
+                await self.__save(job, status=JobStatusEnum.PENDING)
+            logger.info(f"Resuming job {job.job_id}")
+            self._queue.put_nowait(job.job_id)
+
+        self._worker_tasks = [asyncio.create_task(self.__worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Stops the workers. Interrupted jobs stay running in the store and resume on the next start."""
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a free job worker."""
+        return self._queue.qsize()
+
+    @property
+    def running_jobs(self) -> int:
+        return len(self._running_jobs)
+
+    async def submit(self, params: dict, api_key: Optional[str] = None) -> JobSchema:
+        now = time.time()
+        job = JobSchema(job_id=uuid.uuid4().hex, params=params, created_at=now, updated_at=now)
+        await self.job_model.insert_job(job)
+        if api_key:
+            self._api_keys[job.job_id] = api_key
+        self._queue.put_nowait(job.job_id)
+        logger.info(f"Submitted job {job.job_id} for file {params.get('file_name')}")
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[JobSchema]:
+        return await self.job_model.get_job(job_id)
+
+    async def get_jobs(self):
+        return await self.job_model.get_jobs()
+
+    async def cancel(self, job_id: str) -> Optional[JobSchema]:
+        """
+        Cancels a pending or running job.
+
+        Raises:
+            ValueError: If the job has already finished.
+        """
+        job = await self.job_model.get_job(job_id)
+        if job is None:
+            return None
+        if job.status in TERMINAL_JOB_STATUSES:
+            raise ValueError(f"Job {job_id} is already {job.status.value}.")
+
+        running_task = self._running_jobs.get(job_id)
+        if running_task is not None:
+            self._cancel_requested.add(job_id)
+            running_task.cancel()
+            await asyncio.gather(running_task, return_exceptions=True)
+            job = await self.job_model.get_job(job_id)
+            if not running_task.cancelled():
+                # The job finished before the cancellation reached it
+                self._cancel_requested.discard(job_id)
+                return job
+
+        return await self.__save(job, status=JobStatusEnum.CANCELLED)
+
+    async def retry(self, job_id: str) -> Optional[JobSchema]:
+        """
+        Queues a failed or cancelled job again.
+
+        Raises:
+            ValueError: If the job is not failed or cancelled.
+        """
+        job = await self.job_model.get_job(job_id)
+        if job is None:
+            return None
+        if job.status not in (JobStatusEnum.FAILED, JobStatusEnum.CANCELLED):
+            raise ValueError(f"Job {job_id} is {job.status.value}; only failed or cancelled jobs can be retried.")
+
+        job = await self.__save(job, status=JobStatusEnum.PENDING, error=None)
+        self._queue.put_nowait(job_id)
+        return job
+
+    async def stream_job(self, job_id: str, poll_interval: float = 0.5) -> AsyncIterator[JobSchema]:
+        """Yields the job every time its state changes, until it finishes."""
+        last_update = None
+        while True:
+            job = await self.job_model.get_job(job_id)
+            if job is None:
+                return
+            if job.updated_at != last_update:
+                last_update = job.updated_at
+                yield job
+            if job.status in TERMINAL_JOB_STATUSES:
+                return
+            await asyncio.sleep(poll_interval)
+
+    def iter_job_pages(self, job: JobSchema) -> AsyncIterator[str]:
+        return FileController().iter_file_pages(self.app_settings.UPLOAD_DIR, job.params["file_name"])
+
+    def get_job_chunker(self, job: JobSchema):
+        return functools.partial(get_chunk_controller().chunk_text,
+                                 method=job.params["chunking_method"],
+                                 chunk_size=job.params["chunk_size"],
+                                 chunk_overlap=job.params["chunk_overlap"])
+
+    def get_job_embedding_client(self, job: JobSchema):
+        return EmbeddingProviderFactory(
+            api_key=self._api_keys.get(job.job_id),
+            model_id=job.params["model_id"],
+            max_input_token=job.params["max_input_token"],
+        ).create(provider=job.params["provider"])
+
+    async def __worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                job = await self.job_model.get_job(job_id)
+                if job is None or job.status != JobStatusEnum.PENDING:
+                    continue
+                await self.__run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A broken job must not take the worker down with it; it stays in the store and resumes on restart
+                logger.exception(f"Job worker failed on job {job_id}: {e}")
+
+    async def __run_job(self, job: JobSchema):
+        job = await self.__save(job, status=JobStatusEnum.RUNNING, attempts=job.attempts + 1, progress={})
+        task = asyncio.create_task(self.__ingest(job))
+        self._running_jobs[job.job_id] = task
+        try:
+            stats = await task
+            await self.__save(job, status=JobStatusEnum.COMPLETED, progress=stats)
+            self._api_keys.pop(job.job_id, None)
+            logger.info(f"Job {job.job_id} completed")
+        except asyncio.CancelledError:
+            if job.job_id not in self._cancel_requested:
+                # Server shutdown: leave the job running so it resumes on restart
+                raise
+            self._cancel_requested.discard(job.job_id)
+            await self.__save(job, status=JobStatusEnum.CANCELLED)
+            logger.info(f"Job {job.job_id} cancelled")
+        except PoolSaturatedError as e:
+            logger.warning(f"Job {job.job_id} postponed by {self.retry_delay}s: {e}")
+            await self.__save(job, status=JobStatusEnum.PENDING)
+            asyncio.get_running_loop().call_later(self.retry_delay, self._queue.put_nowait, job.job_id)
+        except Exception as e:
+            logger.exception(f"Job {job.job_id} failed: {e}")
+            await self.__save(job, status=JobStatusEnum.FAILED, error=str(e))
+        finally:
+            self._running_jobs.pop(job.job_id, None)
+
+    async def __ingest(self, job: JobSchema) -> dict:
+        async def on_progress(progress: dict):
+            await self.__save(job, progress=progress)
+
+        ingest_controller = IngestController()
+        return await ingest_controller.ingest(
+            vectordb=self.vectordb,
+            embedding_client=self.get_job_embedding_client(job),
+            collection_name=ingest_controller.get_collection_name(job.params["file_name"]),
+            pages=self.iter_job_pages(job),
+            chunker=self.get_job_chunker(job),
+            on_progress=on_progress,
+            source=job.params["file_name"],
+            shared=ingest_controller.uses_shared_collection,
+        )
+
+    async def __save(self, job: JobSchema, **changes) -> JobSchema:
+        for field, value in changes.items():
+            setattr(job, field, value)
+        job.updated_at = time.time()
+        await self.job_model.update_job(job)
+        return job
@@ -1,19 +1,234 @@
 import os
 import json
+import asyncio
 import logging
+import time
+from collections import namedtuple
+from contextlib import aclosing
 import numpy as np
-import pandas as pd
-import plotly.express as px
-from sklearn.manifold import TSNE
 from .BaseController import BaseController
 from stores.vectordb.VectorDBInterface import VectorDBInterface
 from stores.embedding.EmbeddingInterface import EmbeddingInterface
 from stores.reranking.RerankingInterface import RerankingInterface
 from stores.llm.LLMInterface import LLMInterface
+from stores.llm.ResponseCache import ResponseCacheKey, get_response_cache
+from stores.lexical.LexicalIndex import get_lexical_index_store
+from stores.lexical.LexicalEnum import LexicalScoringEnum
+from models.enums.SearchTechniqueEnum import SearchTechniqueEnums
+from helpers.executors import run_in_pool
+from helpers.token_counter import count_tokens, truncate_tokens
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
+from models.enums.PipelineStageEnum import PipelineStageEnum
+from helpers.metrics import time_stage, observe_stage
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+def render_tsne_visualization(vectors, saved_file_path, labels=None, perplexity=5):
+    """
+    Reduces embeddings to 2D with t-SNE and writes an interactive scatter plot as HTML.
+    Kept at module level so it can run in a worker process.
+
+    Returns:
+    - str: The path to the saved HTML file.
+    """
+    # The plotting stack is only needed here; importing it with the module slows every startup
+    import pandas as pd
+    import plotly.express as px
+    from sklearn.manifold import TSNE
+
+    vectors = np.array(vectors)  # Ensure input is a NumPy array
+    n_samples = len(vectors)  # Get the number of vectors
+
+    # Adjust perplexity to be within the valid range
+    perplexity = min(perplexity, max(1, n_samples - 1))
+
+    # Apply t-SNE for dimensionality reduction
+    tsne = TSNE(n_components=2, perplexity=perplexity, random_state=42)
+    reduced_vectors = tsne.fit_transform(vectors)
+
+    # Create a DataFrame for visualization
+    df = pd.DataFrame(reduced_vectors, columns=["x", "y"])
+
+    # Ensure labels are a list of texts, otherwise set them to None
+    if labels is not None and isinstance(labels, list) and len(labels) == n_samples:
+        df["label"] = labels
+    else:
+        df["label"] = [None] * n_samples  # Empty tooltips if no valid labels
+
+    # Create an interactive scatter plot with hover text
+    fig = px.scatter(
+        df, x="x", y="y", hover_data={"label": True},  # Show labels only on hover
+        title="Interactive t-SNE Visualization of Embeddings",
+        labels={"x": "t-SNE Component 1", "y": "t-SNE Component 2"}
+    )
+
+    fig.update_traces(marker=dict(size=10, opacity=0.7))
+
+    # Save the plot as an interactive HTML file
+    fig.write_html(saved_file_path)
+
+    return saved_file_path
+
+
+def reciprocal_rank_fusion(result_lists, k=60):
+    """
+    Fuses ranked result lists with reciprocal rank fusion: each result scores the sum
+    of 1 / (k + rank) over the lists it appears in. Results are matched by `id`.
+
+    Returns:
+    - list of dict: Results with `id`, `document` and the fused `score`, best first.
+    """
+    fused = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            entry = fused.setdefault(result["id"], {"id": result["id"], "document": result["document"], "score": 0.0})
+            entry["score"] += 1.0 / (k + rank)
+    return sorted(fused.values(), key=lambda result: result["score"], reverse=True)
+
+
+def merge_results(result_lists, n_results):
+    """
+    Merges result lists from several collections or indexes into one ranking: by
+    ascending `distance` for semantic results, by descending `score` otherwise.
+
+    Returns:
+    - list of dict: The best `n_results` results.
+    """
+    results = [result for results in result_lists for result in results]
+    if results and "distance" in results[0]:
+        results.sort(key=lambda result: result["distance"])
+    else:
+        results.sort(key=lambda result: result["score"], reverse=True)
+    return results[:n_results]
+
+
+# Where a query looks: a vector DB collection, narrowed by an optional metadata filter,
+# and the lexical indexes holding the same chunks (the collection's own by default)
+SearchTarget = namedtuple("SearchTarget", "collection_name where lexical_indexes", defaults=(None, None))
+
+
+def as_search_target(target) -> SearchTarget:
+    """Accepts a plain collection name wherever a SearchTarget is expected."""
+    if isinstance(target, str):
+        target = SearchTarget(target)
+    if target.lexical_indexes is None:
+        target = target._replace(lexical_indexes=(target.collection_name,))
+    return target
+
+
+# Shortest shared text treated as chunk overlap rather than coincidence
+MIN_OVERLAP_CHARS = 16
+
+
+def overlap_length(head: str, tail: str, min_chars: int = MIN_OVERLAP_CHARS) -> int:
+    """
+    Length of the longest suffix of `head` that is also a prefix of `tail`, as between
+    consecutive chunks of the recursive chunker; 0 below `min_chars`.
+    """
+    if len(tail) < min_chars:
+        return 0
+    probe = tail[:min_chars]
+    position = head.find(probe, max(0, len(head) - len(tail)))
+    while position != -1:
+        if tail.startswith(head[position:]):
+            return len(head) - position
+        position = head.find(probe, position + 1)
+    return 0
+
+
+def merge_overlapping(first: str, second: str, min_chars: int = MIN_OVERLAP_CHARS):
+    """Joins two passages sharing text into one, or returns None when they are unrelated."""
+    if second in first:
+        return first
+    if first in second:
+        return second
+    overlap = overlap_length(first, second, min_chars)
+    if overlap:
+        return first + second[overlap:]
+    overlap = overlap_length(second, first, min_chars)
+    if overlap:
+        return second + first[overlap:]
+    return None
+
+
+def format_generation_query(question, passages):
+    """Formats the generation prompt of `question` over the given context passages."""
+    context = "\n".join(passages) if passages else "No relevant context available."
+    return f"Question: {question}\nContext: {context}\nAnswer:"
+
+
+def pack_context(docs, token_budget, scores=None, model_id=None, separator="\n"):
+    """
+    Selects the context passages of a generation prompt within `token_budget` tokens.
+
+    Documents are taken best first: by `scores` (higher is better) when given, else in
+    their order. Duplicates are dropped and a chunk sharing text with a passage already
+    taken is merged into it, so overlapping chunks only pay for their new text. A
+    document that no longer fits is skipped in favour of smaller ones further down;
+    when even the best one exceeds the budget, it is truncated. A `token_budget` of 0
+    disables the limit.
+
+    Returns:
+    - list of str: The passages, best first. With the separators joining them they
+      count at most `token_budget` tokens.
+    """
+    order = range(len(docs)) if scores is None else sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)
+    separator_tokens = count_tokens(separator, model_id)
+
+    def total(tokens):
+        return sum(tokens) + separator_tokens * max(0, len(tokens) - 1)
+
+    passages, passage_tokens = [], []
+    for i in order:
+        text = docs[i].strip()
+        if not text:
+            continue
+
+        merged = next(((position, combined) for position, passage in enumerate(passages)
+                       if (combined := merge_overlapping(passage, text)) is not None), None)
+        if merged is None:
+            tokens = count_tokens(text, model_id)
+            if token_budget and total(passage_tokens + [tokens]) > token_budget:
+                if passages:
+                    continue
+                text = truncate_tokens(text, token_budget, model_id)
+                tokens = count_tokens(text, model_id)
+            passages.append(text)
+            passage_tokens.append(tokens)
+            continue
+
+        # The merged passage may bridge to other passages as well; it takes the best position of the group
+        position, combined = merged
+        if combined == passages[position]:
+            continue
+        group = {position}
+        for other, passage in enumerate(passages):
+            if other not in group and (bridged := merge_overlapping(combined, passage)) is not None:
+                combined = bridged
+                group.add(other)
+
+        candidates, candidate_tokens = [], []
+        for other, passage in enumerate(passages):
+            if other == min(group):
+                candidates.append(combined)
+                candidate_tokens.append(count_tokens(combined, model_id))
+            elif other not in group:
+                candidates.append(passage)
+                candidate_tokens.append(passage_tokens[other])
+        if not token_budget or total(candidate_tokens) <= token_budget:
+            passages, passage_tokens = candidates, candidate_tokens
+
+    return passages
+
+
+LEXICAL_SCORING = {
+    SearchTechniqueEnums.BM25: LexicalScoringEnum.BM25,
+    SearchTechniqueEnums.TF_IDF: LexicalScoringEnum.TF_IDF,
+}
+
+
 class NLPController(BaseController):
     
     def __init__(self):
@@ -34,75 +249,274 @@ class NLPController(BaseController):
         Returns:
         - str: The path to the saved HTML file.
         """
-        vectors = np.array(vectors)  # Ensure input is a NumPy array
-        n_samples = len(vectors)  # Get the number of vectors
-
-        # Adjust perplexity to be within the valid range
-        perplexity = min(perplexity, max(1, n_samples - 1))
-
-        # Apply t-SNE for dimensionality reduction
-        tsne = TSNE(n_components=2, perplexity=perplexity, random_state=42)
-        reduced_vectors = tsne.fit_transform(vectors)
-
-        # Create a DataFrame for visualization
-        df = pd.DataFrame(reduced_vectors, columns=["x", "y"])
-
-        # Ensure labels are a list of texts, otherwise set them to None
-        if labels is not None and isinstance(labels, list) and len(labels) == n_samples:
-            df["label"] = labels
-        else:
-            df["label"] = [None] * n_samples  # Empty tooltips if no valid labels
-
-        # Create an interactive scatter plot with hover text
-        fig = px.scatter(
-            df, x="x", y="y", hover_data={"label": True},  # Show labels only on hover
-            title="Interactive t-SNE Visualization of Embeddings",
-            labels={"x": "t-SNE Component 1", "y": "t-SNE Component 2"}
-        )
-
-        fig.update_traces(marker=dict(size=10, opacity=0.7))
-
         # Ensure directory exists before saving
         os.makedirs(file_directory, exist_ok=True)
-
-        # Save the plot as an interactive HTML file
         saved_file_path = os.path.join(file_directory, file_name)
-        fig.write_html(saved_file_path)
 
-        return saved_file_path
+        # t-SNE and plot rendering are CPU-bound, so they run in the process pool
+        return await run_in_pool(WorkerPoolEnum.CPU, render_tsne_visualization,
+                                 np.asarray(vectors), saved_file_path, labels, perplexity)
     
+    def get_search_targets(self, file_names : list ) -> list:
+        """
+        Returns the search targets covering the given uploaded files.
+
+        With a collection per file, that is one target per file. In a shared collection
+        it is a single target whose metadata filter selects all of the files, so they
+        are searched with one query.
+        """
+        lexical_indexes = tuple(os.path.splitext(file_name)[0] for file_name in file_names)
+        if not self.uses_shared_collection:
+            return [SearchTarget(collection_name, None, (collection_name,)) for collection_name in lexical_indexes]
+
+        sources = list(dict.fromkeys(file_names))
+        where = {"source": sources[0]} if len(sources) == 1 else {"source": {"$in": sources}}
+        return [SearchTarget(self.app_settings.VECTORDB_SHARED_COLLECTION, where, tuple(dict.fromkeys(lexical_indexes)))]
+
     async def semantic_search(self , 
                               vectordb : VectorDBInterface ,
                               embedding_client :EmbeddingInterface,
                               collection_name : str ,
                               query : str ,
-                              n_results : str ):
-        embeddings = embedding_client.generate_embedding(texts=[query])
-        return vectordb.query_embeddings(collection_name=collection_name ,
-                                         n_results=n_results , 
-                                         embeddings=embeddings ).get('documents', [])[0]
+                              n_results : str ,
+                              where : dict = None ):
+        with time_stage(PipelineStageEnum.EMBEDDING):
+            embeddings = await run_in_pool(WorkerPoolEnum.INFERENCE, embedding_client.generate_embedding, texts=[query])
+        with time_stage(PipelineStageEnum.VECTOR_QUERY):
+            results = await run_in_pool(WorkerPoolEnum.IO, vectordb.query_embeddings,
+                                        collection_name=collection_name ,
+                                        n_results=n_results , 
+                                        embeddings=embeddings ,
+                                        where=where )
+        return results.get('documents', [])[0] if results else []
+
+    async def batch_semantic_search(self,
+                                    vectordb : VectorDBInterface ,
+                                    embedding_client :EmbeddingInterface,
+                                    queries : list ,
+                                    n_results : int ):
+        """
+        Runs many queries, possibly against different collections, in one pass.
+
+        All distinct query texts are embedded with a single `generate_embedding` call,
+        and each collection (and metadata filter) is searched with one vectorized
+        `query_embeddings` call; the calls run concurrently.
+
+        Parameters:
+        - queries (list of tuple): (target, query) pairs, where a target is a collection
+          name or a SearchTarget.
+        - n_results (int): Number of results per query.
+
+        Returns:
+        - list of list of dict: For each query, its results with `id`, `document`,
+          `distance` and `metadata`, closest first.
+        """
+        unique_texts = list(dict.fromkeys(query for _, query in queries))
+        with time_stage(PipelineStageEnum.EMBEDDING):
+            embeddings = await run_in_pool(WorkerPoolEnum.INFERENCE, embedding_client.generate_embedding, texts=unique_texts)
+        embedding_by_text = dict(zip(unique_texts, embeddings))
+
+        targets = {}
+        positions_by_target = {}
+        for position, (target, _) in enumerate(queries):
+            target = as_search_target(target)
+            key = (target.collection_name, json.dumps(target.where, sort_keys=True))
+            targets.setdefault(key, target)
+            positions_by_target.setdefault(key, []).append(position)
+
+        with time_stage(PipelineStageEnum.VECTOR_QUERY):
+            collection_results = await asyncio.gather(*[
+                run_in_pool(WorkerPoolEnum.IO, vectordb.query_embeddings,
+                            collection_name=targets[key].collection_name,
+                            n_results=n_results,
+                            embeddings=[embedding_by_text[queries[position][1]] for position in positions],
+                            where=targets[key].where)
+                for key, positions in positions_by_target.items()
+            ])
+
+        batch_results = [[] for _ in queries]
+        for positions, results in zip(positions_by_target.values(), collection_results):
+            if not results:
+                continue
+            metadatas = results.get("metadatas") or [[None] * len(ids) for ids in results["ids"]]
+            for row, position in enumerate(positions):
+                batch_results[position] = [
+                    {"id": chunk_id, "document": document, "distance": distance, "metadata": metadata or {}}
+                    for chunk_id, document, distance, metadata in zip(
+                        results["ids"][row], results["documents"][row], results["distances"][row], metadatas[row])
+                ]
+        return batch_results
+
+    async def lexical_search(self,
+                             queries : list ,
+                             n_results : int ,
+                             scoring : LexicalScoringEnum = LexicalScoringEnum.BM25 ):
+        """
+        Runs (target, query) pairs against the targets' lexical indexes. No embeddings
+        are computed. A target spanning several indexes fuses their rankings with
+        reciprocal rank fusion: each index scores with its own IDF and document lengths,
+        so scores of different indexes are not comparable.
+
+        Returns:
+        - list of list of dict: For each query, its results with `id`, `document` and `score`.
+        """
+        lexical_index_store = get_lexical_index_store()
+
+        def search_target(target, query):
+            rankings = [lexical_index_store.get_index(index_name).search(query, n_results, scoring)
+                        for index_name in as_search_target(target).lexical_indexes]
+            return rankings[0] if len(rankings) == 1 else reciprocal_rank_fusion(rankings)[:n_results]
+
+        def search_all():
+            return [search_target(target, query) for target, query in queries]
+
+        with time_stage(PipelineStageEnum.LEXICAL_QUERY):
+            return await run_in_pool(WorkerPoolEnum.IO, search_all)
+
+    async def hybrid_search(self,
+                            vectordb : VectorDBInterface ,
+                            embedding_client :EmbeddingInterface,
+                            queries : list ,
+                            n_results : int ):
+        """
+        Fuses dense and BM25 results of each (target, query) pair with reciprocal
+        rank fusion. Each side contributes up to HYBRID_SEARCH_CANDIDATES candidates.
+
+        Returns:
+        - list of list of dict: For each query, its results with `id`, `document` and fused `score`.
+        """
+        n_candidates = max(n_results, self.app_settings.HYBRID_SEARCH_CANDIDATES)
+        dense_results, lexical_results = await asyncio.gather(
+            self.batch_semantic_search(vectordb, embedding_client, queries, n_candidates),
+            self.lexical_search(queries, n_candidates, LexicalScoringEnum.BM25),
+        )
+        return [reciprocal_rank_fusion([dense, lexical])[:n_results]
+                for dense, lexical in zip(dense_results, lexical_results)]
+
+    async def search(self,
+                     vectordb : VectorDBInterface ,
+                     embedding_client :EmbeddingInterface,
+                     queries : list ,
+                     n_results : int ,
+                     search_technique : SearchTechniqueEnums ):
+        """
+        Runs (target, query) pairs with the given search technique. Targets are collection
+        names or SearchTargets.
+        `embedding_client` is only used by semantic and hybrid search and may be None otherwise.
+        """
+        if search_technique in LEXICAL_SCORING:
+            return await self.lexical_search(queries, n_results, LEXICAL_SCORING[search_technique])
+        if search_technique == SearchTechniqueEnums.HYBRID:
+            return await self.hybrid_search(vectordb, embedding_client, queries, n_results)
+        if search_technique == SearchTechniqueEnums.SEMANTIC_SEARCH:
+            return await self.batch_semantic_search(vectordb, embedding_client, queries, n_results)
+        raise ValueError(f"Unsupported search technique '{search_technique.value}'.")
+
+    async def search_across(self,
+                            vectordb : VectorDBInterface ,
+                            embedding_client :EmbeddingInterface,
+                            targets : list ,
+                            query : str ,
+                            n_results : int ,
+                            search_technique : SearchTechniqueEnums ):
+        """
+        Runs one query against several targets concurrently and merges their results:
+        semantic results by distance, hybrid results by fused score, and lexical results,
+        scored against each target's own corpus statistics, by reciprocal rank fusion.
+
+        Returns:
+        - list of dict: The best `n_results` results over all targets.
+        """
+        results = await self.search(vectordb, embedding_client, [(target, query) for target in targets],
+                                    n_results, search_technique)
+        if search_technique in LEXICAL_SCORING:
+            return reciprocal_rank_fusion(results)[:n_results]
+        return merge_results(results, n_results)
 
     async def rerank(self , 
                     reranking_client :RerankingInterface,
                     query : str ,
-                    docs : list ):
-        results = reranking_client.rerank(query=query , documents=docs)
+                    docs : list ,
+                    top_k : int = None ):
+        with time_stage(PipelineStageEnum.RERANKING):
+            results = await run_in_pool(WorkerPoolEnum.INFERENCE, reranking_client.rerank,
+                                        query=query , documents=docs , top_k=top_k)
         return results
     
     async def generate_response(self , 
                 llm_client :LLMInterface,
-                query : str  ):
-        
-        return llm_client.generate_response(prompt=query )
+                query : str ,
+                cache_key : ResponseCacheKey = None ,
+                embedding_client : EmbeddingInterface = None ):
+        """
+        Generates the LLM response to `query`.
+
+        With a `cache_key`, the response cache is consulted first and fresh responses are
+        stored in it. With an `embedding_client`, the question is embedded so that
+        near-duplicate questions over the same context are served from the cache too.
+        """
+        if cache_key is None or not self.app_settings.RESPONSE_CACHE_ENABLED:
+            with time_stage(PipelineStageEnum.LLM_GENERATION):
+                return await run_in_pool(WorkerPoolEnum.IO, llm_client.generate_response, prompt=query )
+
+        embedding = None
+        if embedding_client is not None:
+            try:
+                # Repeated questions are answered by the embedding cache, so exact hits stay cheap
+                with time_stage(PipelineStageEnum.EMBEDDING):
+                    embedding = (await run_in_pool(WorkerPoolEnum.INFERENCE, embedding_client.generate_embedding,
+                                                   texts=[cache_key.question]))[0]
+            except Exception as e:
+                logger.warning(f"Embedding the question for the response cache failed, matching exactly: {str(e)}")
+
+        response_cache = get_response_cache()
+        response = response_cache.get(cache_key, embedding)
+        if response is None:
+            with time_stage(PipelineStageEnum.LLM_GENERATION):
+                response = await run_in_pool(WorkerPoolEnum.IO, llm_client.generate_response, prompt=query )
+            response_cache.put(cache_key, response, embedding)
+        return response
+
+    def stream_response(self ,
+                        llm_client :LLMInterface,
+                        query : str ):
+        """
+        Streams the LLM response as it is generated. The request runs on the event loop,
+        not a worker pool, and is cancelled when the returned iterator is closed.
+        """
+        return self.__time_first_token(llm_client.stream_response(prompt=query))
+
+    @staticmethod
+    async def __time_first_token(tokens):
+        started = time.perf_counter()
+        first = True
+        async with aclosing(tokens):
+            async for token in tokens:
+                if first:
+                    observe_stage(PipelineStageEnum.LLM_FIRST_TOKEN, time.perf_counter() - started)
+                    first = False
+                yield token
         
     
+    def select_generation_context(self ,
+                                  docs : list ,
+                                  scores : list = None ,
+                                  model_id : str = None ):
+        """
+        Returns the context passages of a generation prompt, in prompt order: the documents
+        packed into GENERATION_CONTEXT_TOKEN_BUDGET tokens of `model_id` with `pack_context`,
+        best scoring first.
+        """
+        return pack_context(docs or [], self.app_settings.GENERATION_CONTEXT_TOKEN_BUDGET,
+                            scores=scores, model_id=model_id)
+
     async def create_generation_query(self , 
                                       question : str , 
-                                      docs : list):
-        context = "\n".join(docs) if docs else "No relevant context available."
-
-        # Format the query string
-        query = f"Question: {question}\nContext: {context}\nAnswer:"
-        
-        return query
-                
\ No newline at end of file
+                                      docs : list ,
+                                      scores : list = None ,
+                                      model_id : str = None ):
+        """
+        Formats the generation prompt over the passages `select_generation_context` selects.
+        """
+        passages = self.select_generation_context(docs, scores=scores, model_id=model_id)
+        return format_generation_query(question, passages)
@@ -0,0 +1,73 @@
+import os
+import struct
+from collections.abc import Sequence
+from typing import List
+
+import numpy as np
+
+# Layout: magic (8 bytes) | chunk count N (uint64) | N + 1 offsets (uint64) | UTF-8 chunk bytes
+CHUNK_FILE_MAGIC = b"RAGCHNK1"
+HEADER_SIZE = len(CHUNK_FILE_MAGIC) + 8
+OFFSET_DTYPE = np.dtype("<u8")
+
+
+def write_chunk_file(file_path: str, chunks: List[str]):
+    """
+    Writes chunks in the length-prefixed binary chunk format.
+    The file is written next to its destination and renamed into place, so readers
+    never see a partially written file.
+    """
+    encoded = [chunk.encode("utf-8") for chunk in chunks]
+    offsets = np.zeros(len(encoded) + 1, dtype=OFFSET_DTYPE)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+    tmp_path = file_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CHUNK_FILE_MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(offsets.tobytes())
+        for data in encoded:
+            f.write(data)
+    os.replace(tmp_path, file_path)
+
+
+class ChunkFile(Sequence):
+    """
+    Read-only, lazily loaded view over a binary chunk file.
+
+    The offsets table and chunk bytes are memory-mapped; a chunk is only decoded
+    when it is accessed, so opening a large file costs no more than its header.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+        with open(file_path, "rb") as f:
+            header = f.read(HEADER_SIZE)
+        if len(header) != HEADER_SIZE or header[:len(CHUNK_FILE_MAGIC)] != CHUNK_FILE_MAGIC:
+            raise ValueError(f"'{file_path}' is not a binary chunk file.")
+        count = struct.unpack("<Q", header[len(CHUNK_FILE_MAGIC):])[0]
+
+        self._offsets = np.memmap(file_path, dtype=OFFSET_DTYPE, mode="r", offset=HEADER_SIZE, shape=(count + 1,))
+        data_size = int(self._offsets[-1])
+        data_offset = HEADER_SIZE + OFFSET_DTYPE.itemsize * (count + 1)
+        if data_size:
+            self._data = np.memmap(file_path, dtype=np.uint8, mode="r", offset=data_offset, shape=(data_size,))
+        else:
+            self._data = np.empty(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def __repr__(self) -> str:
+        return f"ChunkFile({self.file_path!r}, chunks={len(self)})"
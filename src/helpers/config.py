@@ -1,3 +1,4 @@
+from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import List
 
@@ -22,12 +23,101 @@ class Settings(BaseSettings):
 
     
     # Vector DB
+    VECTORDB_PROVIDER : str = "chromadb"
     VECTORDB_PATH  : str
-    
-    
+
+    # One collection for every file, chunks tagged with their source file; empty keeps a collection per file
+    VECTORDB_SHARED_COLLECTION : str = ""
+
+    # ChromaDB writes: batches in flight and target seconds per batch (batch sizes adapt to it)
+    CHROMA_WRITE_CONCURRENCY : int = 2
+    CHROMA_BATCH_TARGET_SECONDS : float = 0.5
+
+    # IVF index (VECTORDB_PROVIDER = "ivf"); IVF_NLIST = 0 picks about 4 * sqrt(rows)
+    IVF_NLIST : int = 0
+    IVF_NPROBE : int = 8
+    IVF_TRAIN_MIN_ROWS : int = 1024
+
+    # Exact search (VECTORDB_PROVIDER = "exact"): float32, float16 or int8
+    EXACT_SEARCH_DTYPE : str = "float32"
+
+    # Quantization of new ivf / exact collections: none, scalar or pq
+    VECTORDB_QUANTIZATION : str = "none"
+    VECTORDB_PQ_SUBVECTORS : int = 16
+    VECTORDB_RESCORE_FACTOR : int = 10
+    VECTORDB_CALIBRATION_ROWS : int = 4096
+
+    # Shared HTTP clients for remote LLM and embedding APIs (HTTP/2 needs the h2 package)
+    HTTP_CONNECT_TIMEOUT_SECONDS : float = 10.0
+    HTTP_READ_TIMEOUT_SECONDS : float = 120.0
+    # Non-streaming generations send nothing until the whole answer is ready; 0 waits without limit
+    HTTP_GENERATION_READ_TIMEOUT_SECONDS : float = 0
+    HTTP_MAX_CONNECTIONS_PER_HOST : int = 20
+    HTTP_KEEPALIVE_SECONDS : float = 60.0
+    HTTP2_ENABLED : bool = True
+
+    # Lexical search
+    LEXICAL_INDEX_PATH : str = "assets/vector_db/lexical"
+    HYBRID_SEARCH_CANDIDATES : int = 50
+
+    # Model registry
+    EMBEDDING_MODELS_MEMORY_BUDGET_MB : int = 2048
+    EMBEDDING_WARMUP_MODELS : List[str] = []
+    RERANKING_WARMUP_MODELS : List[str] = []
+    RERANKING_MODELS_MEMORY_BUDGET_MB : int = 1024
+
+    # Embedding cache
+    EMBEDDING_CACHE_ENABLED : bool = True
+    EMBEDDING_CACHE_MEMORY_ITEMS : int = 50000
+
+    # Generation prompts: tokens of retrieved context packed into a prompt (0 = no limit)
+    GENERATION_CONTEXT_TOKEN_BUDGET : int = 3000
+
+    # Response cache of /api/v1/generate; near-duplicate questions match only with an embedding provider set
+    RESPONSE_CACHE_ENABLED : bool = True
+    RESPONSE_CACHE_MAX_ITEMS : int = 1000
+    RESPONSE_CACHE_TTL_SECONDS : float = 3600.0
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD : float = 0.95
+    RESPONSE_CACHE_EMBEDDING_PROVIDER : str = ""
+    RESPONSE_CACHE_EMBEDDING_MODEL_ID : str = ""
+
+    # Texts of at least this many characters are chunked in pieces on the CPU pool (0 = always serial)
+    CHUNKING_PARALLEL_MIN_CHARS : int = 500000
+
+    # Sentence and word chunking: extra NLTK data directory, and offline mode that never downloads
+    NLTK_DATA_DIR : str = ""
+    NLTK_OFFLINE : bool = False
+
+    # Reranking
+    RERANKING_BATCH_SIZE : int = 32
+    RERANKING_MAX_LENGTH : int = 512
+
+    # Worker pools
+    INFERENCE_POOL_WORKERS : int = 2
+    INFERENCE_POOL_QUEUE_SIZE : int = 64
+    CPU_POOL_WORKERS : int = 2
+    CPU_POOL_QUEUE_SIZE : int = 16
+    IO_POOL_WORKERS : int = 16
+    IO_POOL_QUEUE_SIZE : int = 256
+
+    # Streaming ingestion
+    INGEST_EMBEDDING_BATCH_SIZE : int = 64
+    INGEST_QUEUE_SIZE : int = 4
+
+    # Ingestion jobs
+    INGEST_JOB_WORKERS : int = 2
+    JOBS_DB_PATH : str = "assets/jobs/jobs.sqlite"
+
 
     class Config:
         env_file = ".env"
 
-def get_settings():
-    return Settings()
\ No newline at end of file
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """Returns the process-wide settings, read from the environment and `.env` once."""
+    return Settings()
+
+def reload_settings() -> Settings:
+    """Drops the cached settings and reads the environment and `.env` again."""
+    get_settings.cache_clear()
+    return get_settings()
@@ -0,0 +1,153 @@
+import asyncio
+import functools
+import logging
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+from helpers.config import get_settings
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(Exception):
+    """Raised when a worker pool's queue is full and the job is rejected."""
+
+
+class WorkerPool:
+    """
+    Runs blocking callables off the event loop on a dedicated executor.
+
+    - At most `max_workers` jobs run at once.
+    - At most `max_queue_size` further jobs wait for a free worker; past that,
+      `run` fails fast with PoolSaturatedError instead of queueing without bound.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue_size: int, use_processes: bool = False):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue_size = max_queue_size
+        self.use_processes = use_processes
+
+        if use_processes:
+            # spawn avoids forking a process that already holds torch/chroma threads
+            self._executor: Executor = ProcessPoolExecutor(max_workers=max_workers,
+                                                           mp_context=multiprocessing.get_context("spawn"))
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-worker")
+
+        # Semaphores are bound to the event loop awaiting them, so each loop gets its own slots
+        self._slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._slots_lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of accepted jobs waiting for a free worker."""
+        return self._pending - self._running
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._slots_lock:
+            slots = self._slots.get(loop)
+            if slots is None:
+                slots = self._slots[loop] = asyncio.Semaphore(self.max_workers)
+            return slots
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs `func(*args, **kwargs)` on this pool and awaits its result.
+
+        Raises:
+            PoolSaturatedError: If all workers are busy and the queue is full.
+        """
+        if self._pending >= self.max_workers + self.max_queue_size:
+            self.rejected += 1
+            raise PoolSaturatedError(f"Worker pool '{self.name}' is saturated ({self._pending} jobs pending).")
+
+        self._pending += 1
+        try:
+            async with self._loop_slots():
+                self._running += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+                finally:
+                    self._running -= 1
+                    self.completed += 1
+        finally:
+            self._pending -= 1
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_size": self.max_queue_size,
+            "running": self.running,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+_worker_pools: Dict[WorkerPoolEnum, WorkerPool] = {}
+_worker_pools_lock = threading.Lock()
+
+
+def init_worker_pools():
+    """Creates the inference, CPU and I/O pools sized from the settings."""
+    settings = get_settings()
+    with _worker_pools_lock:
+        if _worker_pools:
+            return
+        _worker_pools[WorkerPoolEnum.INFERENCE] = WorkerPool(
+            name=WorkerPoolEnum.INFERENCE.value,
+            max_workers=settings.INFERENCE_POOL_WORKERS,
+            max_queue_size=settings.INFERENCE_POOL_QUEUE_SIZE,
+        )
+        _worker_pools[WorkerPoolEnum.CPU] = WorkerPool(
+            name=WorkerPoolEnum.CPU.value,
+            max_workers=settings.CPU_POOL_WORKERS,
+            max_queue_size=settings.CPU_POOL_QUEUE_SIZE,
+            use_processes=True,
+        )
+        _worker_pools[WorkerPoolEnum.IO] = WorkerPool(
+            name=WorkerPoolEnum.IO.value,
+            max_workers=settings.IO_POOL_WORKERS,
+            max_queue_size=settings.IO_POOL_QUEUE_SIZE,
+        )
+    logger.info("Worker pools initialized: " + ", ".join(pool.value for pool in _worker_pools))
+
+
+def get_worker_pool(pool: WorkerPoolEnum) -> WorkerPool:
+    if not _worker_pools:
+        init_worker_pools()
+    return _worker_pools[pool]
+
+
+async def run_in_pool(pool: WorkerPoolEnum, func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Runs a blocking callable on the given worker pool without blocking the event loop."""
+    return await get_worker_pool(pool).run(func, *args, **kwargs)
+
+
+def get_worker_pools_stats() -> dict:
+    return {pool.value: worker_pool.stats() for pool, worker_pool in _worker_pools.items()}
+
+
+def shutdown_worker_pools(wait: bool = True):
+    with _worker_pools_lock:
+        for worker_pool in _worker_pools.values():
+            worker_pool.shutdown(wait=wait)
+        _worker_pools.clear()
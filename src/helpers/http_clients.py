@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+
+from helpers.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+OPENAI_API_URL = "https://api.openai.com/v1"
+
+# Used until `init_http_clients` applies the settings
+_options = {
+    "connect_timeout": 10.0,
+    "read_timeout": 120.0,
+    "generation_read_timeout": 0,
+    "max_connections_per_host": 20,
+    "keepalive_seconds": 60.0,
+    "http2": True,
+}
+
+_sync_clients: Dict[str, httpx.Client] = {}
+# Async clients and their request slots are bound to the event loop they were created on
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, tuple]]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def init_http_clients():
+    """Applies the HTTP client settings; clients created afterwards use them."""
+    settings = get_settings()
+    _options.update(
+        connect_timeout=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.HTTP_READ_TIMEOUT_SECONDS,
+        generation_read_timeout=settings.HTTP_GENERATION_READ_TIMEOUT_SECONDS,
+        max_connections_per_host=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        keepalive_seconds=settings.HTTP_KEEPALIVE_SECONDS,
+        http2=settings.HTTP2_ENABLED,
+    )
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package."""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def host_key(url: str) -> str:
+    """Clients are shared per scheme, host and port."""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _client_options() -> dict:
+    http2 = _options["http2"] and http2_available()
+    return {
+        "timeout": httpx.Timeout(_options["read_timeout"], connect=_options["connect_timeout"]),
+        "limits": httpx.Limits(max_connections=_options["max_connections_per_host"],
+                               max_keepalive_connections=_options["max_connections_per_host"],
+                               keepalive_expiry=_options["keepalive_seconds"]),
+        "http2": http2,
+    }
+
+
+def generation_timeout() -> httpx.Timeout:
+    """
+    Per-request timeout for non-streaming generations, which send nothing until the
+    whole answer is ready, so the read timeout of the shared clients would cut long
+    answers short. HTTP_GENERATION_READ_TIMEOUT_SECONDS of 0 waits without limit.
+    """
+    return httpx.Timeout(_options["generation_read_timeout"] or None, connect=_options["connect_timeout"])
+
+
+def get_http_client(url: str) -> httpx.Client:
+    """
+    Returns the process-wide blocking client for the host of `url`.
+
+    Connections are kept alive and reused across requests and threads; at most
+    HTTP_MAX_CONNECTIONS_PER_HOST are open to the host at once, further requests wait
+    for a free connection.
+    """
+    key = host_key(url)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(**_client_options())
+            _sync_clients[key] = client
+        return client
+
+
+def _get_async_entry(url: str) -> tuple:
+    loop = asyncio.get_running_loop()
+    key = host_key(url)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        entry = clients.get(key)
+        if entry is None or entry[0].is_closed:
+            entry = (httpx.AsyncClient(**_client_options()), asyncio.Semaphore(_options["max_connections_per_host"]))
+            clients[key] = entry
+        return entry
+
+
+def get_async_http_client(url: str) -> httpx.AsyncClient:
+    """Returns the async client for the host of `url` on the running event loop, like `get_http_client`."""
+    return _get_async_entry(url)[0]
+
+
+@asynccontextmanager
+async def host_request_slot(url: str):
+    """
+    Holds one of the host's HTTP_MAX_CONNECTIONS_PER_HOST request slots. Over HTTP/2,
+    requests share connections, so the slots are what bounds concurrency per host.
+    """
+    semaphore = _get_async_entry(url)[1]
+    async with semaphore:
+        yield
+
+
+def close_http_clients():
+    """Closes the blocking clients; async clients are closed by `aclose_http_clients`."""
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        client.close()
+
+
+async def aclose_http_clients():
+    """Closes the async clients of the running event loop."""
+    with _lock:
+        entries = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+    for client, _ in entries:
+        await client.aclose()
@@ -0,0 +1,192 @@
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from helpers.config import get_settings
+from helpers.metrics import time_stage
+from models.enums.PipelineStageEnum import PipelineStageEnum
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_model_size(model: Any) -> int:
+    """
+    Estimates the memory footprint of a loaded model in bytes.
+
+    Torch modules (SentenceTransformer, HF models) are measured by their parameters
+    and buffers; tuples such as (tokenizer, model) are summed element by element.
+    Anything else counts as 0 bytes, so it never triggers eviction on its own.
+    """
+    if isinstance(model, (tuple, list)):
+        return sum(estimate_model_size(item) for item in model)
+
+    size = 0
+    for attribute in ("parameters", "buffers"):
+        tensors = getattr(model, attribute, None)
+        if not callable(tensors):
+            continue
+        try:
+            size += sum(t.numel() * t.element_size() for t in tensors())
+        except Exception:
+            pass
+    return size
+
+
+class _RegistryEntry:
+
+    def __init__(self, model: Any, size_bytes: int):
+        self.model = model
+        self.size_bytes = size_bytes
+        self.ref_count = 0
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models keyed by (provider, model_id).
+
+    - Models are loaded at most once and shared between every caller.
+    - Each `acquire` increments a reference count that `release` decrements.
+    - When the total estimated size exceeds the memory budget, the least recently
+      used models with no remaining references are evicted.
+    """
+
+    def __init__(self, memory_budget_mb: int, size_estimator: Callable[[Any], int] = estimate_model_size):
+        self.memory_budget_bytes = memory_budget_mb * 1024 * 1024
+        self.size_estimator = size_estimator
+
+        self._entries: "OrderedDict[Hashable, _RegistryEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(provider: str, model_id: str) -> tuple:
+        return (str(getattr(provider, "value", provider)), str(getattr(model_id, "value", model_id)))
+
+    def _get_or_load(self, key: tuple, loader: Callable[[], Any], references: int = 0) -> _RegistryEntry:
+        """
+        Returns the entry of `key`, loading it on first use. The `references` the caller
+        takes are added under the same lock that finds or stores the entry, so no eviction
+        can drop it in between.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry.ref_count += references
+                return entry
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Load outside the registry lock so other models stay available,
+        # but make sure concurrent callers only load the same model once.
+        with load_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    entry.ref_count += references
+                    return entry
+
+            logger.info(f"Loading model {key[1]} for provider {key[0]}")
+            with time_stage(PipelineStageEnum.MODEL_LOAD):
+                model = loader()
+            entry = _RegistryEntry(model=model, size_bytes=self.size_estimator(model))
+            entry.ref_count = references
+
+            with self._lock:
+                self._entries[key] = entry
+                self.loads += 1
+                self._load_locks.pop(key, None)
+                return entry
+
+    def acquire(self, provider: str, model_id: str, loader: Callable[[], Any]) -> Any:
+        """
+        Returns the shared model for (provider, model_id), loading it with `loader` on first use.
+        The caller holds a reference until it calls `release`.
+        """
+        key = self._key(provider, model_id)
+        entry = self._get_or_load(key, loader, references=1)
+        with self._lock:
+            self._evict_if_needed()
+        return entry.model
+
+    def release(self, provider: str, model_id: str):
+        """Drops one reference to (provider, model_id), making it evictable once unused."""
+        key = self._key(provider, model_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.ref_count == 0:
+                return
+            entry.ref_count -= 1
+            self._evict_if_needed()
+
+    def warm_up(self, provider: str, model_id: str, loader: Callable[[], Any]):
+        """Loads a model ahead of the first request without holding a reference to it."""
+        key = self._key(provider, model_id)
+        self._get_or_load(key, loader)
+        with self._lock:
+            self._evict_if_needed()
+
+    def is_loaded(self, provider: str, model_id: str) -> bool:
+        with self._lock:
+            return self._key(provider, model_id) in self._entries
+
+    def total_size_bytes(self) -> int:
+        with self._lock:
+            return sum(entry.size_bytes for entry in self._entries.values())
+
+    def _evict_if_needed(self):
+        total = sum(entry.size_bytes for entry in self._entries.values())
+        if total <= self.memory_budget_bytes:
+            return
+
+        # Iterate oldest first; models still referenced are never evicted.
+        for key in list(self._entries.keys()):
+            if total <= self.memory_budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.ref_count > 0:
+                continue
+            del self._entries[key]
+            total -= entry.size_bytes
+            self.evictions += 1
+            logger.info(f"Evicted model {key[1]} for provider {key[0]} ({entry.size_bytes} bytes)")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded_models": [
+                    {"provider": key[0], "model_id": key[1], "size_bytes": entry.size_bytes, "ref_count": entry.ref_count}
+                    for key, entry in self._entries.items()
+                ],
+                "total_size_bytes": sum(entry.size_bytes for entry in self._entries.values()),
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_embedding_model_registry() -> ModelRegistry:
+    """Returns the process-wide registry shared by all embedding providers."""
+    settings = get_settings()
+    return ModelRegistry(memory_budget_mb=settings.EMBEDDING_MODELS_MEMORY_BUDGET_MB)
+
+
+@lru_cache(maxsize=None)
+def get_reranking_model_registry() -> ModelRegistry:
+    """Returns the process-wide registry shared by all reranking providers."""
+    settings = get_settings()
+    return ModelRegistry(memory_budget_mb=settings.RERANKING_MODELS_MEMORY_BUDGET_MB)
@@ -0,0 +1,34 @@
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class StartupReport:
+    """
+    Wall-clock time of each application startup step, kept in the order the steps ran.
+
+    A step that raises is still recorded, so a slow failure shows up in the report.
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, float] = {}
+
+    def record(self, name: str, seconds: float):
+        self.steps[name] = self.steps.get(name, 0.0) + seconds
+
+    @contextmanager
+    def step(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(self.steps.values())
+
+    def format(self) -> str:
+        width = max((len(name) for name in self.steps), default=0)
+        lines = [f"  {name:<{width}}  {seconds * 1000:8.1f} ms" for name, seconds in self.steps.items()]
+        return "\n".join([f"⏱️ Startup took {self.total_seconds:.3f}s"] + lines)
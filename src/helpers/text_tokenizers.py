@@ -0,0 +1,100 @@
+import logging
+import time
+from functools import lru_cache
+from typing import List
+
+from helpers.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Punkt sentence models used by sentence and word chunking
+PUNKT_RESOURCE = "punkt_tab"
+# Seconds before a failed download is tried again; until then only the local lookup is repeated
+DOWNLOAD_RETRY_SECONDS = 300.0
+
+_failed_at = None
+
+
+def punkt_installed() -> bool:
+    """Looks the Punkt models up in NLTK_DATA_DIR and NLTK's default paths, without downloading."""
+    # nltk pulls in scipy and sklearn; only sentence and word chunking need it
+    import nltk
+
+    settings = get_settings()
+    if settings.NLTK_DATA_DIR and settings.NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, settings.NLTK_DATA_DIR)
+    try:
+        nltk.data.find(f"tokenizers/{PUNKT_RESOURCE}")
+        return True
+    except LookupError:
+        return False
+
+
+@lru_cache(maxsize=None)
+def ensure_nltk_resources() -> bool:
+    """
+    Makes sure the Punkt models are available, once per process: they are looked up in
+    NLTK_DATA_DIR and NLTK's default paths, and downloaded only when missing and
+    NLTK_OFFLINE is off. Returns whether they are available; `nltk_resources_available`
+    checks again after a failure.
+    """
+    global _failed_at
+    if punkt_installed():
+        return True
+
+    import nltk
+    settings = get_settings()
+    if settings.NLTK_OFFLINE:
+        logger.warning(f"NLTK resource '{PUNKT_RESOURCE}' is not installed and NLTK_OFFLINE is set; "
+                       "sentence and word chunking are unavailable.")
+        _failed_at = time.monotonic()
+        return False
+
+    if not nltk.download(PUNKT_RESOURCE, download_dir=settings.NLTK_DATA_DIR or None, quiet=True):
+        logger.warning(f"NLTK resource '{PUNKT_RESOURCE}' could not be downloaded; "
+                       "sentence and word chunking are unavailable.")
+        _failed_at = time.monotonic()
+        return False
+    return True
+
+
+def nltk_resources_available() -> bool:
+    """
+    Like `ensure_nltk_resources`, but after a failure looks the models up again locally,
+    so data installed later is picked up, and downloads again only once
+    DOWNLOAD_RETRY_SECONDS have passed since the last failure.
+    """
+    if ensure_nltk_resources():
+        return True
+    if punkt_installed() or time.monotonic() - (_failed_at or 0.0) >= DOWNLOAD_RETRY_SECONDS:
+        ensure_nltk_resources.cache_clear()
+        return ensure_nltk_resources()
+    return False
+
+
+@lru_cache(maxsize=None)
+def get_sentence_tokenizer(language: str = "english"):
+    """Returns the Punkt sentence tokenizer for a language, loaded once and reused."""
+    if not nltk_resources_available():
+        raise LookupError(f"NLTK resource '{PUNKT_RESOURCE}' is not installed. Install it with "
+                          f"`python -m nltk.downloader {PUNKT_RESOURCE}` or point NLTK_DATA_DIR at it.")
+    from nltk.tokenize import PunktTokenizer
+    return PunktTokenizer(language)
+
+
+@lru_cache(maxsize=None)
+def get_word_tokenizer():
+    """Returns the Treebank-style word tokenizer behind nltk.word_tokenize, built once."""
+    from nltk.tokenize import NLTKWordTokenizer
+    return NLTKWordTokenizer()
+
+
+def sent_tokenize(text: str, language: str = "english") -> List[str]:
+    """Same sentences as nltk.sent_tokenize, without looking the model up on every call."""
+    return get_sentence_tokenizer(language).tokenize(text)
+
+
+def word_tokenize(text: str, language: str = "english") -> List[str]:
+    """Same tokens as nltk.word_tokenize: each sentence is split into words."""
+    word_tokenizer = get_word_tokenizer()
+    return [token for sentence in sent_tokenize(text, language) for token in word_tokenizer.tokenize(sentence)]
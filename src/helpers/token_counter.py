@@ -0,0 +1,46 @@
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_token_encoding(model_id: Optional[str] = None):
+    """
+    Returns the tiktoken encoding for a model, built once per model and reused.
+    Unknown models use cl100k_base. Returns None when no encoding can be loaded
+    (e.g. the BPE files cannot be downloaded), in which case callers approximate.
+    """
+    try:
+        if model_id:
+            try:
+                return tiktoken.encoding_for_model(model_id)
+            except KeyError:
+                pass
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"Could not load a tiktoken encoding for '{model_id}', approximating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str, model_id: Optional[str] = None) -> int:
+    """Counts the tokens in `text`, falling back to a whitespace word count without an encoding."""
+    encoding = get_token_encoding(model_id)
+    if encoding is None:
+        return len(text.split())
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int, model_id: Optional[str] = None) -> str:
+    """Cuts `text` down to its first `max_tokens` tokens, by words without an encoding."""
+    encoding = get_token_encoding(model_id)
+    if encoding is None:
+        words = text.split()
+        return text if len(words) <= max_tokens else " ".join(words[:max_tokens])
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
@@ -1,20 +1,29 @@
+import time
+IMPORT_STARTED = time.perf_counter()
+
 from fastapi import FastAPI
-import numpy as np
 import os
-from routes import base , upload , chunk , embed , visualize , retrieve , rerank , generate
+from routes import base , upload , chunk , embed , ingest , jobs , visualize , retrieve , rerank , generate , metrics
 from helpers.config import get_settings
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-from sentence_transformers import SentenceTransformer
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-from stores.reranking.RerankingEnum import RerankingModelsProvidersEnums
-from stores.reranking.RerankingEnum import HuggingFaceLocalModelIdsEnum
-from stores.reranking.RerankingProviderFactory import RerankerProviderFactory
-from stores.llm.LLMProviderFactory import LLMProviderFactory
-from stores.llm.LLMEnum import LLMsProviders
-import torch
+from stores.reranking.RerankingEnum import RerankingModelsProvidersEnums, HuggingFaceLocalModelIdsEnum
+from stores.reranking.providers.HuggingFaceRerankerProvider import HuggingFaceRerankerProvider
+from stores.embedding.EmbeddingEnum import EmbeddingEnum
+from stores.embedding.providers.HuggingFaceLocalEmbeddingProvider import HuggingFaceLocalEmbeddingProvider
+from helpers.model_registry import get_embedding_model_registry, get_reranking_model_registry
+from helpers.executors import init_worker_pools, shutdown_worker_pools
+from helpers.http_clients import init_http_clients, close_http_clients, aclose_http_clients
+from helpers.metrics import MetricsMiddleware
+from helpers.startup import StartupReport
+from helpers.text_tokenizers import ensure_nltk_resources
+from controllers.JobController import JobController
+from models.JobModel import JobModel
+# torch, transformers, sentence_transformers, chromadb and the plotting stack are imported
+# by the code that needs them, so a worker boots without loading them
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
+app.startup_report = StartupReport()
+app.startup_report.record("imports", time.perf_counter() - IMPORT_STARTED)
 
 def initialize_directory(directory_path):
     if not os.path.exists(directory_path):
@@ -24,26 +33,67 @@ def initialize_directory(directory_path):
         print(f"🔹 Directory already exists: {directory_path}")
 
 async def startup_span():
-    settings = get_settings()
+    report = app.startup_report
+    with report.step("settings"):
+        settings = get_settings()
 
     try:
-        initialize_directory(settings.UPLOAD_DIR)
-        initialize_directory(settings.CHUNKS_DIR)
-        initialize_directory(settings.EMBEDDINGS_DIR)
-        initialize_directory(settings.EMBEDDING_MODELS_DIR)
-        initialize_directory(settings.RERANKING_MODELS_DIR)
-        initialize_directory(settings.VISUALIZATIONS_DIR)
-        initialize_directory(settings.VECTORDB_PATH)
-        
-        vectordb_provider_factory = VectorDBProviderFactory()
-        app.vectordb = vectordb_provider_factory.create(provider="chromadb" , path=settings.VECTORDB_PATH)
-        app.vectordb.connect()
-
-
-        reranker = RerankerProviderFactory.get_reranker(
-            provider=RerankingModelsProvidersEnums.HuggingFaceLocal,
-            model_id=HuggingFaceLocalModelIdsEnum.MMACRO_MMINILM_V2_L12
-        )
+        with report.step("directories"):
+            initialize_directory(settings.UPLOAD_DIR)
+            initialize_directory(settings.CHUNKS_DIR)
+            initialize_directory(settings.EMBEDDINGS_DIR)
+            initialize_directory(settings.EMBEDDING_MODELS_DIR)
+            initialize_directory(settings.RERANKING_MODELS_DIR)
+            initialize_directory(settings.VISUALIZATIONS_DIR)
+            initialize_directory(settings.VECTORDB_PATH)
+
+        with report.step("worker_pools"):
+            init_worker_pools()
+        with report.step("http_clients"):
+            init_http_clients()
+
+        # Resolve the sentence tokenizer data once, instead of checking for it on every chunk request
+        with report.step("nltk_resources"):
+            ensure_nltk_resources()
+
+        with report.step("vectordb"):
+            vectordb_provider_factory = VectorDBProviderFactory()
+            app.vectordb = vectordb_provider_factory.create(provider=settings.VECTORDB_PROVIDER , path=settings.VECTORDB_PATH)
+            app.vectordb.connect()
+
+        # Resume unfinished ingestion jobs and start the job workers
+        with report.step("jobs"):
+            app.job_controller = JobController(job_model=JobModel(), vectordb=app.vectordb)
+            await app.job_controller.start()
+
+        # Load the configured embedding models once so the first requests don't pay for it
+        embedding_model_registry = get_embedding_model_registry()
+        for model_id in settings.EMBEDDING_WARMUP_MODELS:
+            try:
+                with report.step(f"embedding_warmup:{model_id}"):
+                    embedding_model_registry.warm_up(
+                        provider=EmbeddingEnum.HUGGINGFACE.value,
+                        model_id=model_id,
+                        loader=lambda model_id=model_id: HuggingFaceLocalEmbeddingProvider.load_model(model_id)
+                    )
+                print(f"✅ Embedding model warmed up: {model_id}")
+            except Exception as e:
+                print(f"❌ Embedding model warm up failed for {model_id} :", e)
+
+        # Load the configured rerankers into the shared reranking model registry
+        reranking_model_registry = get_reranking_model_registry()
+        for model_id in settings.RERANKING_WARMUP_MODELS:
+            try:
+                with report.step(f"reranking_warmup:{model_id}"):
+                    reranking_model_registry.warm_up(
+                        provider=RerankingModelsProvidersEnums.HuggingFaceLocal.value,
+                        model_id=model_id,
+                        loader=lambda model_id=model_id: HuggingFaceRerankerProvider.load_model(
+                            HuggingFaceLocalModelIdsEnum(model_id))
+                    )
+                print(f"✅ Reranking model warmed up: {model_id}")
+            except Exception as e:
+                print(f"❌ Reranking model warm up failed for {model_id} :", e)
 
   
 
@@ -79,12 +129,17 @@ async def startup_span():
     except Exception as e:
         print("❌ Connection failed :", e)
 
+    print(report.format())
     print(settings.APP_NAME + " Has started")
 
 
 async def shutdown_span():
     settings = get_settings()
+    await app.job_controller.stop()
     app.vectordb.disconnect()
+    shutdown_worker_pools()
+    close_http_clients()
+    await aclose_http_clients()
     # app.mongodb_connection.close()
     print(settings.APP_NAME + " Has Stopped")
 
@@ -95,7 +150,10 @@ app.include_router(base.base_router)
 app.include_router(upload.upload_router)
 app.include_router(chunk.chunk_router)
 app.include_router(embed.embed_router)
+app.include_router(ingest.ingest_router)
+app.include_router(jobs.jobs_router)
 app.include_router(visualize.visualize_router)
 app.include_router(retrieve.retrieve_router)
 app.include_router(rerank.rerank_router)
 app.include_router(generate.generate_router)
+app.include_router(metrics.metrics_router)
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from models.db_schemes.JobSchema import JobSchema
+from models.enums.JobStatusEnum import JobStatusEnum
+from models.BaseDataModel import BaseDataModel
+
+class JobModel(BaseDataModel):
+    """
+    Persists ingestion jobs in a local SQLite file so they survive restarts.
+
+    Queries and commits block, so they run on the store's own thread rather than the
+    shared I/O pool: background jobs wait for the store instead of failing when request
+    traffic saturates that pool.
+    """
+
+    def __init__(self, db_path: str = None):
+        super().__init__()
+        self.db_path = db_path or self.app_settings.JOBS_DB_PATH
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job-store")
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "job_id TEXT PRIMARY KEY, status TEXT NOT NULL, params TEXT NOT NULL, progress TEXT NOT NULL, "
+            "error TEXT, attempts INTEGER NOT NULL, created_at REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def __to_job(row) -> JobSchema:
+        job_id, status, params, progress, error, attempts, created_at, updated_at = row
+        return JobSchema(job_id=job_id, status=status, params=json.loads(params), progress=json.loads(progress),
+                         error=error, attempts=attempts, created_at=created_at, updated_at=updated_at)
+
+    async def __run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def insert_job(self, job: JobSchema) -> str:
+        await self.__run(self.__insert_job, job)
+        return job.job_id
+
+    async def get_job(self, job_id: str) -> Optional[JobSchema]:
+        return await self.__run(self.__get_job, job_id)
+
+    async def get_jobs(self, statuses: List[JobStatusEnum] = None) -> List[JobSchema]:
+        """Retrieve jobs, oldest first, optionally filtered by status."""
+        return await self.__run(self.__get_jobs, statuses)
+
+    async def update_job(self, job: JobSchema):
+        await self.__run(self.__update_job, job)
+
+    def __insert_job(self, job: JobSchema):
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO jobs (job_id, status, params, progress, error, attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.job_id, job.status.value, json.dumps(job.params), json.dumps(job.progress),
+                 job.error, job.attempts, job.created_at, job.updated_at),
+            )
+            self._connection.commit()
+
+    def __get_job(self, job_id: str) -> Optional[JobSchema]:
+        with self._lock:
+            row = self._connection.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self.__to_job(row) if row else None
+
+    def __get_jobs(self, statuses: List[JobStatusEnum] = None) -> List[JobSchema]:
+        query, args = "SELECT * FROM jobs", []
+        if statuses:
+            query += f" WHERE status IN ({','.join('?' * len(statuses))})"
+            args = [status.value for status in statuses]
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY created_at", args).fetchall()
+        return [self.__to_job(row) for row in rows]
+
+    def __update_job(self, job: JobSchema):
+        with self._lock:
+            self._connection.execute(
+                "UPDATE jobs SET status = ?, progress = ?, error = ?, attempts = ?, updated_at = ? WHERE job_id = ?",
+                (job.status.value, json.dumps(job.progress), job.error, job.attempts, job.updated_at, job.job_id),
+            )
+            self._connection.commit()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            self._connection.close()
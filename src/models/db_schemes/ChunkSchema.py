@@ -8,6 +8,7 @@ class ChunkSchema(BaseModel):
     chunk_id: str = Field(..., min_length=1)
     content: str = Field(..., min_length=1)
     source: Optional[str] = Field(None)  # URL or document name
+    page: Optional[int] = Field(None, ge=0)  # Page of the document, from 0
     chunk_index: int = Field(..., ge=0)  # Position in the document
     embedding: Optional[List[float]] = Field(None)  # Vector representation
 
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from models.enums.JobStatusEnum import JobStatusEnum
+
+
+class JobSchema(BaseModel):
+    job_id: str = Field(..., min_length=1)
+    status: JobStatusEnum = Field(JobStatusEnum.PENDING)
+    params: dict = Field(default_factory=dict)  # Ingest request parameters
+    progress: dict = Field(default_factory=dict)  # Pages parsed, chunks embedded, vectors written, ...
+    error: Optional[str] = Field(None)
+    attempts: int = Field(0, ge=0)
+    created_at: float = Field(...)
+    updated_at: float = Field(...)
@@ -0,0 +1,13 @@
+from enum import Enum
+
+class PipelineStageEnum(str, Enum):
+    PDF_PARSING = "pdf_parsing"            # Per page
+    CHUNKING = "chunking"
+    EMBEDDING = "embedding"
+    VECTOR_INSERT = "vector_insert"
+    VECTOR_QUERY = "vector_query"
+    LEXICAL_QUERY = "lexical_query"
+    RERANKING = "reranking"
+    LLM_GENERATION = "llm_generation"      # Cache hits excluded
+    LLM_FIRST_TOKEN = "llm_first_token"    # Streamed generations, until the first token
+    MODEL_LOAD = "model_load"
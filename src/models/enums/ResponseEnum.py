@@ -10,4 +10,5 @@ class ResponseSignal(Enum):
     PROCESSING_SUCCESS = "processing_success"
     PROCESSING_FAILED = "processing_failed"
     CHUNKS_EMBEDDED_SUCCESSFULLY = "Chunks embedded successfully"
-    UNEXPECTED_ERROR = "An unexpected error occurred. Please try again later."
\ No newline at end of file
+    UNEXPECTED_ERROR = "An unexpected error occurred. Please try again later."
+    SERVER_BUSY = "The server is busy. Please try again later."
\ No newline at end of file
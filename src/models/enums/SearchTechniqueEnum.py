@@ -2,3 +2,6 @@ from enum import Enum
 
 class SearchTechniqueEnums(Enum):
     SEMANTIC_SEARCH = "semantic_search"
+    BM25 = "BM25"
+    TF_IDF = "TF-IDF"
+    HYBRID = "Hybrid"
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class WorkerPoolEnum(str, Enum):
+    INFERENCE = "inference"  # Model inference (torch releases the GIL, so threads scale)
+    CPU = "cpu"              # Pure-Python / numpy CPU work, run in separate processes
+    IO = "io"                # Blocking network, disk and vector DB calls
@@ -3,9 +3,11 @@ from fastapi.responses import JSONResponse
 import logging
 import os
 from controllers.FileController import FileController
-from controllers.ChunkController import ChunkController
+from controllers.ChunkController import ChunkController, get_chunk_controller
 from helpers.config import get_settings
 from models.enums.ChunkingEnum import ChunkingEnum
+from models.enums.ResponseEnum import ResponseSignal
+from helpers.executors import PoolSaturatedError
 from pydantic import BaseModel, Field
 
 # Configure logging
@@ -22,10 +24,6 @@ chunk_router = APIRouter(
 def get_file_controller() -> FileController:
     return FileController()
 
-# Dependency injection function for ChunkController
-def get_chunk_controller() -> ChunkController:
-    return ChunkController()
-
 class ChunkRequest(BaseModel):
     file_name: str = Field(..., min_length=1, description="The name of the file to be chunked")
     chunking_method: ChunkingEnum = ChunkingEnum.RECURSIVE  # Default value
@@ -75,7 +73,7 @@ async def chunk_file(
             raise HTTPException(status_code=400, detail="Chunking failed, no chunks were generated.")
 
         # Save chunks to a file
-        chunk_file_name = os.path.splitext(request_data.file_name)[0] + "_chunks.json"
+        chunk_file_name = chunk_controller.get_chunk_file_name(request_data.file_name)
         logger.info(f"Saving chunks to {chunk_file_name} in {settings.CHUNKS_DIR}")
         await chunk_controller.save_chunks(
             chunks=chunks, file_directory=settings.CHUNKS_DIR, file_name=chunk_file_name
@@ -95,6 +93,10 @@ async def chunk_file(
         logger.error(f"File not found: {request_data.file_name}")
         raise HTTPException(status_code=400, detail=f"File '{request_data.file_name}' not found.")
 
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
     except ValueError as e:
         logger.error(f"Invalid value encountered: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
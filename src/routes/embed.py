@@ -9,9 +9,11 @@ import time
 from helpers.config import get_settings
 from stores.embedding.EmbeddingEnum import EmbeddingEnum
 from stores.embedding.EmbeddingProviderFactory import EmbeddingProviderFactory
-from controllers.ChunkController import ChunkController
+from stores.embedding.EmbeddingCache import get_embedding_cache
+from controllers.ChunkController import ChunkController, get_chunk_controller
 from controllers.EmbeddingController import EmbeddingController
 from models.enums.ResponseEnum import ResponseSignal
+from helpers.executors import PoolSaturatedError
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -31,9 +33,6 @@ class EmbeddingRequest(BaseModel):
     max_input_token: int = Field(..., gt=0, description="Maximum number of input tokens")
 
 # Dependency injection functions
-def get_chunk_controller() -> ChunkController:
-    return ChunkController()
-
 def get_embedding_controller() -> EmbeddingController:
     return EmbeddingController()
 
@@ -77,26 +76,27 @@ async def embed_chunks(
         start_time = time.perf_counter()
 
         # Load chunks
-        chunk_file_name = os.path.splitext(embedding_request.file_name)[0] + "_chunks.json"
+        chunk_file_name = chunk_controller.get_chunk_file_name(embedding_request.file_name)
         logger.info(f"Loading chunks from file: {chunk_file_name}")
 
-        chunks = await chunk_controller.load_chunks(file_directory=settings.CHUNKS_DIR, file_name=chunk_file_name)
+        chunks = list(await chunk_controller.load_chunks(file_directory=settings.CHUNKS_DIR, file_name=chunk_file_name))
 
         if not chunks:
             logger.warning(f"No chunks found in {chunk_file_name}")
             raise HTTPException(status_code=400, detail="No chunks available for embedding.")
 
-        # Generate embeddings
-        logger.info(f"Generating embeddings using provider: {embedding_request.provider}")
-        vectors = embedding_client.generate_embedding(chunks)
-
-        # Save in vector database
-        collection_name = os.path.splitext(embedding_request.file_name)[0]
-
-        logger.info(f"Saving embeddings to vector database (collection: {collection_name})")
-        request.app.vectordb.delete_collection(collection_name)
-        request.app.vectordb.create_collection(collection_name)
-        request.app.vectordb.add_vectors(collection_name=collection_name, documents=chunks, embeddings=vectors)
+        # Embed and save only new or changed chunks in the vector database
+        collection_name = embedding_controller.get_collection_name(embedding_request.file_name)
+
+        logger.info(f"Reindexing collection {collection_name} using provider: {embedding_request.provider}")
+        reindex_stats = await embedding_controller.reindex_collection(
+            vectordb=request.app.vectordb,
+            embedding_client=embedding_client,
+            collection_name=collection_name,
+            chunks=chunks,
+            source=embedding_request.file_name,
+            shared=embedding_controller.uses_shared_collection,
+        )
 
         # Calculate execution time
         execution_time = time.perf_counter() - start_time
@@ -106,13 +106,32 @@ async def embed_chunks(
             content={
                 "message": ResponseSignal.CHUNKS_EMBEDDED_SUCCESSFULLY.value,
                 "execution_time_seconds": execution_time,
+                **reindex_stats,
             }
         )
 
     except FileNotFoundError:
         logger.error(f"File not found: {embedding_request.file_name}")
         raise HTTPException(status_code=404, detail="File not found.")
+
+    except ValueError as e:
+        logger.error(f"Invalid value encountered: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
+    except HTTPException as http_exc:
+        raise http_exc
     
     except Exception as e:
         logger.exception(f"Unexpected error occurred: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error. Please try again later.")
+
+@embed_router.get("/cache")
+async def embedding_cache_stats():
+    """
+    Returns hit/miss counters of the embedding cache shared by the embed and retrieve routes.
+    """
+    return JSONResponse(content=get_embedding_cache().stats())
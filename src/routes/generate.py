@@ -1,13 +1,20 @@
 from fastapi import APIRouter, Request, Depends, Header, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import AsyncIterator, Optional, List
+import anyio
+import asyncio
+import json
 import logging
 
-from controllers.NLPController import NLPController
+from controllers.NLPController import NLPController, format_generation_query
 from models.enums.LLMEnums import LLMEnums
 from stores.llm.LLMProviderFactory import LLMProviderFactory
 from stores.llm.LLMEnum import LLMsProviders
+from stores.llm.ResponseCache import response_cache_key, get_response_cache
+from helpers.config import get_settings
+from helpers.executors import PoolSaturatedError
+from models.enums.ResponseEnum import ResponseSignal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -22,15 +29,64 @@ generate_router = APIRouter(
 class GenerateRequest(BaseModel):
     query: str = Field(..., description="User query for LLM generation.")
     docs: List[str] = Field(..., description="List of documents to provide context.")
+    doc_scores: Optional[List[float]] = Field(None, description="Relevance of each document, higher is better; defaults to the order of `docs`.")
     provider: LLMsProviders = Field(..., description="LLM provider to use.")
     base_url: str = Field(..., description="Base URL of the LLM service.")
     model_id: str = Field(..., description="Model identifier for the LLM provider.")
     system_prompt: Optional[str] = Field(None, description="Custom system prompt (if any).")
+    stream: bool = Field(False, description="Stream the response as server-sent events.")
+
+# Questions are short; longer ones are truncated before embedding
+CACHE_EMBEDDING_MAX_INPUT_TOKEN = 512
 
 def get_nlp_controller() -> NLPController:
     """Dependency injection for NLPController instance."""
     return NLPController()
 
+def get_cache_embedding_client(api_key: Optional[str]):
+    """
+    Returns the client embedding questions for near-duplicate response cache hits, or
+    None when RESPONSE_CACHE_EMBEDDING_PROVIDER is not set. Remote providers use the
+    request's api-key.
+    """
+    settings = get_settings()
+    if not settings.RESPONSE_CACHE_ENABLED or not settings.RESPONSE_CACHE_EMBEDDING_PROVIDER:
+        return None
+    # Imported here so serving generations does not load the local embedding stack unless configured
+    from stores.embedding.EmbeddingProviderFactory import EmbeddingProviderFactory
+    return EmbeddingProviderFactory(api_key=api_key,
+                                    model_id=settings.RESPONSE_CACHE_EMBEDDING_MODEL_ID,
+                                    max_input_token=CACHE_EMBEDDING_MAX_INPUT_TOKEN,
+                                    ).create(provider=settings.RESPONSE_CACHE_EMBEDDING_PROVIDER)
+
+def sse_event(data: dict, event: str = None) -> str:
+    """Formats one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+async def stream_events(tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+    """
+    Relays LLM tokens as `data: {"token": ...}` events, then a `done` event.
+    Failures after the response has started are sent as an `error` event.
+
+    When the client disconnects, Starlette cancels the response; the cancellation
+    reaches the LLM request, which closes its connection instead of generating on.
+    """
+    try:
+        async for token in tokens:
+            yield sse_event({"token": token})
+        yield sse_event({}, event="done")
+    except asyncio.CancelledError:
+        logger.info("Client disconnected, LLM stream cancelled.")
+        raise
+    except Exception as e:
+        logger.error(f"LLM stream failed: {str(e)}", exc_info=True)
+        yield sse_event({"detail": "LLM generation failed."}, event="error")
+    finally:
+        # Shielded, so closing the upstream request isn't cut short by the cancellation itself
+        with anyio.CancelScope(shield=True):
+            await tokens.aclose()
+
 @generate_router.post("/")
 async def generate_response(
     request: Request,
@@ -41,8 +97,11 @@ async def generate_response(
     """
     Generates a response using an LLM based on the given query and document context.
 
+    With `stream` set, the response is sent as server-sent events while the LLM produces
+    it: one `data: {"token": ...}` event per piece of text, then an `event: done` event.
+
     Returns:
-        JSONResponse containing the generated response.
+        JSONResponse containing the generated response, or a text/event-stream response.
     """
 
     try:
@@ -62,14 +121,32 @@ async def generate_response(
             logger.error(f"Failed to initialize LLM provider: {generate_request.provider}")
             raise HTTPException(status_code=400, detail="Invalid LLM provider configuration.")
 
-        # Generate formatted query
-        query = await nlp_controller.create_generation_query(
-            question=generate_request.query, 
-            docs=generate_request.docs
+        if generate_request.doc_scores is not None and len(generate_request.doc_scores) != len(generate_request.docs):
+            raise HTTPException(status_code=400, detail="doc_scores must have one score per document.")
+
+        # Select the context passages within the token budget, and format the query over them
+        passages = nlp_controller.select_generation_context(
+            docs=generate_request.docs,
+            scores=generate_request.doc_scores,
+            model_id=generate_request.model_id
         )
+        query = format_generation_query(generate_request.query, passages)
+
+        if generate_request.stream:
+            tokens = nlp_controller.stream_response(llm_client=llm_client, query=query)
+            return StreamingResponse(stream_events(tokens), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
-        # Generate response from LLM
-        response = await nlp_controller.generate_response(llm_client=llm_client, query=query)
+        # Generate response from LLM, or serve it from the response cache
+        cache_key = response_cache_key(provider=generate_request.provider.value,
+                                       model_id=generate_request.model_id,
+                                       base_url=generate_request.base_url,
+                                       system_prompt=system_prompt,
+                                       passages=passages,
+                                       question=generate_request.query)
+        response = await nlp_controller.generate_response(llm_client=llm_client, query=query,
+                                                          cache_key=cache_key,
+                                                          embedding_client=get_cache_embedding_client(api_key))
 
         logger.info("LLM response generated successfully.")
         return {"response": response}
@@ -77,6 +154,17 @@ async def generate_response(
     except HTTPException as http_exc:
         raise http_exc  # Propagate known errors
 
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
     except Exception as e:
         logger.error(f"Unexpected error during LLM generation: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+@generate_router.get("/cache")
+async def response_cache_stats():
+    """
+    Returns hit/miss counters of the response cache, with exact and near-duplicate hits counted apart.
+    """
+    return JSONResponse(content=get_response_cache().stats())
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Request, Header, Depends, HTTPException
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+import functools
+import logging
+import os
+import time
+
+from helpers.config import get_settings
+from stores.embedding.EmbeddingEnum import EmbeddingEnum
+from stores.embedding.EmbeddingProviderFactory import EmbeddingProviderFactory
+from controllers.FileController import FileController
+from controllers.ChunkController import ChunkController, get_chunk_controller
+from controllers.IngestController import IngestController
+from models.enums.ChunkingEnum import ChunkingEnum
+from models.enums.ResponseEnum import ResponseSignal
+from helpers.executors import PoolSaturatedError
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# FastAPI router
+ingest_router = APIRouter(
+    prefix="/api/v1/ingest",
+    tags=["api_v1", "ingest"],
+)
+
+# Pydantic model for request body validation
+class IngestRequest(BaseModel):
+    file_name: str = Field(..., min_length=1, description="The name of the uploaded file to ingest")
+    chunking_method: ChunkingEnum = ChunkingEnum.RECURSIVE
+    chunk_size: int = Field(100, gt=0, description="Size of each chunk, must be > 0")
+    chunk_overlap: int = Field(20, ge=0, description="Size of chunk overlap, must be ≥ 0")
+    provider: EmbeddingEnum = Field(..., description="Embedding provider")
+    model_id: str = Field(..., description="Model identifier")
+    max_input_token: int = Field(..., gt=0, description="Maximum number of input tokens")
+
+# Dependency injection functions
+def get_file_controller() -> FileController:
+    return FileController()
+
+def get_ingest_controller() -> IngestController:
+    return IngestController()
+
+@ingest_router.post("/")
+async def ingest_file(
+    request: Request,
+    ingest_request: IngestRequest,
+    api_key: Optional[str] = Header(None, alias="api-key"),
+    file_controller: FileController = Depends(get_file_controller),
+    chunk_controller: ChunkController = Depends(get_chunk_controller),
+    ingest_controller: IngestController = Depends(get_ingest_controller),
+):
+    """
+    Chunks, embeds and stores an uploaded file in one streaming pass.
+
+    Unlike the separate chunk and embed steps, pages are chunked and embedded while the
+    file is still being parsed, so memory stays bounded and the first chunks become
+    searchable early. Chunks are split per page and no chunk file is written.
+
+    Parameters:
+    - file_name (str): Name of the uploaded file.
+    - chunking_method (ChunkingEnum): Chunking method (default: RECURSIVE).
+    - chunk_size (int): Size of each chunk (default: 100).
+    - chunk_overlap (int): Overlapping size between chunks (default: 20).
+    - provider (EmbeddingEnum): Embedding provider.
+    - model_id (str): Model ID.
+    - max_input_token (int): Maximum allowed tokens for embedding.
+    - api_key (Optional[str]): API key for authentication (sent in headers).
+
+    Returns:
+    - JSONResponse with execution time and page/chunk counts.
+    """
+    settings = get_settings()
+    logger.info(f"Received ingest request for file: {ingest_request.file_name}")
+
+    try:
+        if not await file_controller.file_exists(settings.UPLOAD_DIR, ingest_request.file_name):
+            raise FileNotFoundError(ingest_request.file_name)
+
+        embedding_client = EmbeddingProviderFactory(
+            api_key=api_key,
+            model_id=ingest_request.model_id,
+            max_input_token=ingest_request.max_input_token,
+        ).create(provider=ingest_request.provider)
+
+        start_time = time.perf_counter()
+
+        ingest_stats = await ingest_controller.ingest(
+            vectordb=request.app.vectordb,
+            embedding_client=embedding_client,
+            collection_name=ingest_controller.get_collection_name(ingest_request.file_name),
+            pages=file_controller.iter_file_pages(settings.UPLOAD_DIR, ingest_request.file_name),
+            chunker=functools.partial(chunk_controller.chunk_text,
+                                      method=ingest_request.chunking_method,
+                                      chunk_size=ingest_request.chunk_size,
+                                      chunk_overlap=ingest_request.chunk_overlap),
+            source=ingest_request.file_name,
+            shared=ingest_controller.uses_shared_collection,
+        )
+
+        execution_time = time.perf_counter() - start_time
+        logger.info(f"Ingestion completed in {execution_time:.2f} seconds.")
+
+        return JSONResponse(
+            content={
+                "message": ResponseSignal.CHUNKS_EMBEDDED_SUCCESSFULLY.value,
+                "execution_time_seconds": execution_time,
+                **ingest_stats,
+            }
+        )
+
+    except FileNotFoundError:
+        logger.error(f"File not found: {ingest_request.file_name}")
+        raise HTTPException(status_code=404, detail=f"File '{ingest_request.file_name}' not found.")
+
+    except ValueError as e:
+        logger.error(f"Invalid value encountered: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
+    except HTTPException:
+        raise
+
+    except Exception as e:
+        logger.exception(f"Unexpected error occurred: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error. Please try again later.")
@@ -0,0 +1,103 @@
+from fastapi import APIRouter, Request, Header, Depends, HTTPException, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional
+import json
+import logging
+
+from helpers.config import get_settings
+from controllers.FileController import FileController
+from controllers.JobController import JobController
+from routes.ingest import IngestRequest
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# FastAPI router
+jobs_router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["api_v1", "jobs"],
+)
+
+# Dependency injection functions
+def get_file_controller() -> FileController:
+    return FileController()
+
+def get_job_controller(request: Request) -> JobController:
+    return request.app.job_controller
+
+def job_not_found(job_id: str) -> HTTPException:
+    return HTTPException(status_code=404, detail=f"Job '{job_id}' not found.")
+
+@jobs_router.post("/ingest", status_code=status.HTTP_202_ACCEPTED)
+async def submit_ingest_job(
+    ingest_request: IngestRequest,
+    api_key: Optional[str] = Header(None, alias="api-key"),
+    file_controller: FileController = Depends(get_file_controller),
+    job_controller: JobController = Depends(get_job_controller),
+):
+    """
+    Queues an ingestion job for an uploaded file and returns its job ID right away.
+
+    The job runs the same pipeline as /api/v1/ingest. Poll GET /api/v1/jobs/{job_id}
+    or stream GET /api/v1/jobs/{job_id}/events for its progress.
+    """
+    settings = get_settings()
+    if not await file_controller.file_exists(settings.UPLOAD_DIR, ingest_request.file_name):
+        raise HTTPException(status_code=404, detail=f"File '{ingest_request.file_name}' not found.")
+
+    job = await job_controller.submit(params=ingest_request.model_dump(mode="json"), api_key=api_key)
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=job.model_dump(mode="json"))
+
+@jobs_router.get("/")
+async def list_jobs(job_controller: JobController = Depends(get_job_controller)):
+    """Returns all jobs, oldest first."""
+    jobs = await job_controller.get_jobs()
+    return JSONResponse(content=[job.model_dump(mode="json") for job in jobs])
+
+@jobs_router.get("/{job_id}")
+async def get_job(job_id: str, job_controller: JobController = Depends(get_job_controller)):
+    """Returns the status and progress of a job."""
+    job = await job_controller.get_job(job_id)
+    if job is None:
+        raise job_not_found(job_id)
+    return JSONResponse(content=job.model_dump(mode="json"))
+
+@jobs_router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request, job_controller: JobController = Depends(get_job_controller)):
+    """
+    Streams the job as server-sent events, one event per state change,
+    until the job completes, fails or is cancelled.
+    """
+    if await job_controller.get_job(job_id) is None:
+        raise job_not_found(job_id)
+
+    async def events():
+        async for job in job_controller.stream_job(job_id):
+            if await request.is_disconnected():
+                break
+            yield f"data: {json.dumps(job.model_dump(mode='json'))}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@jobs_router.post("/{job_id}/cancel")
+async def cancel_job(job_id: str, job_controller: JobController = Depends(get_job_controller)):
+    """Cancels a pending or running job."""
+    try:
+        job = await job_controller.cancel(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise job_not_found(job_id)
+    return JSONResponse(content=job.model_dump(mode="json"))
+
+@jobs_router.post("/{job_id}/retry")
+async def retry_job(job_id: str, job_controller: JobController = Depends(get_job_controller)):
+    """Queues a failed or cancelled job again."""
+    try:
+        job = await job_controller.retry(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if job is None:
+        raise job_not_found(job_id)
+    return JSONResponse(content=job.model_dump(mode="json"))
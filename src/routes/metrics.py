@@ -0,0 +1,92 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import PlainTextResponse
+
+from helpers.metrics import REGISTRY, MetricFamily
+from helpers.executors import get_worker_pools_stats
+from helpers.model_registry import get_embedding_model_registry, get_reranking_model_registry
+from stores.embedding.EmbeddingCache import get_embedding_cache
+from stores.llm.ResponseCache import get_response_cache
+
+# Served at the root, where Prometheus scrapes by default
+metrics_router = APIRouter(
+    tags=["metrics"],
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def worker_pool_metrics():
+    stats = get_worker_pools_stats()
+
+    def samples(field):
+        return [({"pool": pool}, pool_stats[field]) for pool, pool_stats in stats.items()]
+
+    return [
+        MetricFamily("rag_worker_pool_queue_depth", "gauge", "Jobs waiting for a free worker.", samples("queue_depth")),
+        MetricFamily("rag_worker_pool_running", "gauge", "Jobs running on the pool.", samples("running")),
+        MetricFamily("rag_worker_pool_completed_total", "counter", "Jobs the pool finished.", samples("completed")),
+        MetricFamily("rag_worker_pool_rejected_total", "counter", "Jobs rejected by a saturated pool.", samples("rejected")),
+    ]
+
+
+def job_metrics(app):
+    job_controller = getattr(app, "job_controller", None)
+    if job_controller is None:
+        return []
+    return [
+        MetricFamily("rag_ingest_jobs_queued", "gauge", "Ingestion jobs waiting for a job worker.",
+                     [({}, job_controller.queue_depth)]),
+        MetricFamily("rag_ingest_jobs_running", "gauge", "Ingestion jobs running.",
+                     [({}, job_controller.running_jobs)]),
+    ]
+
+
+def cache_metrics():
+    # Caches are only read once in use, so scraping never creates one
+    families = []
+    if get_embedding_cache.cache_info().currsize:
+        stats = get_embedding_cache().stats()
+        families += [
+            MetricFamily("rag_embedding_cache_lookups_total", "counter", "Embedding cache lookups by outcome.",
+                         [({"result": "memory_hit"}, stats["memory_hits"]), ({"result": "disk_hit"}, stats["disk_hits"]),
+                          ({"result": "miss"}, stats["misses"])]),
+            MetricFamily("rag_embedding_cache_hit_ratio", "gauge", "Share of embedding cache lookups that hit.",
+                         [({}, stats["hit_ratio"])]),
+        ]
+    if get_response_cache.cache_info().currsize:
+        stats = get_response_cache().stats()
+        families += [
+            MetricFamily("rag_response_cache_lookups_total", "counter", "Response cache lookups by outcome.",
+                         [({"result": "exact_hit"}, stats["exact_hits"]), ({"result": "similar_hit"}, stats["similar_hits"]),
+                          ({"result": "miss"}, stats["misses"])]),
+            MetricFamily("rag_response_cache_hit_ratio", "gauge", "Share of response cache lookups that hit.",
+                         [({}, stats["hit_ratio"])]),
+            MetricFamily("rag_response_cache_items", "gauge", "Responses held by the cache.", [({}, stats["items"])]),
+        ]
+    return families
+
+
+def model_registry_metrics():
+    registries = {"embedding": get_embedding_model_registry, "reranking": get_reranking_model_registry}
+    stats = {name: get_registry().stats() for name, get_registry in registries.items()
+             if get_registry.cache_info().currsize}
+
+    def samples(field):
+        return [({"registry": name}, registry_stats[field]) for name, registry_stats in stats.items()]
+
+    return [
+        MetricFamily("rag_model_loads_total", "counter", "Models loaded into the registry.", samples("loads")),
+        MetricFamily("rag_model_registry_hits_total", "counter", "Model requests served by a loaded model.", samples("hits")),
+        MetricFamily("rag_model_evictions_total", "counter", "Models evicted to stay within the memory budget.", samples("evictions")),
+        MetricFamily("rag_model_registry_bytes", "gauge", "Estimated memory held by loaded models.", samples("total_size_bytes")),
+    ]
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """
+    Returns request latencies, per-stage timings, cache, model registry and queue metrics
+    in the Prometheus text exposition format.
+    """
+    families = worker_pool_metrics() + job_metrics(request.app) + cache_metrics() + model_registry_metrics()
+    return PlainTextResponse(REGISTRY.render(families), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -52,6 +52,8 @@ from controllers.NLPController import NLPController
 from stores.reranking.RerankingProviderFactory import RerankerProviderFactory
 from models.enums.SearchTechniqueEnum import SearchTechniqueEnums
 from stores.reranking.RerankingEnum import RerankingModelsProvidersEnums
+from helpers.executors import PoolSaturatedError
+from models.enums.ResponseEnum import ResponseSignal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -68,6 +70,7 @@ class RerankRequest(BaseModel):
     docs: List[str] = Field(..., description="List of documents to rerank.")
     provider: RerankingModelsProvidersEnums = Field(..., description="Reranking provider to use.")
     model_id: str = Field(..., description="Model identifier for reranker.")
+    top_k: Optional[int] = Field(None, ge=1, description="Return only the top_k most relevant documents.")
 
 def get_nlp_controller() -> NLPController:
     """Dependency injection for NLPController instance."""
@@ -105,12 +108,17 @@ async def rerank(
         reranking_results = await nlp_controller.rerank(
             query=rerank_request.query,
             docs=rerank_request.docs,
+            top_k=rerank_request.top_k,
             reranking_client=reranker_client
         )
 
         logger.info(f"Reranking completed for provider: {rerank_request.provider}, results: {len(reranking_results)}")
         return JSONResponse(content={"results": reranking_results})
 
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
     except Exception as e:
         logger.error(f"Error during reranking: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Request, Depends, Header, HTTPException
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 import logging
 import os
 
@@ -10,6 +10,8 @@ from helpers.config import get_settings
 from models.enums.SearchTechniqueEnum import SearchTechniqueEnums
 from stores.embedding.EmbeddingProviderFactory import EmbeddingProviderFactory
 from stores.embedding.EmbeddingEnum import EmbeddingEnum
+from helpers.executors import PoolSaturatedError
+from models.enums.ResponseEnum import ResponseSignal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,10 +31,35 @@ class RetrieveRequest(BaseModel):
     model_id: str = Field(..., description="Model identifier for the embedding provider.")
     max_input_token: int = Field(..., gt=0, description="Max input tokens for the embedding model.")
 
+class MultiRetrieveRequest(BaseModel):
+    file_names: List[str] = Field(..., min_length=1, max_length=100, description="Names of the uploaded files to search (1-100).")
+    query: str = Field(..., description="User query for semantic search.")
+    search_technique: SearchTechniqueEnums = Field(..., description="Search technique to use.")
+    n_results: int = Field(..., ge=1, le=100, description="Number of search results to return (1-100).")
+    provider: EmbeddingEnum = Field(..., description="Embedding provider to use.")
+    model_id: str = Field(..., description="Model identifier for the embedding provider.")
+    max_input_token: int = Field(..., gt=0, description="Max input tokens for the embedding model.")
+
+class BatchRetrieveQuery(BaseModel):
+    file_name: str = Field(..., description="The name of the file uploaded.")
+    query: str = Field(..., description="User query for semantic search.")
+
+class BatchRetrieveRequest(BaseModel):
+    queries: List[BatchRetrieveQuery] = Field(..., min_length=1, max_length=1000, description="Queries to run (1-1000).")
+    search_technique: SearchTechniqueEnums = Field(..., description="Search technique to use.")
+    n_results: int = Field(..., ge=1, le=100, description="Number of search results per query (1-100).")
+    provider: EmbeddingEnum = Field(..., description="Embedding provider to use.")
+    model_id: str = Field(..., description="Model identifier for the embedding provider.")
+    max_input_token: int = Field(..., gt=0, description="Max input tokens for the embedding model.")
+
 def get_nlp_controller() -> NLPController:
     """Dependency injection for NLPController instance."""
     return NLPController()
 
+def uses_embeddings(search_technique: SearchTechniqueEnums) -> bool:
+    """Lexical techniques answer from the lexical index alone, without an embedding client."""
+    return search_technique in (SearchTechniqueEnums.SEMANTIC_SEARCH, SearchTechniqueEnums.HYBRID)
+
 @retrieve_router.post("/")
 async def retrieve(
     request: Request,
@@ -43,38 +70,53 @@ async def retrieve(
     """
     Handles retrieval requests 
 
-    - Retrieves relevant document chunks based on the query using embeddings.
-    - Uses a specified search technique to retrieve `n_results` from the vector database.
+    - Retrieves relevant document chunks based on the query.
+    - Uses a specified search technique to retrieve `n_results`: semantic search over the
+      vector database, BM25 or TF-IDF over the lexical index, or a hybrid of BM25 and semantic.
 
     Returns:
         JSONResponse containing search results.
     """
     
     try:
-        collection_name = os.path.splitext(retrieve_request.file_name)[0]
+        target = nlp_controller.get_search_targets([retrieve_request.file_name])[0]
 
-        # Initialize embedding provider
-        embedding_provider_factory = EmbeddingProviderFactory(
-            api_key=api_key,
-            model_id=retrieve_request.model_id,
-            max_input_token=retrieve_request.max_input_token
-        )
+        embedding_client = None
+        if uses_embeddings(retrieve_request.search_technique):
+            # Initialize embedding provider
+            embedding_provider_factory = EmbeddingProviderFactory(
+                api_key=api_key,
+                model_id=retrieve_request.model_id,
+                max_input_token=retrieve_request.max_input_token
+            )
 
-        # Create embedding client
-        embedding_client = embedding_provider_factory.create(provider=retrieve_request.provider)
+            # Create embedding client
+            embedding_client = embedding_provider_factory.create(provider=retrieve_request.provider)
 
-        if not embedding_client:
-            logger.error(f"Invalid embedding provider: {retrieve_request.provider}")
-            raise HTTPException(status_code=400, detail="Invalid embedding provider.")
+            if not embedding_client:
+                logger.error(f"Invalid embedding provider: {retrieve_request.provider}")
+                raise HTTPException(status_code=400, detail="Invalid embedding provider.")
 
-        # Perform semantic search
-        search_results = await nlp_controller.semantic_search(
-            collection_name=collection_name,
-            embedding_client=embedding_client,
-            n_results=retrieve_request.n_results,
-            query=retrieve_request.query,
-            vectordb=request.app.vectordb,
-        )
+        if retrieve_request.search_technique == SearchTechniqueEnums.SEMANTIC_SEARCH:
+            # Perform semantic search
+            search_results = await nlp_controller.semantic_search(
+                collection_name=target.collection_name,
+                embedding_client=embedding_client,
+                n_results=retrieve_request.n_results,
+                query=retrieve_request.query,
+                vectordb=request.app.vectordb,
+                where=target.where,
+            )
+        else:
+            # Perform lexical or hybrid search
+            results = await nlp_controller.search(
+                vectordb=request.app.vectordb,
+                embedding_client=embedding_client,
+                queries=[(target, retrieve_request.query)],
+                n_results=retrieve_request.n_results,
+                search_technique=retrieve_request.search_technique,
+            )
+            search_results = [result["document"] for result in results[0]]
 
         logger.info(f"Search completed for file: {retrieve_request.file_name}, results found: {len(search_results)}")
         return {"results": search_results}
@@ -82,6 +124,140 @@ async def retrieve(
     except HTTPException as http_exc:
         raise http_exc  
 
+    except ValueError as e:
+        logger.error(f"Invalid retrieval request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
+    except Exception as e:
+        logger.error(f"Unexpected error during retrieval: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@retrieve_router.post("/batch")
+async def batch_retrieve(
+    request: Request,
+    batch_request: BatchRetrieveRequest,
+    api_key: Optional[str] = Header(None, alias="api-key"),
+    nlp_controller: NLPController = Depends(get_nlp_controller),
+):
+    """
+    Handles batch retrieval requests
+
+    - Embeds all queries in one batched call (semantic and hybrid search).
+    - Searches each referenced collection once for all of its queries.
+
+    Returns:
+        JSONResponse with one entry per query, in request order. Semantic results hold
+        ids, documents, distances and metadata; BM25, TF-IDF and hybrid results hold
+        ids, documents and scores.
+    """
+
+    try:
+        embedding_client = None
+        if uses_embeddings(batch_request.search_technique):
+            embedding_client = EmbeddingProviderFactory(
+                api_key=api_key,
+                model_id=batch_request.model_id,
+                max_input_token=batch_request.max_input_token
+            ).create(provider=batch_request.provider)
+
+            if not embedding_client:
+                logger.error(f"Invalid embedding provider: {batch_request.provider}")
+                raise HTTPException(status_code=400, detail="Invalid embedding provider.")
+
+        queries = [(nlp_controller.get_search_targets([item.file_name])[0], item.query) for item in batch_request.queries]
+        batch_results = await nlp_controller.search(
+            vectordb=request.app.vectordb,
+            embedding_client=embedding_client,
+            queries=queries,
+            n_results=batch_request.n_results,
+            search_technique=batch_request.search_technique,
+        )
+
+        logger.info(f"Batch search completed for {len(queries)} queries over {len(set(item.file_name for item in batch_request.queries))} files")
+        return {
+            "results": [
+                {"file_name": item.file_name, "query": item.query, "results": results}
+                for item, results in zip(batch_request.queries, batch_results)
+            ]
+        }
+
+    except HTTPException as http_exc:
+        raise http_exc
+
+    except ValueError as e:
+        logger.error(f"Invalid batch retrieval request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
+    except Exception as e:
+        logger.error(f"Unexpected error during batch retrieval: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@retrieve_router.post("/multi")
+async def multi_retrieve(
+    request: Request,
+    multi_request: MultiRetrieveRequest,
+    api_key: Optional[str] = Header(None, alias="api-key"),
+    nlp_controller: NLPController = Depends(get_nlp_controller),
+):
+    """
+    Handles retrieval requests across several files
+
+    - Embeds the query once (semantic and hybrid search).
+    - With a collection per file, searches the files' collections concurrently and merges
+      the results by score; with a shared collection, searches all files in one filtered query.
+
+    Returns:
+        JSONResponse with the best `n_results` results over all files. Semantic results hold
+        ids, documents, distances and metadata (including the source file); BM25, TF-IDF and
+        hybrid results hold ids, documents and scores.
+    """
+
+    try:
+        embedding_client = None
+        if uses_embeddings(multi_request.search_technique):
+            embedding_client = EmbeddingProviderFactory(
+                api_key=api_key,
+                model_id=multi_request.model_id,
+                max_input_token=multi_request.max_input_token
+            ).create(provider=multi_request.provider)
+
+            if not embedding_client:
+                logger.error(f"Invalid embedding provider: {multi_request.provider}")
+                raise HTTPException(status_code=400, detail="Invalid embedding provider.")
+
+        results = await nlp_controller.search_across(
+            vectordb=request.app.vectordb,
+            embedding_client=embedding_client,
+            targets=nlp_controller.get_search_targets(multi_request.file_names),
+            query=multi_request.query,
+            n_results=multi_request.n_results,
+            search_technique=multi_request.search_technique,
+        )
+
+        logger.info(f"Search completed over {len(multi_request.file_names)} files, results found: {len(results)}")
+        return {"results": results}
+
+    except HTTPException as http_exc:
+        raise http_exc
+
+    except ValueError as e:
+        logger.error(f"Invalid retrieval request: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
     except Exception as e:
         logger.error(f"Unexpected error during retrieval: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -5,6 +5,9 @@ import logging
 import numpy as np
 from controllers.NLPController import NLPController
 from helpers.config import get_settings
+from helpers.executors import run_in_pool, PoolSaturatedError
+from models.enums.WorkerPoolEnum import WorkerPoolEnum
+from models.enums.ResponseEnum import ResponseSignal
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -47,7 +50,10 @@ async def get_visualizations(
         collection_name = os.path.splitext(file_name)[0]
 
         # Fetch embeddings and documents from vector database
-        data = request.app.vectordb.get_collection(collection_name).get(include=['embeddings', 'documents'])
+        collection = await run_in_pool(WorkerPoolEnum.IO, request.app.vectordb.get_collection,
+                                       nlp_controller.get_collection_name(file_name))
+        data = await run_in_pool(WorkerPoolEnum.IO, collection.get, include=['embeddings', 'documents'],
+                                 where=nlp_controller.get_source_filter(file_name))
 
         chunks = data.get("documents", [])
         embeddings = data.get("embeddings", [])
@@ -73,6 +79,13 @@ async def get_visualizations(
             filename=os.path.basename(visualization_file_path)
         )
 
+    except PoolSaturatedError as e:
+        logger.warning(str(e))
+        raise HTTPException(status_code=503, detail=ResponseSignal.SERVER_BUSY.value)
+
+    except HTTPException as http_exc:
+        raise http_exc
+
     except Exception as e:
         logger.exception(f"Error generating visualization for file {file_name}: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error while generating visualization.")
@@ -0,0 +1,460 @@
+"""
+End-to-end RAG benchmark on synthetic PDFs: upload -> chunk -> embed -> retrieve -> rerank
+-> generate, run through the same controllers as the API routes.
+
+Embedding and reranking use deterministic local stand-ins (or a local HuggingFace
+embedding model with --embedding-model), and generation goes over HTTP to a fake Ollama
+server answering after --llm-latency-ms, so runs are repeatable and need no network.
+Each stage reports p50/p95/p99 latency, throughput at --concurrency and peak RSS; the
+results are saved as JSON, to compare with a previous run through --compare.
+
+Usage (from src/):
+    python -m scripts.benchmark_rag [--documents 20] [--pages 10] [--words-per-page 400]
+        [--queries 200] [--concurrency 8] [--vectordb exact] [--llm-latency-ms 50]
+        [--embedding-model MODEL_ID] [--output PATH] [--compare PATH]
+"""
+import argparse
+import asyncio
+import datetime
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+from fastapi import UploadFile
+
+from controllers.ChunkController import get_chunk_controller
+from controllers.EmbeddingController import EmbeddingController
+from controllers.FileController import FileController
+from controllers.NLPController import NLPController
+from helpers.config import get_settings, reload_settings
+from helpers.executors import shutdown_worker_pools
+from helpers.http_clients import close_http_clients, aclose_http_clients
+from models.enums.SearchTechniqueEnum import SearchTechniqueEnums
+from stores.embedding.EmbeddingInterface import EmbeddingInterface
+from stores.llm.LLMEnum import LLMsProviders
+from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.reranking.RerankingInterface import RerankingInterface
+from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
+
+
+# ---------------------------------------------------------------- synthetic corpus
+
+def synthetic_vocabulary(size: int, seed: int) -> List[str]:
+    """Pronounceable pseudo-words, so chunkers and tokenizers see word-like text."""
+    rng = random.Random(seed)
+    syllables = [consonant + vowel for consonant in "bdfgklmnprstvz" for vowel in "aeiou"]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))))
+    return sorted(words)
+
+
+def synthetic_corpus(n_documents: int, n_pages: int, words_per_page: int, seed: int = 0) -> List[List[str]]:
+    """
+    Returns the page texts of each document. Every document draws from common words and
+    from words of its own topic, so queries taken from a page retrieve that document.
+    """
+    rng = random.Random(seed)
+    vocabulary = synthetic_vocabulary(5000, seed)
+    common, topical = vocabulary[:1000], vocabulary[1000:]
+    documents = []
+    for _ in range(n_documents):
+        topic = rng.sample(topical, 200)
+        pages = []
+        for _ in range(n_pages):
+            words = [rng.choice(topic) if rng.random() < 0.4 else rng.choice(common) for _ in range(words_per_page)]
+            sentences = [" ".join(words[i:i + 15]).capitalize() + "." for i in range(0, len(words), 15)]
+            pages.append(" ".join(sentences))
+        documents.append(pages)
+    return documents
+
+
+def synthetic_queries(documents: List[List[str]], n_queries: int, seed: int = 1) -> List[tuple]:
+    """(document index, query) pairs, each query a run of words taken from a page of the document."""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n_queries):
+        document_index = rng.randrange(len(documents))
+        words = re.findall(r"\w+", rng.choice(documents[document_index]))
+        start = rng.randrange(max(1, len(words) - 8))
+        queries.append((document_index, " ".join(words[start:start + 8])))
+    return queries
+
+
+def _pdf_string(text: str) -> str:
+    return "(" + text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def write_pdf(pages: List[str], words_per_line: int = 12) -> bytes:
+    """Renders the pages as a minimal text PDF (Helvetica, one content stream per page)."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        words = page.split()
+        lines = [" ".join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line)]
+        content = "BT /F1 9 Tf 11 TL 40 800 Td " + " T* ".join(f"{_pdf_string(line)} Tj" for line in lines) + " ET"
+        content = content.encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+                        f"/Contents {len(objects)} 0 R >>").encode("latin-1"))
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(out)
+
+
+# ---------------------------------------------------------------- local stand-ins
+
+class HashingEmbeddingClient(EmbeddingInterface):
+    """Deterministic bag-of-words embeddings: word counts hashed into `dim` signed buckets, normalized."""
+
+    def __init__(self, dim: int = 384):
+        self.model_id = f"hashing-{dim}"
+        self.max_input_token = 512
+        self.dim = dim
+
+    def generate_embedding(self, texts: List[str]) -> List[List[float]]:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r"\w+", text.lower()):
+                bucket = zlib.crc32(word.encode("utf-8"))
+                vectors[row, bucket % self.dim] += 1.0 if bucket & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1.0, norms)).tolist()
+
+    def set_embedding_settings(self, model_id, max_input_token):
+        self.max_input_token = max_input_token
+
+
+class TermOverlapReranker(RerankingInterface):
+    """Deterministic reranker scoring documents by the share of query words they contain."""
+
+    def rerank(self, query: str, documents: list, top_k: int = None) -> list:
+        query_words = set(re.findall(r"\w+", query.lower()))
+        results = []
+        for document in documents:
+            document_words = set(re.findall(r"\w+", document.lower()))
+            results.append((document, len(query_words & document_words) / max(1, len(query_words))))
+        results.sort(key=lambda result: result[1], reverse=True)
+        return results[:top_k] if top_k else results
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, delayed ACKs add ~40 ms per answer
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(self.server.latency_seconds)
+        prompt = request["messages"][-1]["content"]
+        content = json.dumps({"message": {"role": "assistant", "content": f"Synthetic answer ({len(prompt)} prompt chars)."},
+                              "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Local server answering /api/chat like a non-streaming Ollama after a fixed latency."""
+    daemon_threads = True
+    # The default backlog of 5 drops connections opened at once by concurrent requests
+    request_queue_size = 128
+
+    def __init__(self, latency_seconds: float):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.latency_seconds = latency_seconds
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/api/chat"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+
+
+# ---------------------------------------------------------------- measurement
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process; the lifetime peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class PeakRSSSampler:
+    """Samples the resident set size in a background thread while the block runs."""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        self.interval_seconds = interval_seconds
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def __enter__(self):
+        self.peak_bytes = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+
+def latency_summary(latencies: List[float], wall_seconds: float, peak_rss_bytes: int) -> dict:
+    latencies_ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99]) if len(latencies_ms) else (0.0, 0.0, 0.0)
+    return {
+        "count": len(latencies),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "mean_ms": float(latencies_ms.mean()) if len(latencies_ms) else 0.0,
+        "qps": len(latencies) / wall_seconds if wall_seconds > 0 else 0.0,
+        "peak_rss_mb": peak_rss_bytes / 2**20,
+    }
+
+
+async def run_stage(items: list, operation: Callable[[object], Awaitable[None]], concurrency: int) -> dict:
+    """Runs `operation` over `items` with at most `concurrency` in flight and summarizes the run."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def timed(item):
+        async with semaphore:
+            started = time.perf_counter()
+            await operation(item)
+            latencies.append(time.perf_counter() - started)
+
+    with PeakRSSSampler() as rss:
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(item) for item in items))
+        wall_seconds = time.perf_counter() - started
+    return latency_summary(latencies, wall_seconds, rss.peak_bytes)
+
+
+# ---------------------------------------------------------------- benchmark
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def create_embedding_client(model_id: Optional[str]) -> EmbeddingInterface:
+    if not model_id:
+        return HashingEmbeddingClient()
+    # Imported only when asked for, since it loads torch
+    from stores.embedding.providers.HuggingFaceLocalEmbeddingProvider import HuggingFaceLocalEmbeddingProvider
+    return HuggingFaceLocalEmbeddingProvider(model_id=model_id, max_input_token=512)
+
+
+async def run_benchmark(args) -> dict:
+    """
+    Runs every stage against the directories and vector DB of the current settings.
+
+    Returns:
+        dict: The configuration, corpus size and per-stage results.
+    """
+    settings = get_settings()
+    documents = synthetic_corpus(args.documents, args.pages, args.words_per_page, seed=args.seed)
+    queries = synthetic_queries(documents, args.queries, seed=args.seed + 1)
+    pdfs = [write_pdf(pages) for pages in documents]
+
+    file_controller, chunk_controller = FileController(), get_chunk_controller()
+    embedding_controller, nlp_controller = EmbeddingController(), NLPController()
+    embedding_client = create_embedding_client(args.embedding_model)
+    reranker = TermOverlapReranker()
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
+    vectordb = VectorDBProviderFactory().create(provider=args.vectordb, path=settings.VECTORDB_PATH)
+    vectordb.connect()
+
+    file_names = [f"bench_{i:04d}.pdf" for i in range(len(documents))]
+    chunk_counts = {}
+    retrieved: Dict[int, list] = {}
+    reranked: Dict[int, list] = {}
+    stages = {}
+
+    async def upload(i):
+        upload_file = UploadFile(file=io.BytesIO(pdfs[i]), filename=file_names[i], size=len(pdfs[i]))
+        await file_controller.validate_file(upload_file)
+        await file_controller.save_file(upload_file, settings.UPLOAD_DIR, file_names[i])
+
+    async def chunk(i):
+        text = await file_controller.load_file_content(settings.UPLOAD_DIR, file_names[i])
+        chunks = await chunk_controller.chunk_text(text, chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap)
+        await chunk_controller.save_chunks(chunks, settings.CHUNKS_DIR, chunk_controller.get_chunk_file_name(file_names[i]))
+        chunk_counts[i] = len(chunks)
+
+    async def embed(i):
+        chunks = list(await chunk_controller.load_chunks(settings.CHUNKS_DIR, chunk_controller.get_chunk_file_name(file_names[i])))
+        await embedding_controller.reindex_collection(vectordb=vectordb, embedding_client=embedding_client,
+                                                      collection_name=embedding_controller.get_collection_name(file_names[i]),
+                                                      chunks=chunks, source=file_names[i],
+                                                      shared=embedding_controller.uses_shared_collection)
+
+    async def retrieve(q):
+        document_index, query = queries[q]
+        target = nlp_controller.get_search_targets([file_names[document_index]])[0]
+        results = await nlp_controller.search(vectordb, embedding_client, [(target, query)],
+                                              args.n_results, SearchTechniqueEnums.SEMANTIC_SEARCH)
+        retrieved[q] = [result["document"] for result in results[0]]
+
+    async def rerank(q):
+        reranked[q] = await nlp_controller.rerank(reranker, queries[q][1], retrieved[q], top_k=args.top_k)
+
+    async def generate(q):
+        prompt = await nlp_controller.create_generation_query(question=queries[q][1],
+                                                              docs=[document for document, _ in reranked[q]])
+        await nlp_controller.generate_response(llm_client=llm_client, query=prompt)
+
+    async def end_to_end(q):
+        await retrieve(q)
+        await rerank(q)
+        await generate(q)
+
+    try:
+        with FakeOllamaServer(args.llm_latency_ms / 1000) as ollama_server:
+            llm_client = LLMProviderFactory.get_llm(provider=LLMsProviders.OLLAMA, model_id="benchmark",
+                                                    base_url=ollama_server.url)
+            document_indexes, query_indexes = list(range(len(documents))), list(range(len(queries)))
+            for name, operation, items in [("upload", upload, document_indexes), ("chunk", chunk, document_indexes),
+                                           ("embed", embed, document_indexes), ("retrieve", retrieve, query_indexes),
+                                           ("rerank", rerank, query_indexes), ("generate", generate, query_indexes),
+                                           ("end_to_end", end_to_end, query_indexes)]:
+                stages[name] = await run_stage(items, operation, args.concurrency)
+    finally:
+        vectordb.disconnect()
+        await aclose_http_clients()
+
+    return {
+        "benchmark": "rag",
+        "commit": git_commit(),
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "corpus": {"documents": len(documents), "pages": sum(len(pages) for pages in documents),
+                   "chunks": sum(chunk_counts.values()), "pdf_bytes": sum(len(pdf) for pdf in pdfs),
+                   "queries": len(queries)},
+        "stages": stages,
+    }
+
+
+def configure_environment(workdir: str):
+    """Points every data directory of the settings into `workdir`, so the benchmark never touches real data."""
+    for name, directory in {"UPLOAD_DIR": "uploads", "CHUNKS_DIR": "chunks", "EMBEDDINGS_DIR": "embeddings",
+                            "EMBEDDING_MODELS_DIR": "embedding_models", "RERANKING_MODELS_DIR": "reranking_models",
+                            "VISUALIZATIONS_DIR": "visualizations", "VECTORDB_PATH": "vector_db",
+                            "LEXICAL_INDEX_PATH": "lexical"}.items():
+        os.environ[name] = os.path.join(workdir, directory)
+    os.environ["MAX_SIZE"] = "1024"
+    os.environ["ALLOWED_FILE_TYPES"] = '["pdf"]'
+    os.environ["VECTORDB_SHARED_COLLECTION"] = ""
+    for name, value in {"APP_NAME": "rag-benchmark", "APP_VERSION": "0", "MONGODB_CONNECTION": "",
+                        "MONGODB_DATABASE_NAME": "rag", "MONGODB_TEST_DATABASE_NAME": "rag_test"}.items():
+        os.environ.setdefault(name, value)
+    reload_settings()
+
+
+def format_results(results: dict, baseline: Optional[dict] = None) -> str:
+    """One line per stage; with a baseline, the p95 and QPS changes relative to it."""
+    header = f"{'stage':<11} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'QPS':>9} {'peak RSS MB':>12}"
+    if baseline:
+        header += f" {'p95 change':>11} {'QPS change':>11}"
+    lines = [header]
+    for name, stage in results["stages"].items():
+        line = (f"{name:<11} {stage['count']:>6} {stage['p50_ms']:>9.2f} {stage['p95_ms']:>9.2f} "
+                f"{stage['p99_ms']:>9.2f} {stage['qps']:>9.1f} {stage['peak_rss_mb']:>12.1f}")
+        previous = (baseline or {}).get("stages", {}).get(name)
+        if previous:
+            def change(key):
+                return f"{(stage[key] / previous[key] - 1) * 100:>+10.1f}%" if previous[key] else f"{'n/a':>11}"
+            line += f" {change('p95_ms')} {change('qps')}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RAG pipeline end to end on synthetic documents.")
+    parser.add_argument("--documents", type=int, default=20, help="Number of synthetic PDFs.")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per document.")
+    parser.add_argument("--words-per-page", type=int, default=400, help="Words per page.")
+    parser.add_argument("--queries", type=int, default=200, help="Queries for the retrieve, rerank and generate stages.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Operations in flight at once in every stage.")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Recursive chunk size in characters.")
+    parser.add_argument("--chunk-overlap", type=int, default=50, help="Recursive chunk overlap in characters.")
+    parser.add_argument("--n-results", type=int, default=10, help="Chunks retrieved per query.")
+    parser.add_argument("--top-k", type=int, default=5, help="Chunks kept by the reranker and sent to the LLM.")
+    parser.add_argument("--vectordb", default="exact", help="Vector DB provider (chromadb, exact or ivf).")
+    parser.add_argument("--llm-latency-ms", type=float, default=50.0, help="Time the fake Ollama server takes per answer.")
+    parser.add_argument("--embedding-model", default=None,
+                        help="Local HuggingFace embedding model; a deterministic hashing embedder by default.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic corpus and queries.")
+    parser.add_argument("--output", default=None, help="Result file (default assets/benchmarks/rag_<commit>.json).")
+    parser.add_argument("--compare", default=None, help="Previous result file to compare against.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="rag-benchmark-") as workdir:
+        configure_environment(workdir)
+        try:
+            results = asyncio.run(run_benchmark(args))
+        finally:
+            shutdown_worker_pools()
+            close_http_clients()
+
+    output = args.output or os.path.join("assets", "benchmarks", f"rag_{(results['commit'] or 'workdir')[:12]}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_results(results, baseline))
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Compares query throughput of the vector store providers on synthetic, clustered unit vectors.
+
+For each collection size, every provider gets the same vectors and answers the same
+queries, once one query per call and once all queries in a single batched call.
+
+Usage (from src/):
+    python -m scripts.benchmark_vector_search [--sizes 10000 100000 1000000] [--dim 384]
+        [--queries 200] [--n-results 10] [--providers chromadb exact exact-int8 exact-pq ivf ivf-pq]
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict
+
+import numpy as np
+
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+from stores.vectordb.providers.ExactSearchProvider import ExactSearchProvider
+from stores.vectordb.providers.IVFIndexProvider import IVFIndexProvider
+
+PROVIDERS: Dict[str, Callable[[str], object]] = {
+    "chromadb": lambda path: ChromaDBProvider(path=path),
+    "exact": lambda path: ExactSearchProvider(path=path, dtype="float32"),
+    "exact-float16": lambda path: ExactSearchProvider(path=path, dtype="float16"),
+    "exact-int8": lambda path: ExactSearchProvider(path=path, dtype="int8"),
+    "exact-pq": lambda path: ExactSearchProvider(path=path, quantization="pq", pq_subvectors=48),
+    "ivf": lambda path: IVFIndexProvider(path=path),
+    "ivf-pq": lambda path: IVFIndexProvider(path=path, quantization="pq", pq_subvectors=48),
+}
+
+
+def clustered_unit_vectors(n: int, dim: int, seed: int, n_clusters: int = 1000) -> np.ndarray:
+    """Unit vectors scattered around shared random centers, a rough stand-in for text embeddings."""
+    centers = np.random.default_rng(0).normal(size=(n_clusters, dim)).astype(np.float32)
+    rng = np.random.default_rng(seed)
+    vectors = centers[rng.integers(0, n_clusters, n)] + rng.normal(scale=0.7, size=(n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def benchmark_provider(name: str, vectors: np.ndarray, queries: np.ndarray, n_results: int,
+                       insert_batch_size: int = 5000) -> dict:
+    """
+    Loads `vectors` into a fresh collection of the provider and times the queries.
+
+    Returns:
+        dict: Insert time, single-query and batched QPS, and recall@n_results against exact search.
+    """
+    path = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        provider = PROVIDERS[name](path)
+        provider.connect()
+
+        start = time.perf_counter()
+        for i in range(0, len(vectors), insert_batch_size):
+            batch = vectors[i:i + insert_batch_size]
+            provider.apply_changes(collection_name="bench",
+                                   ids=[str(j) for j in range(i, i + len(batch))],
+                                   documents=[""] * len(batch),
+                                   embeddings=batch.tolist() if name == "chromadb" else batch)
+        insert_seconds = time.perf_counter() - start
+
+        # Warm up caches and lazily loaded state
+        provider.query_embeddings(queries[:1].tolist(), n_results=n_results, collection_name="bench")
+
+        start = time.perf_counter()
+        for query in queries:
+            provider.query_embeddings([query.tolist()], n_results=n_results, collection_name="bench")
+        single_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        results = provider.query_embeddings(queries.tolist(), n_results=n_results, collection_name="bench")
+        batch_seconds = time.perf_counter() - start
+
+        expected = np.argpartition(-(queries @ vectors.T), n_results - 1, axis=1)[:, :n_results]
+        recall = np.mean([len({str(j) for j in truth} & set(ids)) / n_results
+                          for truth, ids in zip(expected, results["ids"])])
+
+        provider.disconnect()
+        return {
+            "insert_s": insert_seconds,
+            "single_qps": len(queries) / single_seconds,
+            "batch_qps": len(queries) / batch_seconds,
+            "recall": recall,
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark query throughput of the vector store providers.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000], help="Collection sizes to test.")
+    parser.add_argument("--dim", type=int, default=384, help="Embedding dimension.")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries per run.")
+    parser.add_argument("--n-results", type=int, default=10, help="Results per query.")
+    parser.add_argument("--providers", nargs="+", default=["chromadb", "exact", "exact-int8", "ivf"],
+                        choices=sorted(PROVIDERS), help="Providers to compare.")
+    args = parser.parse_args()
+
+    queries = clustered_unit_vectors(args.queries, args.dim, seed=1)
+    print(f"{'size':>9} {'provider':<14} {'insert s':>9} {'single QPS':>11} {'batch QPS':>10} {'recall':>7}")
+    for size in args.sizes:
+        vectors = clustered_unit_vectors(size, args.dim, seed=2)
+        for name in args.providers:
+            stats = benchmark_provider(name, vectors, queries, args.n_results)
+            print(f"{size:>9} {name:<14} {stats['insert_s']:>9.1f} {stats['single_qps']:>11.0f} "
+                  f"{stats['batch_qps']:>10.0f} {stats['recall']:>7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Converts chunk files saved as indented JSON (`<name>_chunks.json`) into the binary
+chunk format (`<name>_chunks.bin`).
+
+Usage (from src/):
+    python -m scripts.migrate_chunks [--chunks-dir DIR] [--delete-json]
+"""
+import argparse
+import glob
+import json
+import os
+from typing import List
+
+from helpers.chunk_file import ChunkFile, write_chunk_file
+
+
+def migrate_json_chunks(chunks_dir: str, delete_json: bool = False) -> List[str]:
+    """
+    Migrates every legacy JSON chunk file in `chunks_dir`.
+    Files that already have a binary counterpart are skipped.
+
+    Returns:
+        List[str]: Paths of the binary chunk files that were written.
+    """
+    migrated = []
+    for json_path in sorted(glob.glob(os.path.join(chunks_dir, "*_chunks.json"))):
+        bin_path = os.path.splitext(json_path)[0] + ".bin"
+        if os.path.exists(bin_path):
+            continue
+
+        with open(json_path, "r", encoding="utf-8") as f:
+            chunks = json.load(f)
+        write_chunk_file(bin_path, chunks)
+
+        # Verify the round trip before removing anything
+        if list(ChunkFile(bin_path)) != chunks:
+            os.remove(bin_path)
+            raise ValueError(f"Migrated chunks do not match {json_path}")
+
+        if delete_json:
+            os.remove(json_path)
+        migrated.append(bin_path)
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert JSON chunk files to the binary chunk format.")
+    parser.add_argument("--chunks-dir", help="Directory holding the chunk files (defaults to CHUNKS_DIR).")
+    parser.add_argument("--delete-json", action="store_true", help="Remove the JSON files after migrating them.")
+    args = parser.parse_args()
+
+    chunks_dir = args.chunks_dir
+    if chunks_dir is None:
+        from helpers.config import get_settings
+        chunks_dir = get_settings().CHUNKS_DIR
+
+    migrated = migrate_json_chunks(chunks_dir, delete_json=args.delete_json)
+    for path in migrated:
+        print(f"✅ {path}")
+    print(f"Migrated {len(migrated)} chunk file(s).")
+
+
+if __name__ == "__main__":
+    main()
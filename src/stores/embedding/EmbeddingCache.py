@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from helpers.config import get_settings
+from stores.embedding.EmbeddingInterface import EmbeddingInterface
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes unicode and whitespace so trivially different inputs share a cache entry."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of embeddings keyed by hash(model_id, normalized text).
+
+    Lookups go through an in-memory LRU tier first, then a SQLite tier on disk that
+    survives restarts. Vectors are stored as float32.
+    """
+
+    def __init__(self, db_path: str, memory_items: int = 50_000):
+        self.db_path = db_path
+        self.memory_items = memory_items
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, model_id TEXT NOT NULL, vector BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_id: str, text: str) -> str:
+        return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, model_id: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Returns the cached vector for each text, or None where there is no entry."""
+        keys = [self.make_key(model_id, text) for text in texts]
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+
+        with self._lock:
+            missing = {}
+            for i, key in enumerate(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    results[i] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+            missing_keys = list(missing.keys())
+            for start in range(0, len(missing_keys), 500):
+                batch = missing_keys[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                for key, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    self._remember(key, vector)
+                    for i in missing.pop(key):
+                        results[i] = vector
+                        self.disk_hits += 1
+
+            self.misses += sum(len(positions) for positions in missing.values())
+
+        return results
+
+    def put_many(self, model_id: str, texts: List[str], vectors: List[List[float]]):
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(model_id, text)
+                array = np.asarray(vector, dtype=np.float32)
+                self._remember(key, array)
+                rows.append((key, model_id, array.tobytes()))
+            self._connection.executemany("INSERT OR REPLACE INTO embeddings (key, model_id, vector) VALUES (?, ?, ?)", rows)
+            self._connection.commit()
+
+    def get_or_embed(self, model_id: str, texts: List[str],
+                     embed_fn: Callable[[List[str]], List[List[float]]]) -> List[List[float]]:
+        """
+        Returns embeddings for `texts`, calling `embed_fn` only for texts not in the cache.
+        Duplicate texts in one call are embedded once.
+        """
+        cached = self.get_many(model_id, texts)
+
+        missing_texts = {}
+        for text, vector in zip(texts, cached):
+            if vector is None:
+                missing_texts.setdefault(self.make_key(model_id, text), text)
+
+        if missing_texts:
+            new_texts = list(missing_texts.values())
+            new_vectors = embed_fn(new_texts)
+            self.put_many(model_id, new_texts, new_vectors)
+            computed = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(missing_texts.keys(), new_vectors)}
+            cached = [vector if vector is not None else computed[self.make_key(model_id, text)]
+                      for text, vector in zip(texts, cached)]
+
+        return [vector.tolist() for vector in cached]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            disk_items = self._connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "disk_items": disk_items,
+            }
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class CachedEmbeddingClient(EmbeddingInterface):
+    """
+    Wraps an EmbeddingInterface so every call consults the embedding cache first.
+    Other attributes (model, release, ...) are forwarded to the wrapped client.
+    """
+
+    def __init__(self, client: EmbeddingInterface, cache: EmbeddingCache, provider: str):
+        self.client = client
+        self.cache = cache
+        self.provider = provider
+
+    @property
+    def cache_model_id(self) -> str:
+        return f"{self.provider}/{self.client.model_id}"
+
+    def generate_embedding(self, texts: List[str]) -> List[List[float]]:
+        return self.cache.get_or_embed(self.cache_model_id, texts, self.client.generate_embedding)
+
+    def set_embedding_settings(self, model_id, max_input_token):
+        self.client.set_embedding_settings(model_id=model_id, max_input_token=max_input_token)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache stored under EMBEDDINGS_DIR."""
+    settings = get_settings()
+    os.makedirs(settings.EMBEDDINGS_DIR, exist_ok=True)
+    return EmbeddingCache(db_path=os.path.join(settings.EMBEDDINGS_DIR, "embedding_cache.sqlite"),
+                          memory_items=settings.EMBEDDING_CACHE_MEMORY_ITEMS)
@@ -1,7 +1,19 @@
 
+from functools import lru_cache
 from .EmbeddingEnum import EmbeddingEnum
-from .providers.OpenAIEmbeddingProvider import OpenAIEmbeddingProvider
 from .providers.HuggingFaceLocalEmbeddingProvider import HuggingFaceLocalEmbeddingProvider
+from .EmbeddingCache import CachedEmbeddingClient, get_embedding_cache
+from helpers.config import get_settings
+
+# Distinct remote provider configurations kept alive at once
+PROVIDER_CACHE_SIZE = 32
+
+@lru_cache(maxsize=PROVIDER_CACHE_SIZE)
+def get_openai_embedding_provider(api_key: str, model_id: str, max_input_token: int) -> "OpenAIEmbeddingProvider":
+    """Returns the OpenAI provider for a configuration, created once and shared across requests."""
+    # The openai SDK takes a noticeable share of startup; load it with the first OpenAI provider
+    from .providers.OpenAIEmbeddingProvider import OpenAIEmbeddingProvider
+    return OpenAIEmbeddingProvider(api_key=api_key, model_id=model_id, max_input_token=max_input_token)
 
 class EmbeddingProviderFactory:
     def __init__(self,  
@@ -13,13 +25,21 @@ class EmbeddingProviderFactory:
         self.max_input_token = max_input_token
 
     def create(self, provider: str):
+        client = self.__create_client(provider)
+        if client is None or not get_settings().EMBEDDING_CACHE_ENABLED:
+            return client
+
+        # Consult the shared embedding cache before calling the provider
+        return CachedEmbeddingClient(client=client,
+                                     cache=get_embedding_cache(),
+                                     provider=getattr(provider, "value", provider))
+
+    def __create_client(self, provider: str):
         if provider == EmbeddingEnum.OPENAI.value:
-            return OpenAIEmbeddingProvider(
-                api_key = self.api_key,
-                model_id = self.model_id,
-                max_input_token=self.max_input_token,
-            )
+            return get_openai_embedding_provider(self.api_key, self.model_id, self.max_input_token)
 
+        # Local providers are cheap wrappers; the model itself is shared through the model
+        # registry, which can only evict it once no provider holds it
         if provider == EmbeddingEnum.HUGGINGFACE.value:
             return HuggingFaceLocalEmbeddingProvider(
                 model_id = self.model_id,
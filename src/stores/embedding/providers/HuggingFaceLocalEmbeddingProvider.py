@@ -1,18 +1,58 @@
 import os
-from typing import Dict, List, Any
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Any
 from abc import ABC, abstractmethod
 from stores.embedding.EmbeddingInterface import EmbeddingInterface
-from stores.embedding.EmbeddingEnum import HuggingFaceLocalModels
-from sentence_transformers import SentenceTransformer
+from stores.embedding.EmbeddingEnum import EmbeddingEnum, HuggingFaceLocalModels
 from helpers.config import get_settings
+from helpers.model_registry import get_embedding_model_registry
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
 
 class HuggingFaceLocalEmbeddingProvider(EmbeddingInterface):
     def __init__(self, model_id: HuggingFaceLocalModels, max_input_token: int = 512):
-        settings = get_settings()
         self.model_id = model_id
         self.max_input_token = max_input_token
-        self.model = SentenceTransformer(os.path.join(settings.EMBEDDING_MODELS_DIR, model_id))  # Load model
-        
+        self._release = None
+        self.model = self.__acquire_model(model_id)  # Shared through the model registry
+
+    @staticmethod
+    def load_model(model_id: HuggingFaceLocalModels) -> "SentenceTransformer":
+        """
+        Load a SentenceTransformer model from EMBEDDING_MODELS_DIR.
+
+        Args:
+            model_id (str): Model ID (folder name under EMBEDDING_MODELS_DIR).
+
+        Returns:
+            SentenceTransformer: The loaded model.
+        """
+        # Imported on first load so that importing the provider doesn't pull in torch
+        from sentence_transformers import SentenceTransformer
+
+        settings = get_settings()
+        return SentenceTransformer(os.path.join(settings.EMBEDDING_MODELS_DIR, model_id))
+
+    def __acquire_model(self, model_id: HuggingFaceLocalModels) -> "SentenceTransformer":
+        """
+        Take a reference to the shared model for `model_id`, loading it only if no other
+        provider has loaded it yet. The reference is dropped on `release` or when this
+        provider is garbage collected.
+        """
+        registry = get_embedding_model_registry()
+        model = registry.acquire(provider=EmbeddingEnum.HUGGINGFACE.value,
+                                 model_id=model_id,
+                                 loader=lambda: self.load_model(model_id))
+        self._release = weakref.finalize(self, registry.release, EmbeddingEnum.HUGGINGFACE.value, model_id)
+        return model
+
+    def release(self):
+        """Drop this provider's reference to its shared model."""
+        if self._release is not None:
+            self._release()
+            self._release = None
+
     def generate_embedding(self, texts: List[str]) -> List[List[float]]:
         """
         Generate embeddings for a batch of texts.
@@ -40,6 +80,8 @@ class HuggingFaceLocalEmbeddingProvider(EmbeddingInterface):
             model_id (str): New model ID or local path.
             max_input_token (int): New max token limit.
         """
+        if model_id != self.model_id:
+            self.release()
+            self.model = self.__acquire_model(model_id)  # Reuse the model if already loaded
         self.model_id = model_id
         self.max_input_token = max_input_token
-        self.model = SentenceTransformer(model_id)  # Reload model
\ No newline at end of file
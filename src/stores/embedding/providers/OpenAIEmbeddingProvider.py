@@ -1,8 +1,12 @@
-import requests
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any
 from abc import ABC, abstractmethod
 from stores.embedding.EmbeddingInterface import EmbeddingInterface
-from openai import OpenAI
+from helpers.token_counter import count_tokens
+from openai import OpenAI, RateLimitError, APITimeoutError
+from helpers.http_clients import OPENAI_API_URL, get_http_client
 
 class OpenAIEmbeddingProvider(EmbeddingInterface):
     """Concrete implementation of EmbeddingInterface using OpenAI's API."""
@@ -11,43 +15,105 @@ class OpenAIEmbeddingProvider(EmbeddingInterface):
                  model_id: str,
                  max_input_token : int,
                  api_key : str=None,
+                 base_url : str=None,
+                 max_batch_tokens : int = 100_000,
+                 max_batch_size : int = 2048,
+                 max_concurrency : int = 4,
+                 max_retries : int = 5,
+                 retry_base_delay : float = 0.5,
                  ):
-        
+
         self.model_id = model_id
         self.max_input_token = max_input_token
         self.api_key = api_key
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
 
-        self.client = OpenAI(api_key=api_key)
+        # Retries are handled here so rate limits back off per batch; connections
+        # come from the shared HTTP client of the API host
+        self.client = OpenAI(api_key=api_key, base_url=base_url, max_retries=0,
+                             http_client=get_http_client(base_url or OPENAI_API_URL))
 
 
     def generate_embedding(self, texts: List[str]) -> List[List[float]]:
         """
-        Generates an embedding for the provided text.
+        Generates embeddings for the provided texts.
+
+        The texts are split into batches of at most `max_batch_tokens` tokens and
+        `max_batch_size` inputs, sent with up to `max_concurrency` requests in flight.
 
-        :param text: The input text to embed.
-        :return: A list representing the embedding vector.
+        :param texts: The input texts to embed.
+        :return: One embedding vector per input text, in the original order.
         """
-        # Check token length (basic approximation)
+        token_counts = []
         for text in texts:
-            if len(text.split()) > self.max_input_token:
+            if not isinstance(text, str) or not text:
+                raise ValueError("Input text must be a non-empty string")
+            token_count = count_tokens(text, self.model_id)
+            if token_count > self.max_input_token:
                 raise ValueError(f"One of the inputs exceeds the max token limit of {self.max_input_token} tokens.")
+            token_counts.append(token_count)
 
-        try:
-            # Generate embedding using OpenAI client
-            embedding = self.client.embeddings.create(
-                input=text[0],
-                model=self.model_id
-            ).data[0].embedding
-
-            return embedding
+        batches = self.__split_batches(token_counts)
+        if not batches:
+            return []
 
+        try:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                batch_embeddings = list(executor.map(
+                    lambda batch: self.__embed_batch([texts[i] for i in batch]), batches
+                ))
         except Exception as e:
             raise Exception(f"Error generating embedding: {e}")
 
+        embeddings = [None] * len(texts)
+        for batch, vectors in zip(batches, batch_embeddings):
+            for i, vector in zip(batch, vectors):
+                embeddings[i] = vector
+        return embeddings
 
-    def set_embedding_settings(self, 
+    def __split_batches(self, token_counts: List[int]) -> List[List[int]]:
+        """Greedily groups text indices into batches that respect the token and size budgets."""
+        batches, batch, batch_tokens = [], [], 0
+        for i, token_count in enumerate(token_counts):
+            if batch and (batch_tokens + token_count > self.max_batch_tokens or len(batch) >= self.max_batch_size):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(i)
+            batch_tokens += token_count
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def __embed_batch(self, batch_texts: List[str]) -> List[List[float]]:
+        """Embeds one batch, retrying with exponential backoff on rate limits and timeouts."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.client.embeddings.create(input=batch_texts, model=self.model_id)
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            except (RateLimitError, APITimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.__retry_delay(attempt, e))
+
+    def __retry_delay(self, attempt: int, error: Exception) -> float:
+        """Uses the server's Retry-After header when present, otherwise exponential backoff with jitter."""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        return self.retry_base_delay * (2 ** attempt) + random.uniform(0, self.retry_base_delay)
+
+
+    def set_embedding_settings(self,
                                model_id,
                                max_input_token ):
         self.model_id = model_id
         self.max_input_token = max_input_token
-        
\ No newline at end of file
+
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class LexicalScoringEnum(str, Enum):
+    BM25 = "bm25"
+    TF_IDF = "tf_idf"
@@ -0,0 +1,298 @@
+import logging
+import os
+import re
+import shutil
+import threading
+import uuid
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, List
+
+import numpy as np
+
+from helpers.config import get_settings
+from helpers.chunk_file import ChunkFile, write_chunk_file
+from stores.lexical.LexicalEnum import LexicalScoringEnum
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, shared by indexing and querying."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LexicalIndex:
+    """
+    In-memory inverted index with BM25 and TF-IDF scoring.
+
+    Postings are kept in CSR form: for term `t`, `postings_docs[term_offsets[t]:term_offsets[t + 1]]`
+    holds the documents containing it, sorted by document, with the matching term frequencies
+    and precomputed BM25 / normalized TF-IDF weights alongside. A query is a handful of array
+    slices and one `np.bincount`, with no per-document Python work.
+
+    Additions and removals are buffered and merged into the postings by `commit`, which
+    `search` runs automatically when there are pending changes.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+
+        self._terms: List[str] = []
+        self._vocabulary: Dict[str, int] = {}
+        self._doc_ids: List[str] = []
+        self._doc_positions: Dict[str, int] = {}
+        self._documents = []
+        self._doc_lengths = np.zeros(0, dtype=np.int32)
+        self._term_offsets = np.zeros(1, dtype=np.int64)
+        self._postings_docs = np.zeros(0, dtype=np.int32)
+        self._postings_tfs = np.zeros(0, dtype=np.int32)
+        self._weights = {scoring: np.zeros(0, dtype=np.float32) for scoring in LexicalScoringEnum}
+
+        # Changes waiting for the next commit
+        self._pending: Dict[str, str] = {}
+        self._removed = set()
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending or self._removed)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._doc_ids) - len(self._removed) + len(self._pending)
+
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            return doc_id in self._pending or (doc_id in self._doc_positions and doc_id not in self._removed)
+
+    def add_documents(self, ids: List[str], documents: List[str]):
+        """Adds documents, replacing any document with the same ID."""
+        with self._lock:
+            for doc_id, document in zip(ids, documents):
+                if doc_id in self._doc_positions:
+                    self._removed.add(doc_id)
+                self._pending[doc_id] = document
+
+    def remove_documents(self, ids: List[str]):
+        with self._lock:
+            for doc_id in ids:
+                self._pending.pop(doc_id, None)
+                if doc_id in self._doc_positions:
+                    self._removed.add(doc_id)
+
+    def commit(self):
+        """Merges pending additions and removals into the compact postings."""
+        with self._lock:
+            if not self.dirty:
+                return
+
+            # Existing postings as (term, doc, tf) triples, without removed documents
+            keep = np.ones(len(self._doc_ids), dtype=bool)
+            for doc_id in self._removed:
+                keep[self._doc_positions[doc_id]] = False
+            new_doc_index = np.cumsum(keep, dtype=np.int64) - 1
+            posting_terms = np.repeat(np.arange(len(self._terms), dtype=np.int64), np.diff(self._term_offsets))
+            kept_postings = keep[self._postings_docs]
+
+            term_parts = [posting_terms[kept_postings]]
+            doc_parts = [new_doc_index[self._postings_docs[kept_postings]]]
+            tf_parts = [self._postings_tfs[kept_postings]]
+
+            kept_positions = np.flatnonzero(keep)
+            doc_ids = [self._doc_ids[i] for i in kept_positions]
+            documents = [self._documents[i] for i in kept_positions]
+            doc_lengths = [self._doc_lengths[kept_positions]]
+
+            # Postings of the pending documents
+            new_terms, new_docs, new_tfs, new_lengths = [], [], [], []
+            for doc_id, document in self._pending.items():
+                doc_index = len(doc_ids)
+                counts = Counter(tokenize(document))
+                for term, count in counts.items():
+                    term_id = self._vocabulary.get(term)
+                    if term_id is None:
+                        term_id = self._vocabulary[term] = len(self._terms)
+                        self._terms.append(term)
+                    new_terms.append(term_id)
+                    new_docs.append(doc_index)
+                    new_tfs.append(count)
+                new_lengths.append(sum(counts.values()))
+                doc_ids.append(doc_id)
+                documents.append(document)
+
+            term_parts.append(np.asarray(new_terms, dtype=np.int64))
+            doc_parts.append(np.asarray(new_docs, dtype=np.int64))
+            tf_parts.append(np.asarray(new_tfs, dtype=np.int32))
+            doc_lengths.append(np.asarray(new_lengths, dtype=np.int32))
+
+            terms = np.concatenate(term_parts)
+            docs = np.concatenate(doc_parts)
+            tfs = np.concatenate(tf_parts)
+            order = np.lexsort((docs, terms))
+
+            # Drop terms that no document uses anymore
+            document_frequency = np.bincount(terms, minlength=len(self._terms))
+            live_terms = document_frequency > 0
+
+            self._terms = [term for term, live in zip(self._terms, live_terms) if live]
+            self._vocabulary = {term: term_id for term_id, term in enumerate(self._terms)}
+            self._term_offsets = np.concatenate([[0], np.cumsum(document_frequency[live_terms])]).astype(np.int64)
+            self._postings_docs = docs[order].astype(np.int32)
+            self._postings_tfs = tfs[order].astype(np.int32)
+
+            self._doc_ids = doc_ids
+            self._doc_positions = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+            self._documents = documents
+            self._doc_lengths = np.concatenate(doc_lengths).astype(np.int32)
+            self._pending = {}
+            self._removed = set()
+            self._compute_weights()
+
+    def _compute_weights(self):
+        n_docs = len(self._doc_ids)
+        document_frequency = np.diff(self._term_offsets)
+        posting_terms = np.repeat(np.arange(len(self._terms)), document_frequency)
+        tfs = self._postings_tfs.astype(np.float32)
+
+        # BM25 with the usual non-negative idf
+        idf = np.log1p((n_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+        avg_length = self._doc_lengths.mean() if n_docs else 1.0
+        lengths = self._doc_lengths[self._postings_docs] / max(avg_length, 1e-9)
+        bm25 = idf[posting_terms] * tfs * (self.k1 + 1) / (tfs + self.k1 * (1 - self.b + self.b * lengths))
+        self._weights[LexicalScoringEnum.BM25] = bm25.astype(np.float32)
+
+        # Sublinear tf, smoothed idf, and documents normalized to unit length (cosine similarity)
+        idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+        tfidf = (1 + np.log(tfs)) * idf[posting_terms]
+        norms = np.sqrt(np.bincount(self._postings_docs, weights=tfidf ** 2, minlength=n_docs))
+        if len(tfidf):
+            tfidf /= norms[self._postings_docs]
+        self._weights[LexicalScoringEnum.TF_IDF] = tfidf.astype(np.float32)
+
+    def search(self, query: str, n_results: int, scoring: LexicalScoringEnum = LexicalScoringEnum.BM25) -> List[dict]:
+        """
+        Returns up to `n_results` documents matching the query, best first.
+
+        Returns:
+            List[dict]: Results with `id`, `document` and `score`.
+        """
+        with self._lock:
+            if self.dirty:
+                self.commit()
+
+            weights = self._weights[LexicalScoringEnum(scoring)]
+            doc_parts, weight_parts = [], []
+            for term, query_count in Counter(tokenize(query)).items():
+                term_id = self._vocabulary.get(term)
+                if term_id is None:
+                    continue
+                start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+                doc_parts.append(self._postings_docs[start:end])
+                weight_parts.append(weights[start:end] * query_count)
+            if not doc_parts:
+                return []
+
+            postings_docs = np.concatenate(doc_parts)
+            postings_weights = np.concatenate(weight_parts)
+            n_docs = len(self._doc_ids)
+
+            if len(postings_docs) * 16 < n_docs:
+                # Few matching postings: score only the matched documents
+                candidates, inverse = np.unique(postings_docs, return_inverse=True)
+                scores = np.bincount(inverse, weights=postings_weights)
+            else:
+                # Common terms: scoring every document is cheaper than sorting the postings
+                candidates = np.arange(n_docs)
+                scores = np.bincount(postings_docs, weights=postings_weights, minlength=n_docs)
+
+            if len(scores) > n_results:
+                top = np.argpartition(scores, len(scores) - n_results)[-n_results:]
+            else:
+                top = np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            return [{"id": self._doc_ids[candidates[i]], "document": self._documents[candidates[i]], "score": float(scores[i])}
+                    for i in top if scores[i] > 0]
+
+    def save(self, directory: str):
+        """Writes the committed index to `directory`, replacing any previous version."""
+        with self._lock:
+            self.commit()
+            tmp_directory = f"{directory}.tmp-{uuid.uuid4().hex[:8]}"
+            os.makedirs(tmp_directory)
+            np.savez(os.path.join(tmp_directory, "postings.npz"),
+                     term_offsets=self._term_offsets,
+                     postings_docs=self._postings_docs,
+                     postings_tfs=self._postings_tfs,
+                     doc_lengths=self._doc_lengths)
+            write_chunk_file(os.path.join(tmp_directory, "terms.bin"), self._terms)
+            write_chunk_file(os.path.join(tmp_directory, "doc_ids.bin"), self._doc_ids)
+            write_chunk_file(os.path.join(tmp_directory, "documents.bin"), list(self._documents))
+
+            old_directory = f"{directory}.old-{uuid.uuid4().hex[:8]}"
+            if os.path.exists(directory):
+                os.rename(directory, old_directory)
+            os.rename(tmp_directory, directory)
+            shutil.rmtree(old_directory, ignore_errors=True)
+
+    @classmethod
+    def load(cls, directory: str, **kwargs) -> "LexicalIndex":
+        """Loads an index written by `save`; document texts stay memory-mapped."""
+        index = cls(**kwargs)
+        with np.load(os.path.join(directory, "postings.npz")) as postings:
+            index._term_offsets = postings["term_offsets"]
+            index._postings_docs = postings["postings_docs"]
+            index._postings_tfs = postings["postings_tfs"]
+            index._doc_lengths = postings["doc_lengths"]
+        index._terms = list(ChunkFile(os.path.join(directory, "terms.bin")))
+        index._vocabulary = {term: term_id for term_id, term in enumerate(index._terms)}
+        index._doc_ids = list(ChunkFile(os.path.join(directory, "doc_ids.bin")))
+        index._doc_positions = {doc_id: i for i, doc_id in enumerate(index._doc_ids)}
+        index._documents = ChunkFile(os.path.join(directory, "documents.bin"))
+        index._compute_weights()
+        return index
+
+
+class LexicalIndexStore:
+    """Keeps one lexical index per collection, loaded lazily and persisted under `root_dir`."""
+
+    def __init__(self, root_dir: str):
+        self.root_dir = root_dir
+        self._indexes: Dict[str, LexicalIndex] = {}
+        self._lock = threading.Lock()
+
+    def __index_directory(self, collection_name: str) -> str:
+        return os.path.join(self.root_dir, collection_name)
+
+    def get_index(self, collection_name: str) -> LexicalIndex:
+        with self._lock:
+            index = self._indexes.get(collection_name)
+            if index is None:
+                directory = self.__index_directory(collection_name)
+                index = LexicalIndex.load(directory) if os.path.exists(directory) else LexicalIndex()
+                self._indexes[collection_name] = index
+            return index
+
+    def save_index(self, collection_name: str):
+        index = self.get_index(collection_name)
+        directory = self.__index_directory(collection_name)
+        if not index.dirty and os.path.exists(directory):
+            return
+        os.makedirs(self.root_dir, exist_ok=True)
+        index.save(directory)
+        logger.info(f"Saved lexical index of '{collection_name}'")
+
+    def delete_index(self, collection_name: str):
+        with self._lock:
+            self._indexes.pop(collection_name, None)
+            shutil.rmtree(self.__index_directory(collection_name), ignore_errors=True)
+
+
+@lru_cache(maxsize=None)
+def get_lexical_index_store() -> LexicalIndexStore:
+    """Returns the process-wide lexical index store under LEXICAL_INDEX_PATH."""
+    return LexicalIndexStore(get_settings().LEXICAL_INDEX_PATH)
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator
 
 class LLMInterface(ABC):
     """Abstract base class for Large Language Model (LLM) operations."""
@@ -14,6 +14,19 @@ class LLMInterface(ABC):
         """Generates a response based on a given chat history."""
         pass
     
+    @abstractmethod
+    def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Streams the response to a text prompt, yielding text as the LLM produces it.
+        Closing the iterator early cancels the request.
+        """
+        pass
+
+    @abstractmethod
+    def stream_chat_history_response(self, chat_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Streams the response to a chat history, like `stream_response`."""
+        pass
+
     @abstractmethod
     def validate_token_limit(self, messages: List[str]):
         """Validates if the input messages exceed the max token limit."""
@@ -1,7 +1,12 @@
+from functools import lru_cache
 from stores.llm.LLMEnum import OpenAIEnums
 from stores.llm.LLMEnum import LLMsProviders
 from stores.llm.LLMInterface import LLMInterface
 from stores.llm.providers.OllamaLLMProvider import OllamaLLMProvider
+
+# Distinct provider configurations kept alive at once
+PROVIDER_CACHE_SIZE = 32
+
 class LLMProviderFactory:
     """Factory to create reranking model instances."""
 
@@ -11,11 +16,28 @@ class LLMProviderFactory:
                 system_prompt : str = None , 
                 base_url :str = None,
                 api_key : str = None) -> LLMInterface:
-        """Returns the appropriate llm instance."""
+        """
+        Returns the appropriate llm instance.
+
+        Providers are created once per configuration and shared by every request using it,
+        so they must not be mutated per request.
+        """
+        return LLMProviderFactory.__create_llm(provider, model_id, system_prompt, base_url, api_key)
+
+    @staticmethod
+    @lru_cache(maxsize=PROVIDER_CACHE_SIZE)
+    def __create_llm(provider: LLMsProviders, model_id: str, system_prompt: str, base_url: str, api_key: str) -> LLMInterface:
         if provider == LLMsProviders.OLLAMA:
             return OllamaLLMProvider(model= model_id ,
                                      base_url=base_url,
                                      system_prompt=system_prompt,
                                      )
+        if provider == LLMsProviders.OPENAI:
+            # The openai SDK takes a noticeable share of startup; load it with the first OpenAI provider
+            from stores.llm.providers.OpenAILLMProvider import OpenAILLMProvider
+            return OpenAILLMProvider(api_key=api_key,
+                                     model_id=model_id,
+                                     system_prompt=system_prompt,
+                                     )
         return None
-        #return RerankerFactory.RERANKERS[model_type.lower()]()
\ No newline at end of file
+        #return RerankerFactory.RERANKERS[model_type.lower()]()
@@ -0,0 +1,149 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from helpers.config import get_settings
+from stores.embedding.EmbeddingCache import normalize_text
+
+# What a response depends on: `scope` hashes the LLM configuration and the context
+# passages of the prompt, `question` is the normalized user question asked within that scope
+ResponseCacheKey = namedtuple("ResponseCacheKey", "scope question")
+
+_Entry = namedtuple("_Entry", "key response embedding expires_at")
+
+
+def document_id(document: str) -> str:
+    """Content hash identifying a context document, independent of where it came from."""
+    return hashlib.sha256(normalize_text(document).encode("utf-8")).hexdigest()
+
+
+def response_cache_key(provider: str, model_id: str, base_url: Optional[str], system_prompt: Optional[str],
+                       passages: List[str], question: str) -> ResponseCacheKey:
+    """
+    Builds the cache key of a generation. `passages` are the context passages that
+    reach the prompt, in prompt order (see `NLPController.select_generation_context`);
+    they are identified by content, so the same prompt context shares an entry
+    however the documents were retrieved.
+    """
+    passage_ids = [document_id(passage) for passage in passages]
+    scope = "\x00".join([provider, model_id, base_url or "", system_prompt or "", *passage_ids])
+    return ResponseCacheKey(hashlib.sha256(scope.encode("utf-8")).hexdigest(), normalize_text(question))
+
+
+class ResponseCache:
+    """
+    In-memory cache of LLM responses with TTL expiry and LRU eviction.
+
+    Exact hits match the key. When a question embedding is given, a question within
+    `similarity_threshold` cosine similarity of a cached one in the same scope (same
+    LLM configuration and context passages) is a near-duplicate hit.
+    """
+
+    def __init__(self, max_items: int = 1000, ttl_seconds: float = 3600,
+                 similarity_threshold: float = 0.95, clock: Callable[[], float] = time.monotonic):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.clock = clock
+
+        self._entries: "OrderedDict[ResponseCacheKey, _Entry]" = OrderedDict()
+        self._scopes: dict = {}
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize(embedding) -> Optional[np.ndarray]:
+        if embedding is None:
+            return None
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _drop(self, key: ResponseCacheKey):
+        self._entries.pop(key, None)
+        scope_keys = self._scopes.get(key.scope)
+        if scope_keys is not None:
+            scope_keys.pop(key, None)
+            if not scope_keys:
+                del self._scopes[key.scope]
+
+    def _live(self, key: ResponseCacheKey, now: float) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= now:
+            self._drop(key)
+            self.expirations += 1
+            return None
+        return entry
+
+    def _most_similar(self, scope: str, embedding: np.ndarray, now: float) -> Optional[_Entry]:
+        candidates = [entry for entry in (self._live(key, now) for key in list(self._scopes.get(scope, ())))
+                      if entry is not None and entry.embedding is not None and len(entry.embedding) == len(embedding)]
+        if not candidates:
+            return None
+        similarities = np.stack([entry.embedding for entry in candidates]) @ embedding
+        best = int(np.argmax(similarities))
+        return candidates[best] if similarities[best] >= self.similarity_threshold else None
+
+    def get(self, key: ResponseCacheKey, embedding: List[float] = None) -> Optional[str]:
+        """Returns the cached response for an exact or near-duplicate question, or None."""
+        now = self.clock()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self.exact_hits += 1
+            else:
+                vector = self._normalize(embedding)
+                entry = self._most_similar(key.scope, vector, now) if vector is not None else None
+                if entry is None:
+                    self.misses += 1
+                    return None
+                self.similar_hits += 1
+            self._entries.move_to_end(entry.key)
+            return entry.response
+
+    def put(self, key: ResponseCacheKey, response: str, embedding: List[float] = None):
+        expires_at = self.clock() + self.ttl_seconds if self.ttl_seconds > 0 else None
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(key, response, self._normalize(embedding), expires_at)
+            self._scopes.setdefault(key.scope, {})[key] = None
+            while len(self._entries) > self.max_items:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._scopes.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.exact_hits + self.similar_hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.exact_hits + self.similar_hits) / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "items": len(self._entries),
+            }
+
+
+@lru_cache(maxsize=None)
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache shared by the generate route."""
+    settings = get_settings()
+    return ResponseCache(max_items=settings.RESPONSE_CACHE_MAX_ITEMS,
+                         ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+                         similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD)
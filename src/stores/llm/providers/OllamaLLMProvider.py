@@ -1,12 +1,19 @@
 import os
-import requests
-from typing import List, Dict, Any
+import json
+from contextlib import aclosing
+from typing import List, Dict, Any, AsyncIterator
 from stores.llm.LLMInterface import LLMInterface
 from models.enums.LLMEnums import LLMEnums
+from helpers.http_clients import get_http_client, get_async_http_client, host_request_slot, generation_timeout
 
 
 class OllamaLLMProvider(LLMInterface):
-    """Concrete implementation of LLMInterface for Ollama Server."""
+    """
+    Concrete implementation of LLMInterface for Ollama Server.
+
+    Requests go through the shared HTTP clients of `helpers.http_clients`, so
+    connections (and TLS sessions) to the server are reused across requests.
+    """
 
     def __init__(self,
                  base_url: str ,
@@ -18,20 +25,22 @@ class OllamaLLMProvider(LLMInterface):
         self.base_url = base_url
         self.params = {}
 
+    def __prompt_messages(self, prompt: str) -> List[Dict[str, str]]:
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": "system", "content": self.system_prompt})
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
     def generate_response(self, prompt: str) -> str:
         """Generates a response from the Ollama LLM given a text prompt."""
         data = {
             "model": self.model,
             "stream": False,
-            "messages": []
+            "messages": self.__prompt_messages(prompt)
         }
-
-        if self.system_prompt:
-            data["messages"].append({"role": "system", "content": self.system_prompt})
-
-        data["messages"].append({"role": "user", "content": prompt})
         
-        response = requests.post(self.base_url, json=data)
+        response = get_http_client(self.base_url).post(self.base_url, json=data, timeout=generation_timeout())
         return response.json().get("message", {}).get("content", "No response received")
 
     def generate_chat_history_response(self, chat_history: List[Dict[str, str]]) -> str:
@@ -41,9 +50,47 @@ class OllamaLLMProvider(LLMInterface):
             "stream": False,
             "messages": chat_history
         }
-        response = requests.post(self.base_url, json=data)
+        response = get_http_client(self.base_url).post(self.base_url, json=data, timeout=generation_timeout())
         return response.json().get("message", {}).get("content", "No response received")
 
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Streams the response to a text prompt as Ollama produces it."""
+        async with aclosing(self.stream_chat_history_response(self.__prompt_messages(prompt))) as tokens:
+            async for token in tokens:
+                yield token
+
+    async def stream_chat_history_response(self, chat_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """
+        Streams the response to a chat history.
+
+        Ollama answers a streaming chat request with one JSON object per line, each
+        holding the next piece of the message. The connection is closed as soon as the
+        iterator is closed or cancelled, which stops the generation on the server.
+
+        Raises:
+            RuntimeError: If Ollama reports an error in the stream.
+            httpx.HTTPStatusError: If Ollama rejects the request.
+        """
+        data = {
+            "model": self.model,
+            "stream": True,
+            "messages": chat_history
+        }
+        async with host_request_slot(self.base_url):
+            async with get_async_http_client(self.base_url).stream("POST", self.base_url, json=data) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise RuntimeError(f"Ollama error: {chunk['error']}")
+                    content = chunk.get("message", {}).get("content")
+                    if content:
+                        yield content
+                    if chunk.get("done"):
+                        break
+
     def validate_token_limit(self, messages: List[str]):
         """Placeholder for token validation logic."""
         max_tokens = 4096  # Example limit, adjust as needed
@@ -57,4 +104,4 @@ class OllamaLLMProvider(LLMInterface):
 
     def set_model_parameters(self, **kwargs: Any):
         """Updates model parameters dynamically."""
-        self.params.update(kwargs)
\ No newline at end of file
+        self.params.update(kwargs)
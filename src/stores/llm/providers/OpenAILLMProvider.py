@@ -1,10 +1,12 @@
 import os
-from openai import OpenAI
-from typing import List, Dict, Any
+from contextlib import aclosing
+from openai import OpenAI, AsyncOpenAI
+from typing import List, Dict, Any, AsyncIterator
 from stores.llm.LLMInterface import LLMInterface
 from models.enums.LLMEnums import LLMEnums
 from stores.llm.LLMEnum import OpenAIEnums
-import tiktoken
+from helpers.http_clients import OPENAI_API_URL, get_http_client, get_async_http_client, host_request_slot
+from helpers.token_counter import count_tokens
 
 class OpenAILLMProvider(LLMInterface):
     """Implementation of LLMInterface using OpenAI API."""
@@ -25,7 +27,8 @@ class OpenAILLMProvider(LLMInterface):
         self.api_key = api_key
         self.system_prompt = system_prompt
 
-        self.client = OpenAI(api_key=self.api_key)
+        # Connections come from the shared HTTP clients, reused across providers
+        self.client = OpenAI(api_key=self.api_key, http_client=get_http_client(OPENAI_API_URL))
 
     def generate_response(self, prompt: str) -> str:
         messages = []
@@ -59,6 +62,44 @@ class OpenAILLMProvider(LLMInterface):
         
         return response.choices[0].message["content"].strip()
 
+    async def stream_response(self, prompt: str) -> AsyncIterator[str]:
+        """Streams the response to a text prompt as the model produces it."""
+        messages = []
+        if self.system_prompt:
+            messages.append({"role": OpenAIEnums.SYSTEM_MESSAGE_ROLE.value, "content": self.system_prompt})
+
+        messages.append({"role": OpenAIEnums.USER_MESSAGE_ROLE.value, "content": prompt})
+
+        async with aclosing(self.__stream(messages)) as tokens:
+            async for token in tokens:
+                yield token
+
+    async def stream_chat_history_response(self, chat_history: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Streams the response to a chat history as the model produces it."""
+        async with aclosing(self.__stream(self.construct_chat_history(chat_history))) as tokens:
+            async for token in tokens:
+                yield token
+
+    async def __stream(self, messages: List[Dict[str, str]]) -> AsyncIterator[str]:
+        """Runs a streaming completion, closing the HTTP stream when the caller stops reading."""
+        self.validate_token_limit([message["content"] for message in messages])
+
+        # Async clients are bound to the running event loop, so the wrapper is made per stream
+        async_client = AsyncOpenAI(api_key=self.api_key, http_client=get_async_http_client(OPENAI_API_URL))
+        async with host_request_slot(OPENAI_API_URL):
+            stream = await async_client.chat.completions.create(
+                model=self.model_id,
+                messages=messages,
+                max_completion_tokens=self.max_output_tokens,
+                temperature = self.temperature,
+                stream=True )
+            try:
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await stream.close()
+
     def validate_token_limit(self, messages: List[str]):
         """
         Validates that the total token count in chat history does not exceed the max_input_tokens.
@@ -66,9 +107,8 @@ class OpenAILLMProvider(LLMInterface):
         :param messages: List of chat messages.
         :raises ValueError: If the token count exceeds the allowed limit.
         """
-        encoding = tiktoken.encoding_for_model(self.model_id)  # Get token encoder
-
-        total_tokens = sum(len(encoding.encode(message)) for message in messages)
+        # The encoder is built once per model and shared, not per request
+        total_tokens = sum(count_tokens(message, self.model_id) for message in messages)
 
         if total_tokens > self.max_input_tokens:
             raise ValueError(f"Total input tokens ({total_tokens}) exceed the max limit ({self.max_input_tokens}).")
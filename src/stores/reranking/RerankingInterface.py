@@ -5,6 +5,6 @@ class RerankingInterface(ABC):
     """Abstract base class for reranking models."""
 
     @abstractmethod
-    def rerank(self, query: str, documents: list) -> list:
-        """Given a query and multiple documents, return a ranked list of (doc, score)."""
+    def rerank(self, query: str, documents: list, top_k: int = None) -> list:
+        """Given a query and multiple documents, return a ranked list of (doc, score), optionally only the top_k."""
         pass
@@ -1,6 +1,5 @@
 from  stores.reranking.RerankingInterface import RerankingInterface
 from  stores.reranking.RerankingEnum import RerankingModelsProvidersEnums , HuggingFaceLocalModelIdsEnum
-from stores.reranking.providers.HuggingFaceRerankerProvider import HuggingFaceRerankerProvider
 class RerankerProviderFactory:
     """Factory to create reranking model instances."""
 
@@ -8,6 +7,7 @@ class RerankerProviderFactory:
     def get_reranker(provider: RerankingModelsProvidersEnums , model_id : str , api_key : str = None) -> RerankingInterface:
         """Returns the appropriate reranker instance."""
         if provider == RerankingModelsProvidersEnums.HuggingFaceLocal:
+            from stores.reranking.providers.HuggingFaceRerankerProvider import HuggingFaceRerankerProvider
             return HuggingFaceRerankerProvider(model_id=HuggingFaceLocalModelIdsEnum(model_id))
         return None
         #return RerankerFactory.RERANKERS[model_type.lower()]()
\ No newline at end of file
@@ -1,39 +1,96 @@
 from  stores.reranking.RerankingInterface import RerankingInterface
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-from stores.reranking.RerankingEnum import HuggingFaceLocalModelIdsEnum
+from stores.reranking.RerankingEnum import HuggingFaceLocalModelIdsEnum, RerankingModelsProvidersEnums
 from helpers.config import get_settings
-import torch
+from helpers.model_registry import get_reranking_model_registry
+import heapq
 import os
+import weakref
 
 class HuggingFaceRerankerProvider(RerankingInterface):
-    def __init__(self, model_id: HuggingFaceLocalModelIdsEnum):
+    def __init__(self, model_id: HuggingFaceLocalModelIdsEnum, batch_size: int = None, max_length: int = None):
         """
         Initialize the reranker with a locally saved model.
+        The model and tokenizer are loaded once and shared through the reranking model registry.
 
-        :param local_model_path: The path to the locally saved Hugging Face model and tokenizer.
+        :param model_id: The locally saved Hugging Face model to use.
+        :param batch_size: Number of (query, document) pairs scored per forward pass.
+        :param max_length: Maximum number of tokens per (query, document) pair.
+        """
+        if batch_size is None or max_length is None:
+            settings = get_settings()
+            batch_size = batch_size or settings.RERANKING_BATCH_SIZE
+            max_length = max_length or settings.RERANKING_MAX_LENGTH
+
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        registry = get_reranking_model_registry()
+        provider = RerankingModelsProvidersEnums.HuggingFaceLocal.value
+        self.tokenizer, self.model = registry.acquire(provider=provider,
+                                                      model_id=model_id.value,
+                                                      loader=lambda: self.load_model(model_id))
+        self._release = weakref.finalize(self, registry.release, provider, model_id.value)
+
+    @staticmethod
+    def load_model(model_id: HuggingFaceLocalModelIdsEnum):
+        """
+        Load the tokenizer and model from RERANKING_MODELS_DIR.
+
+        :param model_id: The locally saved Hugging Face model to load.
+        :return: A (tokenizer, model) tuple, with the model in evaluation mode.
         """
         settings = get_settings()
         model_path = os.path.join(settings.RERANKING_MODELS_DIR, model_id.value)
         if not os.path.exists(model_path):
             raise ValueError(f"Model path '{model_path}' does not exist!")
 
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
-        self.model.eval()  # Set model to evaluation mode
+        # Imported on first load so that importing the provider doesn't pull in transformers
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model.eval()  # Set model to evaluation mode
+        return tokenizer, model
 
-    def rerank(self, query: str, documents: list) -> list:
+    def release(self):
+        """Drop this provider's reference to the shared model."""
+        self._release()
+
+    def rerank(self, query: str, documents: list, top_k: int = None) -> list:
         """
         Rerank the given documents based on relevance to the query.
 
+        All (query, document) pairs are tokenized in a single call, sorted by length and
+        scored in padded mini-batches of `batch_size`, so similar lengths share a batch
+        and padding stays small.
+
         :param query: The input query string.
         :param documents: A list of document strings.
+        :param top_k: If set, only the `top_k` most relevant documents are returned.
         :return: A list of (document, score), sorted by relevance.
         """
-        scores = []
-        for doc in documents:
-            inputs = self.tokenizer(query, doc, return_tensors="pt", truncation=True, padding=True)
-            with torch.no_grad():
-                score = self.model(**inputs).logits.squeeze().item()
-            scores.append((doc, score))
-        
-        return sorted(scores, key=lambda x: x[1], reverse=True)
\ No newline at end of file
+        if not documents:
+            return []
+
+        import torch
+
+        encodings = self.tokenizer([query] * len(documents), documents,
+                                   truncation=True, max_length=self.max_length)
+        lengths = [len(input_ids) for input_ids in encodings["input_ids"]]
+        order = sorted(range(len(documents)), key=lengths.__getitem__)
+
+        scores = [0.0] * len(documents)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                batch_indices = order[start:start + self.batch_size]
+                features = [{key: encodings[key][i] for key in encodings.keys()} for i in batch_indices]
+                inputs = self.tokenizer.pad(features, padding=True, return_tensors="pt")
+                logits = self.model(**inputs).logits
+                for i, score in zip(batch_indices, logits.squeeze(-1).tolist()):
+                    scores[i] = score
+
+        results = list(zip(documents, scores))
+        if top_k is not None and top_k < len(results):
+            return heapq.nlargest(top_k, results, key=lambda x: x[1])
+        return sorted(results, key=lambda x: x[1], reverse=True)
@@ -0,0 +1,48 @@
+import numpy as np
+
+# Chroma `where` operators supported by the in-process providers
+COMPARISONS = {
+    "$eq": lambda value, operand: value == operand,
+    "$ne": lambda value, operand: value != operand,
+    "$gt": lambda value, operand: value is not None and value > operand,
+    "$gte": lambda value, operand: value is not None and value >= operand,
+    "$lt": lambda value, operand: value is not None and value < operand,
+    "$lte": lambda value, operand: value is not None and value <= operand,
+    "$in": lambda value, operand: value in operand,
+    "$nin": lambda value, operand: value not in operand,
+}
+
+
+def matches(metadata: dict, where: dict) -> bool:
+    """
+    Evaluates a Chroma-style `where` filter against one metadata dict.
+
+    Supports `{"field": value}`, `{"field": {"$op": operand}}` with the operators in
+    COMPARISONS, and `$and` / `$or` over lists of filters. Several fields in one dict
+    must all match.
+
+    Raises:
+        ValueError: On an unsupported operator.
+    """
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for operator, operand in condition.items():
+                if operator not in COMPARISONS:
+                    raise ValueError(f"Unsupported metadata filter operator '{operator}'.")
+                if not COMPARISONS[operator](value, operand):
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def where_mask(metadatas: list, where: dict, n_rows: int) -> np.ndarray:
+    """Boolean mask over the first `n_rows` rows whose metadata matches `where`."""
+    return np.fromiter((matches(metadatas[row] or {}, where) for row in range(n_rows)), dtype=bool, count=n_rows)
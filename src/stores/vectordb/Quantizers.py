@@ -0,0 +1,172 @@
+from .VectorDBEnum import QuantizationEnum
+import numpy as np
+
+
+def kmeans(vectors: np.ndarray, n_clusters: int, n_iterations: int = 10, seed: int = 0, block_size: int = 8192) -> np.ndarray:
+    """
+    Lloyd's k-means with squared L2 distance, seeded with k-means++ on a subsample.
+    Returns the (n_clusters, dim) centroids.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = kmeans_plus_plus(vectors[rng.choice(len(vectors), min(len(vectors), 8 * n_clusters), replace=False)],
+                                 n_clusters, rng)
+
+    for _ in range(n_iterations):
+        sums = np.zeros_like(centroids, dtype=np.float64)
+        counts = np.zeros(n_clusters, dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            block = vectors[start:start + block_size]
+            assignment = nearest_centroids(block, centroids)
+            order = np.argsort(assignment, kind="stable")
+            cluster_ids, boundaries = np.unique(assignment[order], return_index=True)
+            sums[cluster_ids] += np.add.reduceat(block[order], boundaries, axis=0)
+            counts += np.bincount(assignment, minlength=n_clusters)
+
+        empty = counts == 0
+        centroids[~empty] = (sums[~empty] / counts[~empty, None]).astype(np.float32)
+        # Restart empty clusters from random points
+        if empty.any():
+            centroids[empty] = vectors[rng.choice(len(vectors), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def kmeans_plus_plus(vectors: np.ndarray, n_clusters: int, rng: np.random.Generator) -> np.ndarray:
+    """Picks initial centroids far apart from each other, each with probability proportional to its squared distance."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    squared_norms = np.einsum("ij,ij->i", vectors, vectors).astype(np.float64)
+    centroids = np.empty((n_clusters, vectors.shape[1]), dtype=np.float32)
+    closest = np.full(len(vectors), np.inf)
+    index = rng.integers(len(vectors))
+    for i in range(n_clusters):
+        centroids[i] = vectors[index]
+        distances = squared_norms - 2 * (vectors @ centroids[i]) + squared_norms[index]
+        closest = np.maximum(np.minimum(closest, distances), 0.0)
+        total = closest.sum()
+        index = rng.choice(len(vectors), p=closest / total) if total > 0 else rng.integers(len(vectors))
+    return centroids
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (centroids ** 2).sum(axis=1)[None, :] - 2 * vectors @ centroids.T
+    return distances.argmin(axis=1)
+
+
+class ScalarQuantizer:
+    """
+    Scalar quantization to one byte per dimension.
+
+    Each dimension is mapped linearly from the [min, max] range seen at calibration onto
+    0..255; values outside that range are clipped.
+    """
+
+    kind = QuantizationEnum.SCALAR
+
+    def __init__(self, low: np.ndarray = None, step: np.ndarray = None):
+        self.low = low
+        self.step = step
+
+    def train(self, vectors: np.ndarray):
+        self.low = vectors.min(axis=0).astype(np.float32)
+        step = (vectors.max(axis=0) - self.low) / 255
+        self.step = np.where(step > 0, step, 1.0).astype(np.float32)
+
+    def code_size(self, dim: int) -> int:
+        return dim
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.clip(np.rint((vectors - self.low) / self.step), 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return self.low + codes.astype(np.float32) * self.step
+
+    def code_norms(self, codes: np.ndarray) -> np.ndarray:
+        """Squared norms of the decoded rows, kept next to the codes so `distances` needn't decode them."""
+        decoded = self.decode(codes)
+        return np.einsum("ij,ij->i", decoded, decoded)
+
+    def distances(self, queries: np.ndarray, codes: np.ndarray, code_norms: np.ndarray = None) -> np.ndarray:
+        """Squared L2 distances between float queries and coded rows, shape (n_queries, n_rows)."""
+        if code_norms is None:
+            code_norms = self.code_norms(codes)
+        # queries @ decoded.T == queries @ low + (queries * step) @ codes.T, without materializing decoded rows
+        products = (queries * self.step) @ codes.astype(np.float32).T + (queries @ self.low)[:, None]
+        return np.maximum(code_norms[None, :] - 2 * products + (queries ** 2).sum(axis=1)[:, None], 0.0)
+
+    def state(self) -> dict:
+        return {"low": self.low, "step": self.step}
+
+
+class ProductQuantizer:
+    """
+    Product quantization: each vector is split into `n_subvectors` slices and every slice
+    is replaced by the index of its nearest of 256 centroids, so a row takes one byte per slice.
+
+    Distances use asymmetric distance computation: the query stays in float, one table of
+    query-to-centroid distances is built per slice, and a row's distance is the sum of its
+    table entries.
+    """
+
+    kind = QuantizationEnum.PQ
+
+    def __init__(self, n_subvectors: int = 16, codebooks: np.ndarray = None):
+        self.n_subvectors = n_subvectors
+        self.codebooks = codebooks
+
+    def train(self, vectors: np.ndarray):
+        dim = vectors.shape[1]
+        # Use the largest slice count that divides the dimension
+        self.n_subvectors = max(m for m in range(1, min(self.n_subvectors, dim) + 1) if dim % m == 0)
+        n_centroids = min(256, len(vectors))
+        self.codebooks = np.stack([kmeans(np.ascontiguousarray(subvectors), n_centroids)
+                                   for subvectors in np.split(vectors, self.n_subvectors, axis=1)])
+
+    def code_size(self, dim: int) -> int:
+        return self.n_subvectors
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.stack([nearest_centroids(subvectors, codebook)
+                         for subvectors, codebook in zip(np.split(vectors, self.n_subvectors, axis=1), self.codebooks)],
+                        axis=1).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.concatenate([codebook[codes[:, i]] for i, codebook in enumerate(self.codebooks)], axis=1)
+
+    def code_norms(self, codes: np.ndarray):
+        """Distances come from per-query tables, so no per-row norms are kept."""
+        return None
+
+    def distances(self, queries: np.ndarray, codes: np.ndarray, code_norms: np.ndarray = None) -> np.ndarray:
+        """Squared L2 distances between float queries and coded rows, shape (n_queries, n_rows)."""
+        n_centroids = self.codebooks.shape[1]
+        flat_codes = codes.astype(np.intp) + np.arange(self.n_subvectors) * n_centroids
+        distances = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for i, query in enumerate(queries):
+            tables = ((self.codebooks - np.stack(np.split(query, self.n_subvectors))[:, None, :]) ** 2).sum(axis=2)
+            distances[i] = tables.ravel()[flat_codes].sum(axis=1)
+        return distances
+
+    def state(self) -> dict:
+        return {"n_subvectors": np.asarray(self.n_subvectors), "codebooks": self.codebooks}
+
+
+def create_quantizer(quantization: str, pq_subvectors: int = 16):
+    """Returns an untrained quantizer, or None for unquantized collections."""
+    quantization = QuantizationEnum(quantization)
+    if quantization == QuantizationEnum.SCALAR:
+        return ScalarQuantizer()
+    if quantization == QuantizationEnum.PQ:
+        return ProductQuantizer(n_subvectors=pq_subvectors)
+    return None
+
+
+def save_quantizer(quantizer, path: str):
+    with open(path, "wb") as f:
+        np.savez(f, kind=np.asarray(quantizer.kind.value), **quantizer.state())
+
+
+def load_quantizer(path: str):
+    with np.load(path) as state:
+        kind = QuantizationEnum(str(state["kind"]))
+        if kind == QuantizationEnum.SCALAR:
+            return ScalarQuantizer(low=state["low"], step=state["step"])
+        return ProductQuantizer(n_subvectors=int(state["n_subvectors"]), codebooks=state["codebooks"])
@@ -2,3 +2,10 @@ from enum import Enum
 
 class VectorDBEnum(Enum):
     CHROMA_DB = "chromadb"
+    IVF = "ivf"
+    EXACT = "exact"
+
+class QuantizationEnum(Enum):
+    NONE = "none"
+    SCALAR = "scalar"
+    PQ = "pq"
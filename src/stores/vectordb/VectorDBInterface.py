@@ -27,11 +27,32 @@ class VectorDBInterface(ABC):
         pass
 
     @abstractmethod
-    def add_vectors(self, documents: list, embeddings: list, metadatas: list = None, ids: list = None, collection_name: str = "default", batch_size: int = 100):
+    def add_vectors(self, documents: list, embeddings: list, metadatas: list = None, ids: list = None, collection_name: str = "default", batch_size: int = None):
         pass
 
     @abstractmethod
-    def query_embeddings(self, embeddings : list , n_results , collection_name):
+    def query_embeddings(self, embeddings : list , n_results , collection_name, where: dict = None):
+        """Returns the nearest vectors of each embedding, among those whose metadata matches the Chroma-style `where` filter if given."""
+        pass
+
+    @abstractmethod
+    def get_ids(self, collection_name: str, where: dict = None) -> list:
+        """Returns the IDs of every vector in the committed version of the collection, optionally filtered by metadata."""
+        pass
+
+    @abstractmethod
+    def apply_changes(self, collection_name: str, ids: list, documents: list, embeddings: list, metadatas: list = None, delete_ids: list = None, embedding_model: str = None, kept_metadatas: dict = None):
+        """
+        Adds new vectors and removes `delete_ids`, publishing both as one new version of the collection.
+        An `embedding_model` is recorded with that version (see `get_embedding_model`). Vectors in
+        `kept_metadatas` (metadata by ID) stay as they are, except that their stored metadata is
+        updated where it differs.
+        """
+        pass
+
+    @abstractmethod
+    def get_embedding_model(self, collection_name: str):
+        """Returns the embedding model recorded with the collection's vectors, or None if none was recorded."""
         pass
 
     @abstractmethod
@@ -1,11 +1,43 @@
-from .providers.ChromaDBProvider import ChromaDBProvider
+from .providers.IVFIndexProvider import IVFIndexProvider
+from .providers.ExactSearchProvider import ExactSearchProvider
 from .VectorDBEnum import VectorDBEnum
+from helpers.config import get_settings
 class VectorDBProviderFactory:
     def __init__(self ):
         pass
 
     def create(self, provider: str , path : str):
         if provider == VectorDBEnum.CHROMA_DB.value:
+            # chromadb is slow to import; only load it when it is the configured store
+            from .providers.ChromaDBProvider import ChromaDBProvider
+            settings = get_settings()
             return ChromaDBProvider(
                 path = path,
-            )
\ No newline at end of file
+                write_concurrency = settings.CHROMA_WRITE_CONCURRENCY,
+                batch_target_seconds = settings.CHROMA_BATCH_TARGET_SECONDS,
+            )
+        if provider == VectorDBEnum.IVF.value:
+            settings = get_settings()
+            return IVFIndexProvider(
+                path = path,
+                nlist = settings.IVF_NLIST,
+                nprobe = settings.IVF_NPROBE,
+                train_min_rows = settings.IVF_TRAIN_MIN_ROWS,
+                **self.quantization_defaults(),
+            )
+        if provider == VectorDBEnum.EXACT.value:
+            return ExactSearchProvider(
+                path = path,
+                dtype = get_settings().EXACT_SEARCH_DTYPE,
+                **self.quantization_defaults(),
+            )
+
+    @staticmethod
+    def quantization_defaults() -> dict:
+        settings = get_settings()
+        return {
+            "quantization": settings.VECTORDB_QUANTIZATION,
+            "pq_subvectors": settings.VECTORDB_PQ_SUBVECTORS,
+            "rescore_factor": settings.VECTORDB_RESCORE_FACTOR,
+            "calibration_rows": settings.VECTORDB_CALIBRATION_ROWS,
+        }
@@ -1,19 +1,84 @@
 from stores.vectordb.VectorDBInterface import VectorDBInterface
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
 import chromadb
 import logging
 import numpy as np
 import os
+import threading
+import time
+
+# Collections are versioned: each vector records the generation that added it and the
+# generation that removed it, and readers only see vectors live in the committed generation.
+COMMITTED_GENERATION_KEY = "committed_gen"
+ADDED_GENERATION_KEY = "_added_gen"
+REMOVED_GENERATION_KEY = "_removed_gen"
+LIVE_GENERATION = 2 ** 62
+
+# True while a write has staged or removed vectors that aren't garbage-collected yet.
+# Only then do readers need the generation filter, which dominates the cost of a query.
+PENDING_WRITE_KEY = "pending_write"
+
+# Embedding dimension of a collection, recorded with its first vectors
+DIMENSION_KEY = "dimension"
+
+# Embedding model of a collection's vectors, recorded by the writes that pass it
+EMBEDDING_MODEL_KEY = "embedding_model"
+
+class AdaptiveBatchSize:
+    """
+    Write batch size that follows the measured write throughput, aiming for batches
+    that take about `target_seconds` each.
+    """
+
+    def __init__(self, initial: int = 256, minimum: int = 32, maximum: int = 5000, target_seconds: float = 0.5):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self._lock = threading.Lock()
+
+    def record(self, batch_size: int, seconds: float):
+        with self._lock:
+            ideal = batch_size * self.target_seconds / max(seconds, 1e-6)
+            # Move halfway towards the ideal size so one slow write doesn't collapse it
+            self.size = int(min(max((self.size + ideal) / 2, self.minimum), self.maximum))
 
 class ChromaDBProvider(VectorDBInterface):
-    
-    def __init__(self, path: str):
+    """
+    Vector store on a persistent local ChromaDB.
+
+    Collection handles are cached, and so is the collection metadata readers choose the
+    committed generation from. Writes look the collection up again before changing it,
+    but reads trust the cached metadata, so a ChromaDB path must only be served by one
+    process at a time (e.g. a single uvicorn worker).
+    """
+
+    def __init__(self, path: str, write_concurrency: int = 2, batch_target_seconds: float = 0.5):
         """
         Initialize ChromaDB provider and ensure the given path exists.
 
         Args:
         - path (str): Path where the ChromaDB data should be stored.
+        - write_concurrency (int): Write batches kept in flight at once.
+        - batch_target_seconds (float): Time each write batch should take; batch sizes adapt to it.
         """
         self.client_path = path
+        self.client = None
+        self.write_concurrency = max(1, write_concurrency)
+        self.batch_target_seconds = batch_target_seconds
+        self._batch_size = None
+        self._write_executor = None
+        self._collection_locks = {}
+        self._collection_locks_lock = threading.Lock()
+
+        # Collection handles, so each call doesn't look the collection up again
+        self._collections = {}
+        self._collections_lock = threading.Lock()
+
+        # Queries running without the generation filter, per collection
+        self._unfiltered_reads = {}
+        self._unfiltered_reads_changed = threading.Condition()
 
         # Ensure the directory exists
         if not os.path.exists(self.client_path):
@@ -27,31 +92,55 @@ class ChromaDBProvider(VectorDBInterface):
         Establish connection with ChromaDB.
         """
         self.client = chromadb.PersistentClient(self.client_path)
+        self._collections = {}
+        self._batch_size = AdaptiveBatchSize(maximum=self.client.get_max_batch_size(), target_seconds=self.batch_target_seconds)
+        if self.write_concurrency > 1:
+            self._write_executor = ThreadPoolExecutor(max_workers=self.write_concurrency, thread_name_prefix="chroma-write")
         logging.info("Connected to ChromaDB.")
     
     def disconnect(self):
         """
         Close the ChromaDB connection.
         """
+        if self._write_executor is not None:
+            self._write_executor.shutdown(wait=True)
+            self._write_executor = None
         self.client = None
+        self._collections = {}
         logging.info("Disconnected from ChromaDB.")
+
+    def __refresh_collection(self, collection_name: str):
+        """Replaces the cached handle of a collection with a fresh lookup, picking up metadata written elsewhere."""
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+        return self.__cached_collection(collection_name)
+
+    def __cached_collection(self, collection_name: str):
+        """Returns the cached handle of a collection, looking it up once if needed. None if it doesn't exist."""
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                try:
+                    collection = self.client.get_collection(collection_name)
+                except Exception:
+                    return None
+                self._collections[collection_name] = collection
+            return collection
     
     def collection_exists_flg(self, collection_name: str) -> bool:
         """
         Check if a collection exists.
         """
-        try:
-            collection = self.client.get_collection(collection_name)
-            return collection is not None
-        except Exception:
-            return False
+        return self.__cached_collection(collection_name) is not None
 
     def create_collection(self, collection_name: str):
         """
         Create a new collection if it doesn't exist.
         """
-        if not self.collection_exists_flg(collection_name):
-            self.client.create_collection(name=collection_name)
+        if self.__cached_collection(collection_name) is None:
+            with self._collections_lock:
+                self._collections[collection_name] = self.client.get_or_create_collection(
+                    name=collection_name, metadata={COMMITTED_GENERATION_KEY: 0, PENDING_WRITE_KEY: False})
             logging.info(f"Collection '{collection_name}' created.")
         else:
             logging.info(f"Collection '{collection_name}' already exists.")
@@ -60,23 +149,25 @@ class ChromaDBProvider(VectorDBInterface):
         """
         Retrieve an existing collection.
         """
-        if self.collection_exists_flg(collection_name):
-            return self.client.get_collection(name=collection_name)
-        logging.warning(f"Collection '{collection_name}' does not exist.")
-        return None
+        collection = self.__cached_collection(collection_name)
+        if collection is None:
+            logging.warning(f"Collection '{collection_name}' does not exist.")
+        return collection
 
     def delete_collection(self, collection_name: str):
         """
         Delete a collection.
         """
-        if self.collection_exists_flg(collection_name):
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+        try:
             self.client.delete_collection(name=collection_name)
             logging.info(f"Collection '{collection_name}' deleted.")
-        else:
+        except Exception:
             logging.warning(f"Collection '{collection_name}' not found.")
 
 
-    def add_vectors(self, documents: list, embeddings: list, metadatas: list = None, ids: list = None, collection_name: str = "default", batch_size: int = 100):
+    def add_vectors(self, documents: list, embeddings: list, metadatas: list = None, ids: list = None, collection_name: str = "default", batch_size: int = None):
         """
         Add vectors (embeddings) to a collection in batches with dimension validation against existing embeddings.
 
@@ -86,7 +177,7 @@ class ChromaDBProvider(VectorDBInterface):
         - metadatas (list, optional): List of metadata dictionaries. If None, defaults to empty dictionaries.
         - ids (list, optional): List of unique IDs. If None, generates sequential numeric IDs.
         - collection_name (str): Target collection name.
-        - batch_size (int): Number of embeddings per batch (default=100).
+        - batch_size (int, optional): Number of embeddings per batch. Adapts to the write speed if None.
         """
         collection = self.get_collection(collection_name)
         if not collection:
@@ -101,63 +192,307 @@ class ChromaDBProvider(VectorDBInterface):
         if ids is None:
             ids = [str(i) for i in range(len(documents))]  # Generate numeric string IDs
 
-        # Step 1: Check existing embeddings in collection
-        existing_data = collection.query(query_embeddings=[[0] * len(embeddings[0])], n_results=1)  # Dummy query
-
-        if existing_data and 'embeddings' in existing_data and existing_data['embeddings']:
-            existing_dim = len(existing_data['embeddings'][0])  # Get the stored embedding dimension
-        else:
-            existing_dim = len(embeddings[0])  # Use the first new embedding's dimension if collection is empty
+        # In a versioned collection, directly added vectors belong to the committed generation
+        generation = self.__committed_generation(collection)
+        if generation is not None:
+            metadatas = [{**m, ADDED_GENERATION_KEY: generation, REMOVED_GENERATION_KEY: LIVE_GENERATION} for m in metadatas]
 
-        # Step 2: Validate new embeddings against expected dimension
-        embedding_dims = [len(emb) for emb in embeddings]
-        unique_dims = set(embedding_dims)
-
-        if len(unique_dims) > 1 or existing_dim not in unique_dims:
-            logging.error(f"Inconsistent embedding dimensions found: {unique_dims}. Expected dimension: {existing_dim}.")
+        # Validate new embeddings against the collection's dimension
+        try:
+            expected_dim = self.__check_dimension(collection, embeddings)
+        except ValueError as e:
+            logging.error(str(e))
             return
+        logging.info(f"Embedding dimension check passed. Expected dimension: {expected_dim}")
 
-        logging.info(f"Embedding dimension check passed. Expected dimension: {existing_dim}")
-
-        # Step 3: Insert embeddings in batches
-        total_vectors = len(embeddings)
-        for i in range(0, total_vectors, batch_size):
-            batch_documents = documents[i:i + batch_size]
-            batch_embeddings = embeddings[i:i + batch_size]
-            batch_metadatas = metadatas[i:i + batch_size]
-            batch_ids = ids[i:i + batch_size]
-
-            collection.add(
-                embeddings=batch_embeddings,
-                metadatas=batch_metadatas,
-                ids=batch_ids,
-                documents=batch_documents
-            )
-            logging.info(f"Inserted batch {i // batch_size + 1} ({len(batch_embeddings)} vectors) into '{collection_name}'.")
-
-        logging.info(f"Successfully added {total_vectors} vectors to '{collection_name}' in batches of {batch_size}.")
+        # Insert embeddings in concurrently written batches
+        self.__write_batches(collection.add, batch_size, ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+        logging.info(f"Successfully added {len(ids)} vectors to '{collection_name}'.")
         
             
-    def query_embeddings(self, embeddings: list, n_results: int, collection_name: str):
+    def query_embeddings(self, embeddings: list, n_results: int, collection_name: str, where: dict = None):
         """
-        Query similar embeddings from the collection.
+        Query similar embeddings from the collection, optionally restricted to vectors
+        whose metadata matches the Chroma `where` filter.
         """
         collection = self.get_collection(collection_name)
         if collection:
-            results = collection.query(query_embeddings=embeddings, n_results=n_results)
+            with self.__visible_rows(collection_name, collection, where) as where:
+                results = collection.query(query_embeddings=embeddings, n_results=n_results, where=where)
+            # Generation bookkeeping is internal to the provider
+            for metadatas in results.get("metadatas") or []:
+                for metadata in metadatas:
+                    if metadata:
+                        metadata.pop(ADDED_GENERATION_KEY, None)
+                        metadata.pop(REMOVED_GENERATION_KEY, None)
             return results
         logging.warning(f"Cannot query. Collection '{collection_name}' not found.")
         return None
 
 
+    def get_ids(self, collection_name: str, where: dict = None) -> list:
+        """
+        Retrieve the IDs of all vectors in the committed version of a collection,
+        optionally restricted to vectors whose metadata matches `where`.
+        """
+        collection = self.get_collection(collection_name)
+        if not collection:
+            return []
+        with self.__visible_rows(collection_name, collection, where) as where:
+            return collection.get(where=where, include=[])["ids"]
+
+    def apply_changes(self, collection_name: str, ids: list, documents: list, embeddings: list, metadatas: list = None, delete_ids: list = None, embedding_model: str = None, kept_metadatas: dict = None, batch_size: int = None):
+        """
+        Publish new vectors and deletions as one new version of the collection.
+
+        New vectors are staged under the next generation and deleted vectors are marked as
+        removed from it; readers keep querying the committed generation until a single
+        collection metadata write commits the new one. Removed vectors are then deleted.
+        Kept vectors whose metadata changed are updated in place just before the commit.
+
+        Args:
+        - collection_name (str): Target collection name (created if missing).
+        - ids (list): IDs of the vectors to add. They should not be live already.
+        - documents (list): Documents of the vectors to add.
+        - embeddings (list): Embeddings of the vectors to add.
+        - metadatas (list, optional): Metadata dictionaries of the vectors to add.
+        - delete_ids (list, optional): IDs of the vectors to remove.
+        - embedding_model (str, optional): Embedding model of the vectors, recorded with the commit.
+        - kept_metadatas (dict, optional): Metadata of vectors kept as they are, by ID. Those whose
+          stored metadata differs from it are updated.
+        - batch_size (int, optional): Number of vectors per write. Adapts to the write speed if None.
+
+        Returns:
+        - int: The newly committed generation, or the current one if there was nothing to write.
+        """
+        delete_ids = list(delete_ids or [])
+        if metadatas is None:
+            metadatas = [{} for _ in ids]
+
+        with self.__collection_lock(collection_name):
+            # Decisions below depend on the collection metadata, so don't trust a cached copy of it
+            collection = self.__refresh_collection(collection_name)
+            if collection is None:
+                self.create_collection(collection_name)
+                collection = self.get_collection(collection_name)
+
+            if len(ids):
+                self.__check_dimension(collection, embeddings)
+
+            generation = self.__committed_generation(collection)
+            if generation is None:
+                generation = self.__adopt_unversioned_collection(collection, batch_size)
+            if (collection.metadata or {}).get(PENDING_WRITE_KEY):
+                # An earlier write was interrupted before it could clean up after itself
+                self.__roll_back_pending_write(collection, batch_size)
+            update_ids, update_metadatas = self.__changed_metadatas(collection, kept_metadatas or {}, batch_size)
+            records_model = embedding_model and embedding_model != (collection.metadata or {}).get(EMBEDDING_MODEL_KEY)
+            if not (len(ids) or delete_ids or update_ids or records_model):
+                return generation
+            new_generation = generation + 1
+            self.__begin_pending_write(collection_name, collection)
+
+            try:
+                # Step 1: Stage new vectors, invisible until the commit
+                staged_metadatas = [{**m, ADDED_GENERATION_KEY: new_generation, REMOVED_GENERATION_KEY: LIVE_GENERATION} for m in metadatas]
+                self.__write_batches(collection.upsert, batch_size, ids=ids, embeddings=embeddings, documents=documents, metadatas=staged_metadatas)
+
+                # Step 2: Mark vanished vectors as removed from the new generation on
+                self.__write_batches(collection.update, batch_size, ids=delete_ids,
+                                     metadatas=[{REMOVED_GENERATION_KEY: new_generation}] * len(delete_ids))
+
+                # Step 3: Bring the metadata of kept vectors in line, e.g. positions shifted by an edit
+                self.__write_batches(collection.update, batch_size, ids=update_ids, metadatas=update_metadatas)
+
+                # Step 4: Commit, switching readers to the new generation in one write
+                self.__set_committed_generation(collection, new_generation,
+                                                {EMBEDDING_MODEL_KEY: embedding_model} if embedding_model else None)
+
+                # Step 5: Garbage-collect vectors no reader can see anymore
+                self.__write_batches(collection.delete, batch_size, ids=delete_ids)
+            except Exception:
+                # Otherwise the next write would commit this one's staged vectors under the same generation
+                try:
+                    self.__roll_back_pending_write(collection, batch_size)
+                    self.__update_metadata(collection, {PENDING_WRITE_KEY: False})
+                except Exception as e:
+                    logging.error(f"Rolling back the failed write to '{collection_name}' failed, the next write retries: {e}")
+                raise
+            self.__update_metadata(collection, {PENDING_WRITE_KEY: False})
+
+        logging.info(f"Committed generation {new_generation} of '{collection_name}': {len(ids)} added, "
+                     f"{len(delete_ids)} deleted, {len(update_ids)} updated.")
+        return new_generation
+
+    def get_embedding_model(self, collection_name: str):
+        """
+        Returns the embedding model recorded with the collection's vectors, or None.
+        """
+        collection = self.get_collection(collection_name)
+        return (collection.metadata or {}).get(EMBEDDING_MODEL_KEY) if collection else None
+
+    def __collection_lock(self, collection_name: str) -> threading.Lock:
+        with self._collection_locks_lock:
+            return self._collection_locks.setdefault(collection_name, threading.Lock())
+
+    def __write_batches(self, write, batch_size: int = None, **columns):
+        """
+        Calls `write` (e.g. `collection.upsert`) on consecutive slices of the columns.
+
+        Up to `write_concurrency` batches are in flight at once. Without an explicit
+        `batch_size`, each batch takes the current adaptive size, which follows how long
+        the previous writes took.
+        """
+        total = len(columns["ids"])
+        pending = set()
+        start = 0
+        try:
+            while start < total or pending:
+                while start < total and len(pending) < self.write_concurrency:
+                    end = min(start + (batch_size or self._batch_size.size), total)
+                    batch = {name: values[start:end] for name, values in columns.items()}
+                    if self._write_executor is None:
+                        self.__timed_write(write, batch, adapt=batch_size is None)
+                    else:
+                        pending.add(self._write_executor.submit(self.__timed_write, write, batch, batch_size is None))
+                    start = end
+                if pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+        finally:
+            # Never leave writes running behind a failed batch
+            wait(pending)
+
+    def __timed_write(self, write, batch: dict, adapt: bool):
+        started = time.perf_counter()
+        write(**batch)
+        if adapt:
+            self._batch_size.record(len(batch["ids"]), time.perf_counter() - started)
+
+    def __check_dimension(self, collection, embeddings) -> int:
+        """
+        Checks new embeddings against the dimension recorded in the collection metadata,
+        recording it first if the collection doesn't have one yet.
+
+        Raises:
+            ValueError: If the embeddings don't all have the collection's dimension.
+        """
+        dimension = (collection.metadata or {}).get(DIMENSION_KEY)
+        if dimension is None:
+            # Collections from before the dimension was recorded: look at one stored vector
+            stored = collection.get(limit=1, include=["embeddings"])["embeddings"]
+            dimension = len(stored[0]) if stored is not None and len(stored) else len(embeddings[0])
+            self.__update_metadata(collection, {DIMENSION_KEY: dimension})
+
+        dimensions = {len(embedding) for embedding in embeddings}
+        if dimensions != {dimension}:
+            raise ValueError(f"Inconsistent embedding dimensions found: {dimensions}. Expected dimension: {dimension}.")
+        return dimension
+
+    def __committed_generation(self, collection):
+        return (collection.metadata or {}).get(COMMITTED_GENERATION_KEY)
+
+    def __set_committed_generation(self, collection, generation: int, changes: dict = None):
+        self.__update_metadata(collection, {**(changes or {}), COMMITTED_GENERATION_KEY: generation})
+
+    def __update_metadata(self, collection, changes: dict):
+        metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+        metadata.update(changes)
+        collection.modify(metadata=metadata)
+
+    def __visible_filter(self, generation: int) -> dict:
+        return {"$and": [{ADDED_GENERATION_KEY: {"$lte": generation}}, {REMOVED_GENERATION_KEY: {"$gt": generation}}]}
+
+    @contextmanager
+    def __visible_rows(self, collection_name: str, collection, where: dict = None):
+        """
+        Yields the `where` filter a read needs to see only the committed generation,
+        combined with the caller's own `where`.
+
+        Without a pending write every stored vector is committed and live, so the read
+        runs with the caller's filter alone; it is counted until it ends, so a writer
+        can wait for it.
+        """
+        with self._unfiltered_reads_changed:
+            # Read under the lock a writer holds while setting the pending flag, so a read
+            # is either counted before the write begins or sees the flag set. The flag is set
+            # on the cached handle, which a writer may have refreshed since this read took its own.
+            metadata = (self._collections.get(collection_name) or collection).metadata or {}
+            generation = metadata.get(COMMITTED_GENERATION_KEY)
+            # A missing flag means an older collection whose state is unknown
+            unfiltered = generation is not None and metadata.get(PENDING_WRITE_KEY) is False
+            if unfiltered:
+                self._unfiltered_reads[collection_name] = self._unfiltered_reads.get(collection_name, 0) + 1
+        if generation is None:
+            yield where or None
+            return
+        if not unfiltered:
+            visible = self.__visible_filter(generation)
+            yield {"$and": [*visible["$and"], where]} if where else visible
+            return
+        try:
+            yield where or None
+        finally:
+            with self._unfiltered_reads_changed:
+                self._unfiltered_reads[collection_name] -= 1
+                self._unfiltered_reads_changed.notify_all()
+
+    def __begin_pending_write(self, collection_name: str, collection):
+        """Switches readers to the generation filter and waits for unfiltered reads still running."""
+        with self._unfiltered_reads_changed:
+            self.__update_metadata(collection, {PENDING_WRITE_KEY: True})
+            self._unfiltered_reads_changed.wait_for(lambda: not self._unfiltered_reads.get(collection_name))
+
+    def __changed_metadatas(self, collection, kept_metadatas: dict, batch_size: int = None):
+        """Returns the IDs in `kept_metadatas` whose stored metadata differs from it, with their new metadata."""
+        update_ids, update_metadatas = [], []
+        kept_ids = list(kept_metadatas)
+        step = batch_size or self._batch_size.size
+        for start in range(0, len(kept_ids), step):
+            stored = collection.get(ids=kept_ids[start:start + step], include=["metadatas"])
+            for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+                # Updates merge keys, so only the keys being written are compared
+                new_metadata = kept_metadatas[chunk_id]
+                if any((metadata or {}).get(key) != value for key, value in new_metadata.items()):
+                    update_ids.append(chunk_id)
+                    update_metadatas.append(new_metadata)
+        return update_ids, update_metadatas
+
+    def __roll_back_pending_write(self, collection, batch_size: int = None):
+        """
+        Brings a collection back to its committed generation after an unfinished write:
+        vectors staged past it are deleted, vectors it removed are garbage-collected and
+        removal marks past it are cleared.
+        """
+        generation = self.__committed_generation(collection)
+        staged = collection.get(where={ADDED_GENERATION_KEY: {"$gt": generation}}, include=[])["ids"]
+        removed = collection.get(where={REMOVED_GENERATION_KEY: {"$lte": generation}}, include=[])["ids"]
+        marked = collection.get(where={"$and": [{REMOVED_GENERATION_KEY: {"$gt": generation}},
+                                                {REMOVED_GENERATION_KEY: {"$lt": LIVE_GENERATION}}]}, include=[])["ids"]
+        self.__write_batches(collection.delete, batch_size, ids=staged + removed)
+        self.__write_batches(collection.update, batch_size, ids=marked,
+                             metadatas=[{REMOVED_GENERATION_KEY: LIVE_GENERATION}] * len(marked))
+        if staged or removed or marked:
+            logging.warning(f"Rolled back an unfinished write to '{collection.name}': {len(staged)} staged vectors dropped, "
+                            f"{len(marked)} removals undone.")
+
+    def __adopt_unversioned_collection(self, collection, batch_size: int = None) -> int:
+        """Stamps every vector of a collection created before versioning as live in generation 0."""
+        existing_ids = collection.get(include=[])["ids"]
+        self.__write_batches(collection.update, batch_size, ids=existing_ids,
+                             metadatas=[{ADDED_GENERATION_KEY: 0, REMOVED_GENERATION_KEY: LIVE_GENERATION}] * len(existing_ids))
+        self.__set_committed_generation(collection, 0)
+        return 0
+
     def get_collection_info(self, collection_name: str):
         """
         Retrieve metadata and number of embeddings stored in a collection.
         """
         collection = self.get_collection(collection_name)
-        sample_data = collection.get(include=['embeddings', 'documents', 'metadatas'] , limit=3)
         if collection:
             try:
+                sample_data = collection.get(include=['embeddings', 'documents', 'metadatas'] , limit=3)
                 count = collection.count()  # Get total number of embeddings
                 info = {
                     "collection_name": collection_name,
@@ -0,0 +1,118 @@
+from .FileVectorDB import FileCollection, FileVectorDBProvider, smallest
+import numpy as np
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# Unit-length components lie in [-1, 1], so int8 rows store round(x * 127)
+INT8_SCALE = 127.0
+
+# Codes are widened to float32 block by block, so quantized blocks stay small whatever the query count
+QUANTIZED_BLOCK_ROWS = 65536
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+class ExactCollection(FileCollection):
+    """
+    Collection searched by brute force over one contiguous matrix of unit-length rows,
+    stored as float32, float16 or int8.
+
+    A batch of queries is scored with one matrix multiply per block of rows, followed by
+    `argpartition` to keep each query's top results. Blocks bound the size of the score
+    matrix; float16 and int8 blocks are widened to float32 so the multiply runs in BLAS.
+    Quantized collections scan their codes instead and rescore the best candidates.
+    Distances are cosine distances (1 - cosine similarity).
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32", max_scores: int = 1 << 24, **kwargs):
+        if dtype not in SUPPORTED_DTYPES:
+            raise ValueError(f"Unsupported exact search dtype '{dtype}'. Use one of {', '.join(SUPPORTED_DTYPES)}.")
+        self.max_scores = max_scores
+        super().__init__(directory, dtype=dtype, **kwargs)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = normalize(vectors)
+        if self.dtype == np.int8:
+            return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+        return vectors.astype(self.dtype)
+
+    def decode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / INT8_SCALE if self.dtype == np.int8 else vectors
+
+    def query(self, query_embeddings: list, n_results: int, where: dict = None) -> dict:
+        """
+        Returns the `n_results` rows most similar to each query among the rows matching
+        `where`, shaped like a Chroma `query` result.
+        """
+        snapshot = self.filtered(self._snapshot, where)
+        queries = normalize(np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1))
+        n_candidates = self.candidate_count(snapshot, n_results)
+
+        if snapshot.codes is None:
+            # Scaling the queries instead of the rows saves widening int8 rows twice
+            scaled_queries = queries / INT8_SCALE if self.dtype == np.int8 else queries
+            def score_block(start, end):
+                block = snapshot.vectors[start:end]
+                return scaled_queries @ (block if block.dtype == np.float32 else block.astype(np.float32)).T
+        else:
+            # Squared L2 between unit vectors is 2 - 2 * cosine similarity
+            def score_block(start, end):
+                code_norms = snapshot.code_norms[start:end] if snapshot.code_norms is not None else None
+                return 1 - self.quantizer.distances(queries, snapshot.codes[start:end], code_norms) / 2
+
+        best_scores, best_rows = self.__scan(snapshot, score_block, len(queries), n_candidates)
+
+        rows_per_query, distances_per_query = [], []
+        for query, scores, rows in zip(queries, best_scores, best_rows):
+            found = np.isfinite(scores)
+            rows, distances = rows[found], 1.0 - scores[found]
+            if snapshot.codes is not None and self.rescore_factor:
+                # Rescore the candidates against the full-precision rows
+                distances = 1.0 - self.decode(snapshot.vectors[rows]) @ query
+            top = smallest(distances, n_results)
+            rows_per_query.append(rows[top])
+            distances_per_query.append(np.maximum(distances[top], 0.0))
+        return self.query_result(snapshot, rows_per_query, distances_per_query)
+
+    def __scan(self, snapshot, score_block, n_queries: int, k: int):
+        """Scores every row block by block and keeps the `k` best live rows of each query."""
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((n_queries, 0), dtype=np.int64)
+        block_size = max(1024, self.max_scores // max(n_queries, 1))
+        if snapshot.codes is not None:
+            block_size = min(block_size, QUANTIZED_BLOCK_ROWS)
+
+        for start in range(0, snapshot.n_rows, block_size):
+            end = min(start + block_size, snapshot.n_rows)
+            scores = score_block(start, end)
+            scores[:, ~snapshot.alive[start:end]] = -np.inf
+
+            # Merge this block's candidates with the best rows so far
+            rows = np.broadcast_to(np.arange(start, end), scores.shape)
+            scores = np.concatenate([best_scores, scores], axis=1)
+            rows = np.concatenate([best_rows, rows], axis=1)
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, top, axis=1)
+                rows = np.take_along_axis(rows, top, axis=1)
+            best_scores, best_rows = scores, rows
+        return best_scores, best_rows
+
+
+class ExactSearchProvider(FileVectorDBProvider):
+    """
+    In-process vector store answering queries by exact search.
+
+    Meant for small and medium collections, where an ANN index buys little and a
+    client round trip per query dominates. `dtype` applies to new collections; an
+    existing collection keeps the dtype it was created with.
+    """
+
+    collection_class = ExactCollection
+
+    def __init__(self, path: str, dtype: str = "float32", **collection_defaults):
+        super().__init__(path, dtype=dtype, **collection_defaults)
@@ -0,0 +1,486 @@
+from stores.vectordb.VectorDBInterface import VectorDBInterface
+from stores.vectordb.VectorDBEnum import QuantizationEnum
+from stores.vectordb.Quantizers import create_quantizer, save_quantizer, load_quantizer
+from stores.vectordb.MetadataFilter import where_mask
+from collections import namedtuple
+import json
+import logging
+import numpy as np
+import os
+import shutil
+import threading
+
+CONFIG_FILE = "config.json"
+VECTORS_FILE = "vectors.bin"
+ROWS_FILE = "rows.jsonl"
+CODES_FILE = "codes.bin"
+QUANTIZER_FILE = "quantizer.npz"
+
+# Immutable view of a collection handed to readers; writers publish a new one.
+# `index` holds whatever search structure the collection type keeps next to the rows,
+# `codes` the quantized rows once the collection's quantizer is calibrated, and `code_norms`
+# the per-row norms the quantizer computes distances with (None if it keeps none).
+Snapshot = namedtuple("Snapshot", "n_rows vectors alive ids documents metadatas index codes code_norms")
+
+
+def smallest(values: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the `k` smallest values, in ascending order of value."""
+    if len(values) > k:
+        top = np.argpartition(values, k - 1)[:k]
+    else:
+        top = np.arange(len(values))
+    return top[np.argsort(values[top], kind="stable")]
+
+
+class FileCollection:
+    """
+    A collection stored in its own directory as flat files.
+
+    - `vectors.bin`: encoded vector rows appended in insertion order, memory-mapped for reads.
+    - `rows.jsonl`: append-only log of additions (id, document, metadata), metadata updates and deletions.
+      A row exists once its log line is written, so a torn write only loses that write.
+    - `config.json`: dimension, storage dtype, quantization and whatever the collection type persists.
+    - `codes.bin` and `quantizer.npz`: quantized copies of the rows, for quantized collections.
+
+    A quantized collection (`quantization` "scalar" or "pq") calibrates its quantizer on the
+    first `calibration_rows` rows and from then on encodes rows as they are inserted. Searches
+    scan the compact codes with asymmetric distances and, when `rescore_factor` is set, rescore
+    the best `rescore_factor * n_results` candidates against the full-precision rows, which stay
+    on disk and are only paged in for those candidates.
+
+    Reads work on immutable snapshots, so they never wait for writers. Subclasses choose
+    how vectors are encoded (`encode`, `decode`), keep a search structure in `Snapshot.index`
+    (`build_index`, `extend_index`, `after_write`) and implement `query`.
+    """
+
+    def __init__(self, directory: str, dtype: str = "float32", compact_min_rows: int = 1024,
+                 quantization: str = QuantizationEnum.NONE.value, pq_subvectors: int = 16,
+                 rescore_factor: int = 10, calibration_rows: int = 4096):
+        self.directory = directory
+        self.name = os.path.basename(directory)
+        self.compact_min_rows = compact_min_rows
+        self.calibration_rows = calibration_rows
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        config_path = os.path.join(directory, CONFIG_FILE)
+        if os.path.exists(config_path):
+            with open(config_path, "r") as f:
+                self.config = json.load(f)
+        else:
+            self.config = {"dim": None, "dtype": dtype, "quantization": QuantizationEnum(quantization).value,
+                           "pq_subvectors": pq_subvectors, "rescore_factor": rescore_factor}
+            self.write_config()
+        self.dtype = np.dtype(self.config.get("dtype", "float32"))
+        self.quantization = QuantizationEnum(self.config.get("quantization", QuantizationEnum.NONE.value))
+        self.rescore_factor = self.config.get("rescore_factor", 0)
+
+        quantizer_path = os.path.join(directory, QUANTIZER_FILE)
+        self.quantizer = load_quantizer(quantizer_path) if os.path.exists(quantizer_path) else None
+
+        self._id_rows = {}
+        self._snapshot = self.__load()
+
+    # ---- hooks ----
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Converts float32 vectors to the stored representation."""
+        return vectors.astype(self.dtype)
+
+    def decode(self, vectors: np.ndarray) -> np.ndarray:
+        """Converts stored rows back to float32; quantizers are calibrated on these."""
+        return np.asarray(vectors, dtype=np.float32)
+
+    def build_index(self, vectors: np.ndarray):
+        """Returns the search structure for the rows loaded from disk."""
+        return None
+
+    def extend_index(self, snapshot: Snapshot, first_row: int):
+        """Returns the search structure of `snapshot` with rows `first_row:` added."""
+        return snapshot.index
+
+    def after_write(self, snapshot: Snapshot) -> Snapshot:
+        """Called with every new snapshot before it is published."""
+        return snapshot
+
+    def query(self, query_embeddings: list, n_results: int, where: dict = None) -> dict:
+        raise NotImplementedError
+
+    # ---- persistence ----
+
+    def write_config(self):
+        tmp_path = os.path.join(self.directory, CONFIG_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.config, f)
+        os.replace(tmp_path, os.path.join(self.directory, CONFIG_FILE))
+
+    def __map_vectors(self, n_rows: int) -> np.ndarray:
+        dim = self.config["dim"] or 0
+        if n_rows == 0 or dim == 0:
+            return np.zeros((0, dim), dtype=self.dtype)
+        return np.memmap(os.path.join(self.directory, VECTORS_FILE), dtype=self.dtype, mode="r", shape=(n_rows, dim))
+
+    def __map_codes(self, n_rows: int):
+        if self.quantizer is None:
+            return None
+        code_size = self.quantizer.code_size(self.config["dim"])
+        if n_rows == 0:
+            return np.zeros((0, code_size), dtype=np.uint8)
+        return np.memmap(os.path.join(self.directory, CODES_FILE), dtype=np.uint8, mode="r", shape=(n_rows, code_size))
+
+    def __append_codes(self, vectors: np.ndarray, first_row: int, block_size: int = 65536):
+        """Encodes stored rows `first_row:` of `vectors` and appends them to the codes file."""
+        with open(os.path.join(self.directory, CODES_FILE), "ab") as f:
+            for start in range(first_row, len(vectors), block_size):
+                f.write(self.quantizer.encode(self.decode(vectors[start:start + block_size])).tobytes())
+
+    def __extend_code_norms(self, code_norms, codes: np.ndarray, first_row: int, block_size: int = 65536):
+        """Returns `code_norms` extended with the quantizer's norms of rows `first_row:` of `codes`."""
+        blocks = [self.quantizer.code_norms(codes[start:start + block_size])
+                  for start in range(first_row, len(codes), block_size)]
+        if not blocks:
+            return code_norms
+        if blocks[0] is None:
+            return None
+        return np.concatenate(([code_norms] if code_norms is not None else []) + blocks)
+
+    def __calibrate(self, snapshot: Snapshot) -> Snapshot:
+        """Trains the quantizer on the rows so far and encodes all of them."""
+        live_rows = np.flatnonzero(snapshot.alive)
+        sample = np.sort(np.random.default_rng(0).choice(live_rows, min(len(live_rows), 65536), replace=False))
+        quantizer = create_quantizer(self.quantization.value, self.config.get("pq_subvectors", 16))
+        quantizer.train(self.decode(snapshot.vectors[sample]))
+
+        self.quantizer = quantizer
+        codes_path = os.path.join(self.directory, CODES_FILE)
+        if os.path.exists(codes_path):
+            os.remove(codes_path)
+        self.__append_codes(snapshot.vectors, 0)
+        tmp_path = os.path.join(self.directory, QUANTIZER_FILE + ".tmp")
+        save_quantizer(quantizer, tmp_path)
+        os.replace(tmp_path, os.path.join(self.directory, QUANTIZER_FILE))
+        logging.info(f"Calibrated {self.quantization.value} quantization for '{self.name}' on {len(sample)} vectors.")
+        codes = self.__map_codes(snapshot.n_rows)
+        return snapshot._replace(codes=codes, code_norms=self.__extend_code_norms(None, codes, 0))
+
+    def __load(self) -> Snapshot:
+        ids, documents, metadatas, alive = [], [], [], []
+        rows_path = os.path.join(self.directory, ROWS_FILE)
+        if os.path.exists(rows_path):
+            with open(rows_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        logging.warning(f"Ignoring a torn write at the end of '{rows_path}'.")
+                        break
+                    if record["op"] == "update":
+                        row = self._id_rows.get(record["id"])
+                        if row is not None:
+                            metadatas[row] = record["metadata"]
+                        continue
+                    row = self._id_rows.pop(record["id"], None)
+                    if row is not None:
+                        alive[row] = False
+                    if record["op"] == "add":
+                        self._id_rows[record["id"]] = len(ids)
+                        ids.append(record["id"])
+                        documents.append(record["document"])
+                        metadatas.append(record["metadata"])
+                        alive.append(True)
+
+        # Drop vectors written after the last complete log line
+        vectors_path = os.path.join(self.directory, VECTORS_FILE)
+        if self.config["dim"]:
+            expected_size = len(ids) * self.config["dim"] * self.dtype.itemsize
+            if not os.path.exists(vectors_path) or os.path.getsize(vectors_path) < expected_size:
+                raise ValueError(f"Vector file of collection '{self.name}' is shorter than its row log.")
+            if os.path.getsize(vectors_path) > expected_size:
+                os.truncate(vectors_path, expected_size)
+
+        vectors = self.__map_vectors(len(ids))
+        codes = code_norms = None
+        if self.quantizer is not None:
+            # Codes are derived from the vectors, so a torn write is repaired by re-encoding
+            codes_path = os.path.join(self.directory, CODES_FILE)
+            code_size = self.quantizer.code_size(self.config["dim"])
+            coded_rows = os.path.getsize(codes_path) // code_size if os.path.exists(codes_path) else 0
+            if coded_rows > len(ids) or (os.path.exists(codes_path) and os.path.getsize(codes_path) % code_size):
+                os.truncate(codes_path, min(coded_rows, len(ids)) * code_size)
+            if coded_rows < len(ids):
+                self.__append_codes(vectors, coded_rows)
+            codes = self.__map_codes(len(ids))
+            code_norms = self.__extend_code_norms(None, codes, 0)
+        return Snapshot(len(ids), vectors, np.asarray(alive, dtype=bool), ids, documents, metadatas,
+                        self.build_index(vectors), codes, code_norms)
+
+    # ---- reads ----
+
+    def count(self) -> int:
+        return int(self._snapshot.alive.sum())
+
+    def filtered(self, snapshot: Snapshot, where: dict = None) -> Snapshot:
+        """Returns `snapshot` with only the rows matching the metadata filter `where` alive."""
+        if not where:
+            return snapshot
+        return snapshot._replace(alive=snapshot.alive & where_mask(snapshot.metadatas, where, snapshot.n_rows))
+
+    def get(self, ids: list = None, include: list = None, limit: int = None, where: dict = None) -> dict:
+        """Returns live rows in insertion order, shaped like a Chroma `get` result."""
+        snapshot = self.filtered(self._snapshot, where)
+        include = include if include is not None else ["documents", "metadatas"]
+        if ids is None:
+            rows = np.flatnonzero(snapshot.alive)
+        else:
+            rows = np.asarray([row for row in (self._id_rows.get(i) for i in ids)
+                               if row is not None and row < snapshot.n_rows and snapshot.alive[row]], dtype=np.int64)
+        if limit is not None:
+            rows = rows[:limit]
+
+        result = {"ids": [snapshot.ids[row] for row in rows]}
+        if "documents" in include:
+            result["documents"] = [snapshot.documents[row] for row in rows]
+        if "metadatas" in include:
+            result["metadatas"] = [snapshot.metadatas[row] for row in rows]
+        if "embeddings" in include:
+            result["embeddings"] = self.decode(snapshot.vectors[rows])
+        return result
+
+    def candidate_count(self, snapshot: Snapshot, n_results: int) -> int:
+        """Number of candidates to take from the codes before rescoring."""
+        if snapshot.codes is None or not self.rescore_factor:
+            return n_results
+        return n_results * self.rescore_factor
+
+    @staticmethod
+    def query_result(snapshot: Snapshot, rows_per_query: list, distances_per_query: list) -> dict:
+        """Shapes per-query rows and distances like a Chroma `query` result."""
+        return {
+            "ids": [[snapshot.ids[row] for row in rows] for rows in rows_per_query],
+            "documents": [[snapshot.documents[row] for row in rows] for rows in rows_per_query],
+            "metadatas": [[snapshot.metadatas[row] for row in rows] for rows in rows_per_query],
+            "distances": [[float(distance) for distance in distances] for distances in distances_per_query],
+            "embeddings": None,
+        }
+
+    # ---- writes ----
+
+    def apply(self, ids: list, documents: list, embeddings: list, metadatas: list = None, delete_ids: list = None,
+              embedding_model: str = None, kept_metadatas: dict = None):
+        """
+        Removes `delete_ids`, then adds the given rows, replacing rows with the same ID.
+        Live rows in `kept_metadatas` get their metadata merged with the given one.
+        Readers see either none or all of the changes. An `embedding_model` is recorded
+        in the config.
+        """
+        metadatas = metadatas if metadatas is not None else [{} for _ in ids]
+        delete_ids = list(delete_ids or [])
+
+        with self._lock:
+            snapshot = self._snapshot
+            vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(ids), -1) if ids else None
+            if vectors is not None:
+                if self.config["dim"] is None:
+                    self.config["dim"] = int(vectors.shape[1])
+                    self.write_config()
+                elif vectors.shape[1] != self.config["dim"]:
+                    raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimension {self.config['dim']}.")
+
+            alive = np.concatenate([snapshot.alive, np.ones(len(ids), dtype=bool)])
+            records = []
+            for chunk_id in delete_ids:
+                row = self._id_rows.get(chunk_id)
+                if row is not None:
+                    alive[row] = False
+                    records.append({"op": "delete", "id": chunk_id})
+            for offset, chunk_id in enumerate(ids):
+                row = self._id_rows.get(chunk_id)
+                if row is not None:
+                    alive[row] = False
+                records.append({"op": "add", "id": chunk_id, "document": documents[offset], "metadata": metadatas[offset] or {}})
+            updated_metadatas = {}
+            for chunk_id, metadata in (kept_metadatas or {}).items():
+                row = self._id_rows.get(chunk_id)
+                if row is None or not alive[row]:
+                    continue
+                merged = {**snapshot.metadatas[row], **metadata}
+                if merged != snapshot.metadatas[row]:
+                    updated_metadatas[row] = merged
+                    records.append({"op": "update", "id": chunk_id, "metadata": merged})
+
+            if not records:
+                return
+
+            try:
+                # Vectors first, then the log lines that make them visible
+                if vectors is not None:
+                    with open(os.path.join(self.directory, VECTORS_FILE), "ab") as f:
+                        f.write(np.ascontiguousarray(self.encode(vectors)).tobytes())
+                with open(os.path.join(self.directory, ROWS_FILE), "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+
+                # New lists, so the published snapshot is left untouched until this one replaces it
+                first_row = snapshot.n_rows
+                new_metadatas = snapshot.metadatas + [metadata or {} for metadata in metadatas]
+                for row, metadata in updated_metadatas.items():
+                    new_metadatas[row] = metadata
+                snapshot = snapshot._replace(n_rows=first_row + len(ids), vectors=self.__map_vectors(first_row + len(ids)),
+                                             alive=alive, ids=snapshot.ids + list(ids),
+                                             documents=snapshot.documents + list(documents),
+                                             metadatas=new_metadatas)
+                if ids:
+                    snapshot = snapshot._replace(index=self.extend_index(snapshot, first_row))
+                    if self.quantizer is not None:
+                        self.__append_codes(snapshot.vectors, first_row)
+                        codes = self.__map_codes(snapshot.n_rows)
+                        snapshot = snapshot._replace(codes=codes, code_norms=self.__extend_code_norms(snapshot.code_norms, codes, first_row))
+                    elif self.quantization != QuantizationEnum.NONE and snapshot.alive.sum() >= self.calibration_rows:
+                        snapshot = self.__calibrate(snapshot)
+                snapshot = self.after_write(snapshot)
+            except Exception:
+                # The files may hold part of this write; reload so rows line up with them again
+                self._id_rows = {}
+                self._snapshot = self.__load()
+                raise
+
+            for chunk_id in delete_ids:
+                self._id_rows.pop(chunk_id, None)
+            for offset, chunk_id in enumerate(ids):
+                self._id_rows[chunk_id] = first_row + offset
+            self._snapshot = snapshot
+            if embedding_model and self.config.get("embedding_model") != embedding_model:
+                self.config["embedding_model"] = embedding_model
+                self.write_config()
+
+            n_live = self.count()
+            if self._snapshot.n_rows - n_live > max(self.compact_min_rows, n_live):
+                self.__compact()
+
+    def __compact(self):
+        """Rewrites the collection without deleted rows."""
+        snapshot = self._snapshot
+        live_rows = np.flatnonzero(snapshot.alive)
+        vectors = np.asarray(snapshot.vectors[live_rows])
+        rows = "".join(json.dumps({"op": "add", "id": snapshot.ids[row], "document": snapshot.documents[row],
+                                   "metadata": snapshot.metadatas[row]}, ensure_ascii=False) + "\n"
+                       for row in live_rows)
+
+        files = [(VECTORS_FILE, vectors.tobytes()), (ROWS_FILE, rows.encode("utf-8"))]
+        if snapshot.codes is not None:
+            files.append((CODES_FILE, np.asarray(snapshot.codes[live_rows]).tobytes()))
+        for file_name, content in files:
+            tmp_path = os.path.join(self.directory, file_name + ".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, os.path.join(self.directory, file_name))
+
+        self._id_rows = {}
+        self._snapshot = self.__load()
+        logging.info(f"Compacted '{self.name}' to {len(live_rows)} rows.")
+
+
+class FileVectorDBProvider(VectorDBInterface):
+    """
+    Base for in-process vector stores keeping one FileCollection directory per collection
+    under `path`. Subclasses set `collection_class` and the keyword arguments it is opened with.
+
+    `create_collection` takes per-collection settings (e.g. `quantization`, `pq_subvectors`,
+    `rescore_factor`) that override the provider defaults; they are stored with the collection.
+    """
+
+    collection_class = FileCollection
+
+    def __init__(self, path: str, **collection_kwargs):
+        self.client_path = path
+        self.collection_kwargs = collection_kwargs
+        self._collections = {}
+        self._collections_lock = threading.Lock()
+
+        os.makedirs(self.client_path, exist_ok=True)
+
+    def connect(self):
+        self._collections = {}
+        logging.info(f"Using {self.__class__.__name__} at {self.client_path}.")
+
+    def disconnect(self):
+        self._collections = {}
+        logging.info(f"Disconnected from {self.__class__.__name__}.")
+
+    def __collection_path(self, collection_name: str) -> str:
+        return os.path.join(self.client_path, collection_name)
+
+    def collection_exists_flg(self, collection_name: str) -> bool:
+        return os.path.exists(os.path.join(self.__collection_path(collection_name), CONFIG_FILE))
+
+    def create_collection(self, collection_name: str, **collection_config):
+        self.open_collection(collection_name, create=True, **collection_config)
+
+    def get_collection(self, collection_name: str):
+        collection = self.open_collection(collection_name, create=False)
+        if collection is None:
+            logging.warning(f"Collection '{collection_name}' does not exist.")
+        return collection
+
+    def open_collection(self, collection_name: str, create: bool, **collection_config):
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is None and (create or self.collection_exists_flg(collection_name)):
+                collection = self.collection_class(self.__collection_path(collection_name),
+                                                   **{**self.collection_kwargs, **collection_config})
+                self._collections[collection_name] = collection
+            return collection
+
+    def delete_collection(self, collection_name: str):
+        with self._collections_lock:
+            self._collections.pop(collection_name, None)
+            if self.collection_exists_flg(collection_name):
+                shutil.rmtree(self.__collection_path(collection_name))
+                logging.info(f"Collection '{collection_name}' deleted.")
+            else:
+                logging.warning(f"Collection '{collection_name}' not found.")
+
+    def add_vectors(self, documents: list, embeddings: list, metadatas: list = None, ids: list = None, collection_name: str = "default", batch_size: int = None):
+        """
+        Add vectors to a collection. IDs default to sequential numbers after the current row count.
+        Without a `batch_size`, all vectors are written in one batch.
+        """
+        collection = self.open_collection(collection_name, create=True)
+        if ids is None:
+            start = collection.count()
+            ids = [str(start + i) for i in range(len(documents))]
+        batch_size = batch_size or max(len(ids), 1)
+        for i in range(0, len(ids), batch_size):
+            collection.apply(ids=ids[i:i + batch_size], documents=documents[i:i + batch_size],
+                             embeddings=embeddings[i:i + batch_size],
+                             metadatas=metadatas[i:i + batch_size] if metadatas else None)
+
+    def query_embeddings(self, embeddings: list, n_results: int, collection_name: str, where: dict = None):
+        collection = self.get_collection(collection_name)
+        if collection is None:
+            logging.warning(f"Cannot query. Collection '{collection_name}' not found.")
+            return None
+        return collection.query(embeddings, n_results, where=where)
+
+    def get_ids(self, collection_name: str, where: dict = None) -> list:
+        collection = self.get_collection(collection_name)
+        return collection.get(include=[], where=where)["ids"] if collection else []
+
+    def apply_changes(self, collection_name: str, ids: list, documents: list, embeddings: list, metadatas: list = None, delete_ids: list = None, embedding_model: str = None, kept_metadatas: dict = None):
+        self.open_collection(collection_name, create=True).apply(ids, documents, embeddings, metadatas, delete_ids,
+                                                                 embedding_model, kept_metadatas)
+
+    def get_embedding_model(self, collection_name: str):
+        collection = self.get_collection(collection_name)
+        return collection.config.get("embedding_model") if collection else None
+
+    def get_collection_info(self, collection_name: str):
+        collection = self.get_collection(collection_name)
+        if collection is None:
+            return None
+        sample = collection.get(include=["embeddings", "documents", "metadatas"], limit=3)
+        return {
+            "collection_name": collection_name,
+            "num_vectors": collection.count(),
+            "config": collection.config,
+            "sample": sample,
+        }
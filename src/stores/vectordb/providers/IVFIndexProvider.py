@@ -0,0 +1,132 @@
+from .FileVectorDB import FileCollection, FileVectorDBProvider, Snapshot, smallest
+from ..Quantizers import kmeans, nearest_centroids
+from collections import namedtuple
+import logging
+import math
+import numpy as np
+import os
+
+CENTROIDS_FILE = "centroids.npy"
+
+# Squared row norms, centroids (None until trained) and the rows of each centroid's list
+_IVFIndex = namedtuple("_IVFIndex", "norms centroids lists")
+
+
+class IVFCollection(FileCollection):
+    """
+    Collection searched through an inverted file (IVF) index.
+
+    Until the collection has `train_min_rows` rows, queries scan every row exactly. Then
+    k-means trains `nlist` centroids, each row joins the list of its nearest centroid and a
+    query only scans the `nprobe` closest lists. Rows added later join their list directly;
+    the centroids are retrained whenever the collection has grown 4x since the last training.
+    """
+
+    def __init__(self, directory: str, nlist: int = 0, nprobe: int = 8, train_min_rows: int = 1024, **kwargs):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_min_rows = train_min_rows
+        super().__init__(directory, dtype="float32", compact_min_rows=train_min_rows, **kwargs)
+
+    def build_index(self, vectors: np.ndarray) -> _IVFIndex:
+        norms = np.einsum("ij,ij->i", vectors, vectors) if len(vectors) else np.zeros(0, dtype=np.float32)
+        centroids_path = os.path.join(self.directory, CENTROIDS_FILE)
+        if not os.path.exists(centroids_path):
+            return _IVFIndex(norms, None, None)
+        centroids = np.load(centroids_path)
+        return _IVFIndex(norms, centroids, self.__build_lists(centroids, vectors, 0, [np.zeros(0, dtype=np.int64)] * len(centroids)))
+
+    def extend_index(self, snapshot: Snapshot, first_row: int) -> _IVFIndex:
+        new_vectors = snapshot.vectors[first_row:]
+        index = snapshot.index._replace(norms=np.concatenate([snapshot.index.norms, np.einsum("ij,ij->i", new_vectors, new_vectors)]))
+        if index.centroids is not None:
+            index = index._replace(lists=self.__build_lists(index.centroids, snapshot.vectors, first_row, index.lists))
+        return index
+
+    @staticmethod
+    def __build_lists(centroids, vectors, first_row, lists, block_size: int = 16384):
+        """Returns `lists` with rows `first_row:` of `vectors` added to their nearest centroid's list."""
+        lists = list(lists)
+        for start in range(first_row, len(vectors), block_size):
+            block = np.asarray(vectors[start:start + block_size])
+            assignment = nearest_centroids(block, centroids)
+            order = np.argsort(assignment, kind="stable")
+            list_ids, boundaries = np.unique(assignment[order], return_index=True)
+            for list_id, rows in zip(list_ids, np.split(order + start, boundaries[1:])):
+                lists[list_id] = np.concatenate([lists[list_id], rows])
+        return lists
+
+    def after_write(self, snapshot: Snapshot) -> Snapshot:
+        """Trains the centroids once the collection is big enough, and retrains after it grows 4x."""
+        n_live = int(snapshot.alive.sum())
+        trained_rows = self.config.get("trained_rows", 0)
+        if n_live < self.train_min_rows or (snapshot.index.centroids is not None and n_live < 4 * trained_rows):
+            return snapshot
+
+        live_rows = np.flatnonzero(snapshot.alive)
+        nlist = self.nlist or int(4 * math.sqrt(n_live))
+        nlist = max(1, min(nlist, n_live // 8))
+        sample = np.random.default_rng(0).choice(live_rows, min(len(live_rows), nlist * 32), replace=False)
+        centroids = kmeans(np.asarray(snapshot.vectors[np.sort(sample)]), nlist)
+        lists = self.__build_lists(centroids, snapshot.vectors, 0, [np.zeros(0, dtype=np.int64)] * nlist)
+
+        np.save(os.path.join(self.directory, CENTROIDS_FILE), centroids)
+        self.config["trained_rows"] = n_live
+        self.write_config()
+        logging.info(f"Trained {nlist} IVF lists for '{self.name}' on {len(sample)} of {n_live} vectors.")
+        return snapshot._replace(index=snapshot.index._replace(centroids=centroids, lists=lists))
+
+    def query(self, query_embeddings: list, n_results: int, where: dict = None, nprobe: int = None) -> dict:
+        """
+        Returns the `n_results` nearest rows of each query by squared L2 distance among
+        the rows matching `where`, shaped like a Chroma `query` result.
+        """
+        snapshot = self.filtered(self._snapshot, where)
+        index = snapshot.index
+        nprobe = nprobe or self.nprobe
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(len(query_embeddings), -1)
+
+        all_rows = np.flatnonzero(snapshot.alive) if index.centroids is None or where else None
+        rows_per_query, distances_per_query = [], []
+        for query in queries:
+            if index.centroids is None:
+                rows = all_rows
+            else:
+                centroid_distances = (index.centroids ** 2).sum(axis=1) - 2 * index.centroids @ query
+                probe = np.argpartition(centroid_distances, min(nprobe, len(centroid_distances)) - 1)[:nprobe]
+                rows = np.concatenate([index.lists[list_id] for list_id in probe])
+                rows = rows[snapshot.alive[rows]]
+                if where and len(rows) < n_results:
+                    # A selective filter can leave the probed lists short: scan every matching row
+                    rows = all_rows
+
+            if snapshot.codes is None:
+                distances = index.norms[rows] - 2 * (snapshot.vectors[rows] @ query) + query @ query
+            else:
+                code_norms = snapshot.code_norms[rows] if snapshot.code_norms is not None else None
+                distances = self.quantizer.distances(query[None, :], snapshot.codes[rows], code_norms)[0]
+            top = smallest(distances, self.candidate_count(snapshot, n_results))
+
+            if snapshot.codes is not None and self.rescore_factor:
+                # Rescore the candidates against the full-precision rows
+                rows = rows[top]
+                distances = ((snapshot.vectors[rows] - query) ** 2).sum(axis=1)
+                top = smallest(distances, n_results)
+            rows_per_query.append(rows[top])
+            distances_per_query.append(np.maximum(distances[top], 0.0))
+        return self.query_result(snapshot, rows_per_query, distances_per_query)
+
+
+class IVFIndexProvider(FileVectorDBProvider):
+    """
+    In-process vector store over memory-mapped float32 arrays with an IVF index.
+
+    Queries run in-process with no client or SQLite round trips; `nprobe` trades recall
+    for latency once a collection has trained its `nlist` centroids (nlist=0 picks about
+    4 * sqrt(rows)). With quantization, the probed lists are scanned on their codes.
+    """
+
+    collection_class = IVFCollection
+
+    def __init__(self, path: str, nlist: int = 0, nprobe: int = 8, train_min_rows: int = 1024, **collection_defaults):
+        super().__init__(path, nlist=nlist, nprobe=nprobe, train_min_rows=train_min_rows, **collection_defaults)
@@ -0,0 +1,29 @@
+import pytest
+from controllers.ChunkController import get_chunk_controller
+from helpers.config import get_settings, reload_settings
+from stores.lexical.LexicalIndex import get_lexical_index_store
+from stores.llm.ResponseCache import get_response_cache
+
+@pytest.fixture
+def app_settings_env(tmp_path, monkeypatch):
+    """Fixture to provide the required application settings through environment variables."""
+    settings = {
+        "APP_NAME": "rag", "APP_VERSION": "0.1", "MAX_SIZE": "2", "ALLOWED_FILE_TYPES": '["pdf"]',
+        "UPLOAD_DIR": str(tmp_path / "uploads"), "CHUNKS_DIR": str(tmp_path / "chunks"),
+        "EMBEDDINGS_DIR": str(tmp_path / "embeddings"), "EMBEDDING_MODELS_DIR": str(tmp_path / "models"),
+        "RERANKING_MODELS_DIR": str(tmp_path / "rerankers"), "VISUALIZATIONS_DIR": str(tmp_path / "viz"),
+        "MONGODB_CONNECTION": "", "MONGODB_DATABASE_NAME": "rag", "MONGODB_TEST_DATABASE_NAME": "test",
+        "VECTORDB_PATH": str(tmp_path / "vector_db"), "LEXICAL_INDEX_PATH": str(tmp_path / "lexical"),
+    }
+    for key, value in settings.items():
+        monkeypatch.setenv(key, value)
+    reload_settings()
+    # Settings, the shared controllers, lexical index store and response cache are per process; start each test afresh
+    get_chunk_controller.cache_clear()
+    get_lexical_index_store.cache_clear()
+    get_response_cache.cache_clear()
+    yield settings
+    get_settings.cache_clear()
+    get_chunk_controller.cache_clear()
+    get_lexical_index_store.cache_clear()
+    get_response_cache.cache_clear()
@@ -0,0 +1,46 @@
+import argparse
+import asyncio
+import json
+import re
+import pytest
+from controllers.FileController import FileController
+from scripts.benchmark_rag import latency_summary, run_benchmark, synthetic_corpus, write_pdf
+
+@pytest.fixture
+def benchmark_args():
+    """Fixture to provide the arguments of a small benchmark run."""
+    return argparse.Namespace(documents=2, pages=2, words_per_page=120, queries=6, concurrency=2,
+                              chunk_size=300, chunk_overlap=30, n_results=4, top_k=2, vectordb="exact",
+                              llm_latency_ms=0.0, embedding_model=None, seed=0)
+
+def test_synthetic_pdfs_parse_back_to_their_pages(app_settings_env, tmp_path):
+    """Test that generated PDFs parse into the words of their pages, page by page."""
+    pages = synthetic_corpus(n_documents=1, n_pages=3, words_per_page=50)[0]
+    (tmp_path / "doc.pdf").write_bytes(write_pdf(pages))
+
+    async def parse():
+        return [page async for page in FileController().iter_file_pages(str(tmp_path), "doc.pdf")]
+
+    parsed = asyncio.run(parse())
+
+    assert [re.findall(r"\w+", page) for page in parsed] == [re.findall(r"\w+", page) for page in pages]
+
+def test_latency_summary_reports_percentiles_and_throughput():
+    """Test that latencies are summarized as percentiles in milliseconds and operations per second."""
+    summary = latency_summary([0.001 * i for i in range(1, 101)], wall_seconds=2.0, peak_rss_bytes=2**20)
+
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["qps"] == 50.0
+    assert summary["peak_rss_mb"] == 1.0
+
+def test_benchmark_runs_every_stage(app_settings_env, benchmark_args):
+    """Test that a small run measures every stage and produces JSON-serializable results."""
+    results = asyncio.run(run_benchmark(benchmark_args))
+
+    assert list(results["stages"]) == ["upload", "chunk", "embed", "retrieve", "rerank", "generate", "end_to_end"]
+    assert [stage["count"] for stage in results["stages"].values()] == [2, 2, 2, 6, 6, 6, 6]
+    assert results["corpus"]["chunks"] > 0
+    assert all(stage["p50_ms"] <= stage["p95_ms"] <= stage["p99_ms"] for stage in results["stages"].values())
+    assert json.loads(json.dumps(results))["config"]["vectordb"] == "exact"
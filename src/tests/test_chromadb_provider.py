@@ -1,6 +1,7 @@
 import os
 import pytest
-from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+from chromadb.api.models.Collection import Collection
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider, AdaptiveBatchSize
 
 @pytest.fixture
 def temp_db_path(tmp_path):
@@ -94,3 +95,222 @@ def test_add_more_vectors(temp_db_path):
 
     # Assert the count increased correctly
     assert updated_count == initial_count + len(new_documents), "Vector count should increase by the number of new vectors."
+
+def test_apply_changes_adds_and_deletes(temp_db_path):
+    """Test that apply_changes publishes additions and deletions as one new version."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+
+    collection_name = "test_versions"
+    provider.apply_changes(collection_name, ids=["a", "b"], documents=["doc a", "doc b"],
+                           embeddings=[[1.0, 0.0], [0.0, 1.0]])
+    assert sorted(provider.get_ids(collection_name)) == ["a", "b"]
+
+    provider.apply_changes(collection_name, ids=["c"], documents=["doc c"],
+                           embeddings=[[0.7, 0.7]], delete_ids=["a"])
+
+    assert sorted(provider.get_ids(collection_name)) == ["b", "c"]
+    results = provider.query_embeddings(embeddings=[[1.0, 0.0]], n_results=2, collection_name=collection_name)
+    assert sorted(results["ids"][0]) == ["b", "c"]
+
+def test_staged_vectors_are_invisible_until_commit(temp_db_path, monkeypatch):
+    """Test that readers keep seeing the committed version while changes are staged."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+
+    collection_name = "test_staging"
+    provider.apply_changes(collection_name, ids=["old"], documents=["old doc"], embeddings=[[1.0, 0.0]])
+
+    seen_before_commit = []
+    commit = provider._ChromaDBProvider__set_committed_generation
+    def observing_commit(collection, generation, *args):
+        seen_before_commit.append(sorted(provider.get_ids(collection_name)))
+        commit(collection, generation, *args)
+    monkeypatch.setattr(provider, "_ChromaDBProvider__set_committed_generation", observing_commit)
+
+    provider.apply_changes(collection_name, ids=["new"], documents=["new doc"],
+                           embeddings=[[0.0, 1.0]], delete_ids=["old"])
+
+    assert seen_before_commit == [["old"]]
+    assert provider.get_ids(collection_name) == ["new"]
+
+def test_failed_write_leaves_nothing_for_the_next_commit(temp_db_path, monkeypatch):
+    """Test that a write failing after staging is rolled back, so a later commit doesn't publish its vectors."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+
+    collection_name = "test_failed_write"
+    provider.apply_changes(collection_name, ids=["a"], documents=["doc a"], embeddings=[[1.0, 0.0]])
+
+    update = Collection.update
+    def failing_update(collection, **kwargs):
+        monkeypatch.setattr(Collection, "update", update)
+        raise RuntimeError("update failed")
+    monkeypatch.setattr(Collection, "update", failing_update)
+
+    with pytest.raises(RuntimeError, match="update failed"):
+        provider.apply_changes(collection_name, ids=["x"], documents=["doc x"], embeddings=[[0.0, 1.0]], delete_ids=["a"])
+
+    assert provider.get_collection(collection_name).metadata["pending_write"] is False
+    assert provider.get_ids(collection_name) == ["a"]
+
+    provider.apply_changes(collection_name, ids=["y"], documents=["doc y"], embeddings=[[0.7, 0.7]])
+
+    assert sorted(provider.get_ids(collection_name)) == ["a", "y"]
+
+def test_interrupted_write_is_rolled_back_by_the_next_write(temp_db_path, monkeypatch):
+    """Test that a write which couldn't clean up after itself is rolled back before the next one stages."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+
+    collection_name = "test_interrupted_write"
+    provider.apply_changes(collection_name, ids=["a"], documents=["doc a"], embeddings=[[1.0, 0.0]])
+
+    roll_back = provider._ChromaDBProvider__roll_back_pending_write
+    def interrupted_commit(collection, generation, *args):
+        raise RuntimeError("process died")
+    def failing_roll_back(collection, batch_size=None):
+        raise RuntimeError("still down")
+    monkeypatch.setattr(provider, "_ChromaDBProvider__set_committed_generation", interrupted_commit)
+    monkeypatch.setattr(provider, "_ChromaDBProvider__roll_back_pending_write", failing_roll_back)
+
+    with pytest.raises(RuntimeError, match="process died"):
+        provider.apply_changes(collection_name, ids=["x"], documents=["doc x"], embeddings=[[0.0, 1.0]], delete_ids=["a"])
+    monkeypatch.undo()
+
+    assert provider.get_collection(collection_name).metadata["pending_write"] is True
+    provider.apply_changes(collection_name, ids=["y"], documents=["doc y"], embeddings=[[0.7, 0.7]])
+
+    assert sorted(provider.get_ids(collection_name)) == ["a", "y"]
+    assert provider.get_collection(collection_name).metadata["pending_write"] is False
+
+def test_apply_changes_adopts_unversioned_collection(temp_db_path):
+    """Test that collections created before versioning keep their vectors visible."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+
+    collection_name = "test_legacy"
+    provider.client.create_collection(name=collection_name)
+    provider.add_vectors(["doc 1", "doc 2"], [[0.1, 0.2], [0.3, 0.4]], collection_name=collection_name)
+
+    provider.apply_changes(collection_name, ids=["3"], documents=["doc 3"], embeddings=[[0.5, 0.6]], delete_ids=["0"])
+
+    assert sorted(provider.get_ids(collection_name)) == ["1", "3"]
+
+def test_collection_handles_are_cached(temp_db_path, monkeypatch):
+    """Test that a collection is looked up once, and that delete and create invalidate the cached handle."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+    provider.apply_changes("test_cache", ids=["a"], documents=["doc a"], embeddings=[[1.0, 0.0]])
+
+    lookups = []
+    get_collection = provider.client.get_collection
+    monkeypatch.setattr(provider.client, "get_collection", lambda name: lookups.append(name) or get_collection(name))
+
+    for _ in range(3):
+        provider.query_embeddings(embeddings=[[1.0, 0.0]], n_results=1, collection_name="test_cache")
+        provider.get_ids("test_cache")
+    assert lookups == []
+
+    provider.delete_collection("test_cache")
+    assert not provider.collection_exists_flg("test_cache")
+    provider.create_collection("test_cache")
+    assert provider.get_ids("test_cache") == []
+
+def test_dimension_is_recorded_and_enforced(temp_db_path):
+    """Test that the first vectors record the dimension in the collection metadata and other dimensions are rejected."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+    provider.apply_changes("test_dimension", ids=["a"], documents=["doc a"], embeddings=[[1.0, 0.0, 0.0]])
+
+    assert provider.get_collection("test_dimension").metadata["dimension"] == 3
+    with pytest.raises(ValueError):
+        provider.apply_changes("test_dimension", ids=["b"], documents=["doc b"], embeddings=[[1.0, 0.0]])
+
+    provider.add_vectors(["doc c"], [[1.0, 0.0]], [{"meta": "c"}], ["c"], "test_dimension")
+    assert provider.get_ids("test_dimension") == ["a"]
+
+def test_concurrent_batches_write_every_vector(temp_db_path):
+    """Test that vectors written in many concurrent batches are all stored and committed together."""
+    provider = ChromaDBProvider(path=temp_db_path, write_concurrency=4)
+    provider.connect()
+
+    ids = [str(i) for i in range(50)]
+    provider.apply_changes("test_batches", ids=ids, documents=ids, embeddings=[[float(i), 1.0] for i in range(50)], batch_size=7)
+    provider.apply_changes("test_batches", ids=[], documents=[], embeddings=[], delete_ids=ids[:20], batch_size=3)
+
+    assert sorted(provider.get_ids("test_batches"), key=int) == ids[20:]
+    provider.disconnect()
+
+def test_reads_skip_the_generation_filter_without_pending_writes(temp_db_path, monkeypatch):
+    """Test that reads run unfiltered between writes and filtered while a write is pending."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+    provider.apply_changes("test_filter", ids=["old"], documents=["old doc"], embeddings=[[1.0, 0.0]])
+
+    filters = []
+    query = Collection.query
+    monkeypatch.setattr(Collection, "query", lambda collection, **kwargs: filters.append(kwargs["where"]) or query(collection, **kwargs))
+    provider.query_embeddings(embeddings=[[1.0, 0.0]], n_results=1, collection_name="test_filter")
+    assert filters == [None]
+
+    commit = provider._ChromaDBProvider__set_committed_generation
+    def observing_commit(collection, generation, *args):
+        provider.query_embeddings(embeddings=[[1.0, 0.0]], n_results=1, collection_name="test_filter")
+        commit(collection, generation, *args)
+    monkeypatch.setattr(provider, "_ChromaDBProvider__set_committed_generation", observing_commit)
+    provider.apply_changes("test_filter", ids=["new"], documents=["new doc"], embeddings=[[0.0, 1.0]], delete_ids=["old"])
+
+    assert filters[1] is not None
+    assert provider.get_collection("test_filter").metadata["pending_write"] is False
+
+def test_writes_pick_up_generations_committed_through_another_handle(temp_db_path):
+    """Test that a write looks the collection metadata up again instead of trusting its cached handle."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+    provider.apply_changes("test_refresh", ids=["a"], documents=["doc a"], embeddings=[[1.0, 0.0]])
+    other = ChromaDBProvider(path=temp_db_path)
+    other.connect()
+    other.apply_changes("test_refresh", ids=["b"], documents=["doc b"], embeddings=[[0.0, 1.0]])
+
+    generation = provider.apply_changes("test_refresh", ids=["c"], documents=["doc c"], embeddings=[[0.7, 0.7]])
+
+    assert generation == 3
+    assert sorted(provider.get_ids("test_refresh")) == ["a", "b", "c"]
+
+def test_query_filters_by_metadata(temp_db_path, monkeypatch):
+    """Test that a metadata filter applies both between writes and while a write is pending."""
+    provider = ChromaDBProvider(path=temp_db_path)
+    provider.connect()
+    provider.apply_changes("test_where", ids=["a", "b"], documents=["doc a", "doc b"],
+                           embeddings=[[1.0, 0.0], [0.9, 0.1]], metadatas=[{"source": "a.pdf"}, {"source": "b.pdf"}])
+
+    def search():
+        return provider.query_embeddings(embeddings=[[1.0, 0.0]], n_results=2, collection_name="test_where",
+                                         where={"source": "b.pdf"})["ids"][0]
+
+    during_write = []
+    commit = provider._ChromaDBProvider__set_committed_generation
+    def observing_commit(collection, generation, *args):
+        during_write.append(search())
+        commit(collection, generation, *args)
+    monkeypatch.setattr(provider, "_ChromaDBProvider__set_committed_generation", observing_commit)
+    provider.apply_changes("test_where", ids=["c"], documents=["doc c"], embeddings=[[1.0, 0.0]], metadatas=[{"source": "b.pdf"}])
+
+    assert during_write == [["b"]]
+    assert sorted(search()) == ["b", "c"]
+    assert provider.get_ids("test_where", where={"source": "a.pdf"}) == ["a"]
+
+def test_adaptive_batch_size_follows_write_speed():
+    """Test that the batch size grows after fast writes and shrinks after slow ones, within its bounds."""
+    batch_size = AdaptiveBatchSize(initial=100, minimum=10, maximum=1000, target_seconds=0.5)
+
+    batch_size.record(100, 0.05)
+    assert batch_size.size == 550
+    for _ in range(10):
+        batch_size.record(batch_size.size, 0.01)
+    assert batch_size.size == 1000
+
+    for _ in range(20):
+        batch_size.record(batch_size.size, 10.0)
+    assert batch_size.size == 10
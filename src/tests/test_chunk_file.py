@@ -0,0 +1,59 @@
+import json
+import numpy as np
+import pytest
+from helpers.chunk_file import ChunkFile, write_chunk_file
+from scripts.migrate_chunks import migrate_json_chunks
+
+@pytest.fixture
+def chunks():
+    """Fixture providing chunks with multi-byte characters and an empty chunk."""
+    return ["First chunk.", "Ünïcödé – ✓ 日本語", "", "Last chunk\nwith a newline."]
+
+def test_round_trip(tmp_path, chunks):
+    """Test that chunks written in the binary format read back unchanged."""
+    path = str(tmp_path / "doc_chunks.bin")
+    write_chunk_file(path, chunks)
+
+    chunk_file = ChunkFile(path)
+
+    assert len(chunk_file) == len(chunks)
+    assert list(chunk_file) == chunks
+    assert chunk_file[1] == chunks[1]
+    assert chunk_file[-1] == chunks[-1]
+    assert chunk_file[1:3] == chunks[1:3]
+    with pytest.raises(IndexError):
+        chunk_file[len(chunks)]
+
+def test_empty_file(tmp_path):
+    """Test that a file without chunks is readable."""
+    path = str(tmp_path / "empty_chunks.bin")
+    write_chunk_file(path, [])
+
+    assert list(ChunkFile(path)) == []
+
+def test_rejects_other_files(tmp_path):
+    """Test that a non-chunk file is rejected."""
+    path = tmp_path / "doc_chunks.bin"
+    path.write_text(json.dumps(["a"]))
+
+    with pytest.raises(ValueError, match="not a binary chunk file"):
+        ChunkFile(str(path))
+
+def test_chunks_are_memory_mapped(tmp_path, chunks):
+    """Test that chunk bytes are mapped from disk rather than read into memory."""
+    path = str(tmp_path / "doc_chunks.bin")
+    write_chunk_file(path, chunks)
+
+    assert isinstance(ChunkFile(path)._data, np.memmap)
+
+def test_migrate_json_chunks(tmp_path, chunks):
+    """Test that legacy JSON chunk files are converted and optionally removed."""
+    json_path = tmp_path / "doc_chunks.json"
+    json_path.write_text(json.dumps(chunks, ensure_ascii=False, indent=4), encoding="utf-8")
+
+    migrated = migrate_json_chunks(str(tmp_path), delete_json=True)
+
+    assert migrated == [str(tmp_path / "doc_chunks.bin")]
+    assert list(ChunkFile(migrated[0])) == chunks
+    assert not json_path.exists()
+    assert migrate_json_chunks(str(tmp_path)) == []
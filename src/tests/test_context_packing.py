@@ -0,0 +1,69 @@
+import asyncio
+from unittest.mock import patch
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+from controllers.NLPController import NLPController, pack_context
+from helpers.token_counter import count_tokens, get_token_encoding
+from stores.llm.providers.OpenAILLMProvider import OpenAILLMProvider
+from helpers.config import reload_settings
+
+TEXT = ("Refunds are issued within thirty days of purchase for unused items in their original packaging. "
+        "Shipping costs are not refunded unless the item arrived damaged or was sent in error by the store. "
+        "Exchanges follow the same rules and are shipped free of charge to customers in the loyalty program.")
+
+def context_tokens(passages):
+    return count_tokens("\n".join(passages))
+
+def test_overlapping_chunks_are_merged_back_into_their_text():
+    """Test that consecutive recursive chunks, overlap included, pack into the text they came from."""
+    chunks = RecursiveCharacterTextSplitter(chunk_size=80, chunk_overlap=30).split_text(TEXT)
+
+    assert len(chunks) > 3
+    assert pack_context(chunks, token_budget=0) == [TEXT]
+    assert pack_context(list(reversed(chunks)), token_budget=0) == [TEXT]
+
+def test_duplicates_are_dropped():
+    """Test that repeated and contained documents appear once."""
+    docs = ["Refunds take thirty days.", "  Refunds take thirty days. ", "thirty days", "Shipping is free."]
+
+    assert pack_context(docs, token_budget=0) == ["Refunds take thirty days.", "Shipping is free."]
+
+def test_best_scoring_documents_fill_the_budget():
+    """Test that documents are packed by score and ones that no longer fit give way to smaller ones."""
+    long_doc = " ".join(["filler"] * 40)
+    docs = ["Small but relevant.", long_doc, "Best match of all.", "Tiny."]
+    budget = context_tokens(["Best match of all.", "Small but relevant.", "Tiny."])
+
+    passages = pack_context(docs, token_budget=budget, scores=[0.8, 0.7, 0.9, 0.1])
+
+    assert passages == ["Best match of all.", "Small but relevant.", "Tiny."]
+    assert context_tokens(passages) <= budget
+
+def test_an_oversized_best_document_is_truncated():
+    """Test that a best document larger than the whole budget is cut to it rather than dropped."""
+    passages = pack_context([" ".join(["word"] * 100), "Other."], token_budget=10)
+
+    assert len(passages) == 1
+    assert 0 < count_tokens(passages[0]) <= 10
+
+def test_generation_query_uses_the_configured_budget(app_settings_env, monkeypatch):
+    """Test that the generation prompt only carries the context that fits GENERATION_CONTEXT_TOKEN_BUDGET."""
+    monkeypatch.setenv("GENERATION_CONTEXT_TOKEN_BUDGET", str(count_tokens("First document.")))
+    reload_settings()
+
+    query = asyncio.run(NLPController().create_generation_query(
+        question="Which?", docs=["Second document here.", "First document."], scores=[0.2, 0.9]))
+
+    assert query == "Question: Which?\nContext: First document.\nAnswer:"
+
+def test_token_limits_reuse_one_encoder_per_model():
+    """Test that validating many prompts builds the model's encoder once."""
+    get_token_encoding.cache_clear()
+    llm_provider = OpenAILLMProvider(api_key="test-api-key", model_id="gpt-4-turbo")
+
+    with patch("tiktoken.encoding_for_model") as mock_encoding:
+        mock_encoding.return_value.encode.side_effect = lambda text, **kwargs: text.split()
+        for _ in range(5):
+            llm_provider.validate_token_limit(["Hello there"])
+
+    assert mock_encoding.call_count == 1
+    get_token_encoding.cache_clear()
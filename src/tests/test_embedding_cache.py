@@ -0,0 +1,94 @@
+import pytest
+from stores.embedding.EmbeddingCache import EmbeddingCache, CachedEmbeddingClient
+from stores.embedding.EmbeddingInterface import EmbeddingInterface
+
+class CountingEmbeddingClient(EmbeddingInterface):
+    """Deterministic embedding client that records every text it embeds."""
+
+    def __init__(self, model_id="fake-model"):
+        self.model_id = model_id
+        self.max_input_token = 512
+        self.calls = []
+
+    def generate_embedding(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), float(text.count(" "))] for text in texts]
+
+    def set_embedding_settings(self, model_id, max_input_token):
+        self.model_id = model_id
+        self.max_input_token = max_input_token
+
+@pytest.fixture
+def cache_path(tmp_path):
+    """Fixture to provide a temporary SQLite path for the embedding cache."""
+    return str(tmp_path / "embedding_cache.sqlite")
+
+def test_repeated_texts_are_embedded_once(cache_path):
+    """Test that only cache misses reach the embedding client."""
+    client = CountingEmbeddingClient()
+    cached_client = CachedEmbeddingClient(client=client, cache=EmbeddingCache(cache_path), provider="fake")
+
+    first = cached_client.generate_embedding(["alpha", "beta gamma"])
+    second = cached_client.generate_embedding(["beta gamma", "delta", "alpha"])
+
+    assert client.calls == [["alpha", "beta gamma"], ["delta"]]
+    assert second == [first[1], [5.0, 0.0], first[0]]
+
+def test_duplicate_texts_in_one_call_are_embedded_once(cache_path):
+    """Test that duplicates inside a single request share one embedding call."""
+    client = CountingEmbeddingClient()
+    cache = EmbeddingCache(cache_path)
+
+    vectors = cache.get_or_embed("fake/fake-model", ["same", "same", "other"], client.generate_embedding)
+
+    assert client.calls == [["same", "other"]]
+    assert vectors[0] == vectors[1]
+
+def test_normalized_text_shares_entry(cache_path):
+    """Test that whitespace differences map to the same cache key."""
+    client = CountingEmbeddingClient()
+    cache = EmbeddingCache(cache_path)
+
+    cache.get_or_embed("fake/fake-model", ["hello   world\n"], client.generate_embedding)
+    cache.get_or_embed("fake/fake-model", [" hello world"], client.generate_embedding)
+
+    assert len(client.calls) == 1
+
+def test_entries_are_scoped_by_model(cache_path):
+    """Test that the same text under another model is a cache miss."""
+    client = CountingEmbeddingClient()
+    cache = EmbeddingCache(cache_path)
+
+    cache.get_or_embed("fake/model-a", ["text"], client.generate_embedding)
+    cache.get_or_embed("fake/model-b", ["text"], client.generate_embedding)
+
+    assert len(client.calls) == 2
+
+def test_disk_tier_survives_restart(cache_path):
+    """Test that a new cache instance serves entries written by a previous one."""
+    client = CountingEmbeddingClient()
+    first_cache = EmbeddingCache(cache_path, memory_items=10)
+    expected = first_cache.get_or_embed("fake/fake-model", ["persisted text"], client.generate_embedding)
+    first_cache.close()
+
+    second_cache = EmbeddingCache(cache_path, memory_items=10)
+    vectors = second_cache.get_or_embed("fake/fake-model", ["persisted text"], client.generate_embedding)
+
+    assert vectors == expected
+    assert len(client.calls) == 1
+    assert second_cache.stats()["disk_hits"] == 1
+
+def test_memory_tier_is_bounded_and_stats_are_counted(cache_path):
+    """Test LRU bounding of the memory tier and the hit/miss counters."""
+    client = CountingEmbeddingClient()
+    cache = EmbeddingCache(cache_path, memory_items=2)
+
+    cache.get_or_embed("fake/fake-model", ["a", "b", "c"], client.generate_embedding)
+    cache.get_or_embed("fake/fake-model", ["c", "a"], client.generate_embedding)
+
+    stats = cache.stats()
+    assert stats["memory_items"] == 2
+    assert stats["misses"] == 3
+    assert stats["memory_hits"] == 1  # "c" is still in memory
+    assert stats["disk_hits"] == 1    # "a" was evicted to disk only
+    assert stats["hit_ratio"] == pytest.approx(2 / 5)
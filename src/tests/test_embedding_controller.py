@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from controllers.EmbeddingController import EmbeddingController
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+
+class CountingEmbeddingClient:
+    def __init__(self):
+        self.model_id = "fake-model"
+        self.calls = []
+
+    def generate_embedding(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+def test_generate_chunk_ids_are_stable_and_unique():
+    """Test that IDs depend on content only and repeated chunks stay distinct."""
+    ids = EmbeddingController.generate_chunk_ids(["a", "b", "a"])
+
+    assert ids == EmbeddingController.generate_chunk_ids(["a", "b", "a"])
+    assert len(set(ids)) == 3
+    assert ids[2] == ids[0] + "-1"
+
+def test_reindex_embeds_only_changed_chunks(app_settings_env, tmp_path):
+    """Test that re-embedding a file only embeds new chunks and deletes vanished ones."""
+    vectordb = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    vectordb.connect()
+    controller = EmbeddingController()
+    client = CountingEmbeddingClient()
+
+    first = asyncio.run(controller.reindex_collection(vectordb, client, "test_file", ["one", "two", "three"]))
+    second = asyncio.run(controller.reindex_collection(vectordb, client, "test_file", ["one", "three", "four"]))
+
+    assert first == {"added": 3, "deleted": 0, "unchanged": 0}
+    assert second == {"added": 1, "deleted": 1, "unchanged": 2}
+    assert client.calls == [["one", "two", "three"], ["four"]]
+    assert sorted(vectordb.get_ids("test_file")) == sorted(EmbeddingController.generate_chunk_ids(["one", "three", "four"]))
+
+def test_reindex_updates_positions_of_unchanged_chunks(app_settings_env, tmp_path):
+    """Test that unchanged chunks keep their vectors but get the position they moved to."""
+    vectordb = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    vectordb.connect()
+    controller = EmbeddingController()
+    client = CountingEmbeddingClient()
+
+    asyncio.run(controller.reindex_collection(vectordb, client, "test_file", ["one", "two", "three"]))
+    asyncio.run(controller.reindex_collection(vectordb, client, "test_file", ["zero", "one", "three"]))
+
+    assert client.calls == [["one", "two", "three"], ["zero"]]
+    chunks = vectordb.get_collection("test_file").get(include=["documents", "metadatas"])
+    assert {document: metadata["chunk_index"] for document, metadata in zip(chunks["documents"], chunks["metadatas"])} == {
+        "zero": 0, "one": 1, "three": 2
+    }
+
+class WideEmbeddingClient(CountingEmbeddingClient):
+    """Another embedding model, with three dimensions instead of two."""
+
+    def __init__(self):
+        super().__init__()
+        self.model_id = "wide-model"
+
+    def generate_embedding(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.0] for text in texts]
+
+def test_reindex_with_another_model_embeds_every_chunk(app_settings_env, tmp_path):
+    """Test that switching the embedding model re-embeds unchanged chunks too, and shared collections refuse the switch."""
+    vectordb = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    vectordb.connect()
+    controller = EmbeddingController()
+    asyncio.run(controller.reindex_collection(vectordb, CountingEmbeddingClient(), "test_file", ["one", "two"]))
+    asyncio.run(controller.reindex_collection(vectordb, CountingEmbeddingClient(), "library", ["one"], source="a.pdf", shared=True))
+    client = WideEmbeddingClient()
+
+    stats = asyncio.run(controller.reindex_collection(vectordb, client, "test_file", ["one", "two", "three"]))
+
+    assert stats == {"added": 3, "deleted": 0, "unchanged": 0}
+    assert client.calls == [["one", "two", "three"]]
+    assert vectordb.get_embedding_model("test_file") == controller.embedding_model_name(client)
+    assert len(vectordb.query_embeddings([[3.0, 1.0, 0.0]], 3, "test_file")["ids"][0]) == 3
+    with pytest.raises(ValueError, match="fake-model"):
+        asyncio.run(controller.reindex_collection(vectordb, client, "library", ["two"], source="b.pdf", shared=True))
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from stores.vectordb.providers.ExactSearchProvider import ExactSearchProvider
+
+@pytest.fixture
+def vectors():
+    """Fixture for 3000 random 64-dimensional vectors."""
+    return np.random.default_rng(0).normal(size=(3000, 64)).astype(np.float32)
+
+def add(provider, vectors, collection_name="docs"):
+    provider.apply_changes(collection_name=collection_name,
+                           ids=[f"id-{i}" for i in range(len(vectors))],
+                           documents=[f"doc {i}" for i in range(len(vectors))],
+                           embeddings=vectors)
+
+def exact_neighbors(vectors, query, n_results):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:n_results]
+
+@pytest.mark.parametrize("dtype, min_overlap", [("float32", 10), ("float16", 9), ("int8", 8)])
+def test_batch_query_matches_brute_force(tmp_path, vectors, dtype, min_overlap):
+    """Test that a batch of queries finds the cosine nearest neighbors for every storage dtype."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"), dtype=dtype)
+    # Small blocks so the query merges results across several of them
+    provider.collection_kwargs["max_scores"] = 5000
+    add(provider, vectors)
+
+    queries = vectors[:5] + 0.1
+    results = provider.query_embeddings(queries, n_results=10, collection_name="docs")
+
+    for query, ids, distances in zip(queries, results["ids"], results["distances"]):
+        expected = {f"id-{i}" for i in exact_neighbors(vectors, query, 10)}
+        assert len(expected & set(ids)) >= min_overlap
+        assert distances == sorted(distances)
+    assert results["ids"][0][0] == "id-0"
+
+def test_query_skips_deleted_rows(tmp_path):
+    """Test that deleted and replaced rows are never returned and short collections return fewer results."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"))
+    add(provider, np.eye(3, dtype=np.float32))
+    provider.apply_changes(collection_name="docs", ids=["id-2"], documents=["new"],
+                           embeddings=[[1.0, 1.0, 0.0]], delete_ids=["id-0"])
+
+    results = provider.query_embeddings([[1.0, 0.0, 0.0]], n_results=5, collection_name="docs")
+
+    assert results["ids"][0] == ["id-2", "id-1"]
+    assert results["distances"][0][0] == pytest.approx(1 - np.sqrt(0.5), abs=1e-5)
+
+def test_query_filters_by_metadata(tmp_path):
+    """Test that `where` filters support equality, comparison operators and $or."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"))
+    provider.apply_changes(collection_name="docs", ids=["a", "b", "c"], documents=["a", "b", "c"],
+                           embeddings=np.eye(3, dtype=np.float32),
+                           metadatas=[{"source": "x.pdf", "page": 0}, {"source": "y.pdf", "page": 1}, {"source": "y.pdf", "page": 2}])
+
+    def search(where):
+        return provider.query_embeddings([[1.0, 0.0, 0.0]], n_results=3, collection_name="docs", where=where)["ids"][0]
+
+    assert sorted(search({"source": "y.pdf"})) == ["b", "c"]
+    assert search({"$and": [{"source": "y.pdf"}, {"page": {"$gte": 2}}]}) == ["c"]
+    assert sorted(search({"$or": [{"page": 0}, {"source": {"$in": ["z.pdf"]}}]})) == ["a"]
+    assert provider.get_ids("docs", where={"page": {"$lt": 2}}) == ["a", "b"]
+    with pytest.raises(ValueError):
+        search({"page": {"$like": 1}})
+
+def test_kept_rows_get_their_metadata_updated(tmp_path):
+    """Test that kept rows whose metadata changed are updated, and that the update survives a reload."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"))
+    provider.apply_changes(collection_name="docs", ids=["a", "b"], documents=["a", "b"], embeddings=np.eye(2, dtype=np.float32),
+                           metadatas=[{"chunk_index": 0}, {"chunk_index": 1}])
+    provider.apply_changes(collection_name="docs", ids=["c"], documents=["c"], embeddings=[[1.0, 1.0]],
+                           metadatas=[{"chunk_index": 0}], kept_metadatas={"a": {"chunk_index": 1}, "b": {"chunk_index": 2}})
+
+    assert provider.get_ids("docs", where={"chunk_index": 2}) == ["b"]
+    reopened = ExactSearchProvider(path=str(tmp_path / "exact"))
+    assert reopened.get_collection("docs").get(include=["metadatas"])["metadatas"] == [
+        {"chunk_index": 1}, {"chunk_index": 2}, {"chunk_index": 0}
+    ]
+
+def test_collection_keeps_its_dtype(tmp_path):
+    """Test that reopening a collection with another dtype keeps the dtype it was stored with."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"), dtype="int8")
+    add(provider, np.eye(2, dtype=np.float32))
+
+    reopened = ExactSearchProvider(path=str(tmp_path / "exact"), dtype="float32")
+
+    assert reopened.get_collection("docs").dtype == np.int8
+    assert reopened.query_embeddings([[0.0, 1.0]], n_results=1, collection_name="docs")["ids"] == [["id-1"]]
+
+def test_unsupported_dtype_is_rejected(tmp_path):
+    """Test that an unsupported dtype raises a ValueError when a collection is created."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"), dtype="float64")
+    with pytest.raises(ValueError):
+        provider.create_collection("docs")
+
+def test_failed_write_leaves_rows_aligned(tmp_path, monkeypatch):
+    """Test that a write failing after its files are written keeps published snapshots intact and later rows aligned."""
+    provider = ExactSearchProvider(path=str(tmp_path / "exact"))
+    add(provider, np.eye(4, dtype=np.float32)[:2])
+    collection = provider.get_collection("docs")
+    published = collection._snapshot
+
+    def failing_extend_index(snapshot, first_row):
+        raise RuntimeError("index update failed")
+    monkeypatch.setattr(collection, "extend_index", failing_extend_index)
+    with pytest.raises(RuntimeError):
+        provider.apply_changes(collection_name="docs", ids=["c"], documents=["doc c"], embeddings=[[0.0, 0.0, 1.0, 0.0]])
+    monkeypatch.undo()
+
+    assert published.ids == ["id-0", "id-1"] and published.documents == ["doc 0", "doc 1"]
+    provider.apply_changes(collection_name="docs", ids=["d"], documents=["doc d"], embeddings=[[0.0, 0.0, 0.0, 1.0]])
+    results = provider.query_embeddings([[0.0, 0.0, 0.0, 1.0], [0.0, 0.0, 1.0, 0.0]], n_results=1, collection_name="docs")
+
+    assert results["ids"] == [["d"], ["c"]]
+    assert results["documents"] == [["doc d"], ["doc c"]]
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+import pytest
+from helpers.executors import WorkerPool, PoolSaturatedError
+
+@pytest.fixture
+def worker_pool():
+    """Fixture to create a small thread pool with 2 workers and room for 2 queued jobs."""
+    pool = WorkerPool(name="test", max_workers=2, max_queue_size=2)
+    yield pool
+    pool.shutdown()
+
+def test_run_returns_result_off_the_event_loop(worker_pool):
+    """Test that jobs run on a worker thread and their results are returned."""
+    async def main():
+        return await worker_pool.run(lambda x, y: (threading.current_thread().name, x + y), 1, y=2)
+
+    thread_name, result = asyncio.run(main())
+    assert result == 3
+    assert thread_name.startswith("test-worker")
+
+def test_concurrency_is_limited_to_max_workers(worker_pool):
+    """Test that no more than max_workers jobs run at the same time."""
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def job():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    async def main():
+        await asyncio.gather(*[worker_pool.run(job) for _ in range(4)])
+
+    asyncio.run(main())
+    assert peak[0] == 2
+    assert worker_pool.stats()["completed"] == 4
+
+def test_full_queue_rejects_jobs(worker_pool):
+    """Test that jobs beyond max_workers + max_queue_size fail fast."""
+    release = threading.Event()
+
+    async def main():
+        jobs = [asyncio.ensure_future(worker_pool.run(release.wait)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        assert worker_pool.queue_depth == 2
+
+        with pytest.raises(PoolSaturatedError):
+            await worker_pool.run(release.wait)
+
+        release.set()
+        await asyncio.gather(*jobs)
+
+    asyncio.run(main())
+    assert worker_pool.stats()["rejected"] == 1
+
+def test_event_loop_stays_responsive(worker_pool):
+    """Test that a slow blocking job does not stall other coroutines."""
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(worker_pool.run(time.sleep, 0.2), ticker())
+        return ticks
+
+    ticks = asyncio.run(main())
+    assert ticks[-1] - ticks[0] < 0.15
+
+def test_pool_serves_successive_event_loops(worker_pool):
+    """Test that a pool contended on by one event loop keeps working under the next one."""
+    async def main():
+        await asyncio.gather(*[worker_pool.run(time.sleep, 0.01) for _ in range(4)])
+
+    asyncio.run(main())
+    asyncio.run(main())
+    assert worker_pool.stats()["completed"] == 8
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import time
+import httpx
+import pytest
+from helpers import http_clients
+from helpers.http_clients import get_http_client, get_async_http_client, host_request_slot
+from stores.llm.LLMEnum import LLMsProviders
+from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.llm.providers.OllamaLLMProvider import OllamaLLMProvider
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Answers like a non-streaming Ollama chat and records the client port of every request."""
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.client_ports.append(self.client_address[1])
+        content = json.dumps({"message": {"role": "assistant", "content": "pong"}, "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def chat_server():
+    """Fixture to run a keep-alive chat server on a free port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    server.client_ports = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/api/chat", server
+    server.shutdown()
+    server.server_close()
+    http_clients.close_http_clients()
+
+def test_clients_are_shared_per_host():
+    """Test that URLs on the same host share a client and other hosts or ports get their own."""
+    client = get_http_client("http://localhost:11434/api/chat")
+
+    assert get_http_client("http://localhost:11434/api/generate") is client
+    assert get_http_client("http://localhost:11435/api/chat") is not client
+    http_clients.close_http_clients()
+
+def test_requests_reuse_one_connection(chat_server):
+    """Test that consecutive generations from providers of the same server reuse one kept-alive connection."""
+    url, server = chat_server
+
+    for _ in range(3):
+        assert OllamaLLMProvider(base_url=url, model="fake-model").generate_response("ping") == "pong"
+
+    assert len(server.client_ports) == 3
+    assert len(set(server.client_ports)) == 1
+
+class SlowGenerationHandler(KeepAliveHandler):
+    """Answers like KeepAliveHandler, after thinking for longer than the read timeout."""
+
+    def do_POST(self):
+        time.sleep(0.5)
+        super().do_POST()
+
+def test_non_streaming_generations_outlast_the_read_timeout(monkeypatch):
+    """Test that a generation answering after the shared read timeout still completes, while other calls time out."""
+    monkeypatch.setitem(http_clients._options, "read_timeout", 0.1)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowGenerationHandler)
+    server.client_ports = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/chat"
+    try:
+        assert OllamaLLMProvider(base_url=url, model="fake-model").generate_response("ping") == "pong"
+        with pytest.raises(httpx.ReadTimeout):
+            get_http_client(url).post(url, json={})
+    finally:
+        server.shutdown()
+        server.server_close()
+        http_clients.close_http_clients()
+
+def test_async_clients_are_bound_to_their_event_loop():
+    """Test that each event loop gets its own async client, reused within the loop."""
+    async def clients():
+        return get_async_http_client("http://localhost:11434"), get_async_http_client("http://localhost:11434/x")
+
+    first, again = asyncio.run(clients())
+    second, _ = asyncio.run(clients())
+
+    assert first is again
+    assert second is not first
+
+def test_request_slots_bound_concurrency_per_host(monkeypatch):
+    """Test that no more than HTTP_MAX_CONNECTIONS_PER_HOST requests to a host run at once."""
+    monkeypatch.setitem(http_clients._options, "max_connections_per_host", 2)
+    running, peak = 0, 0
+
+    async def request(url):
+        nonlocal running, peak
+        async with host_request_slot(url):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    async def main():
+        await asyncio.gather(*[request("http://localhost:11434/api/chat") for _ in range(6)],
+                             request("http://other-host/api/chat"))
+
+    asyncio.run(main())
+    assert peak == 3
+
+def test_llm_providers_are_created_once_per_configuration():
+    """Test that the factory returns the same provider for the same configuration only."""
+    def get_llm(model_id):
+        return LLMProviderFactory.get_llm(provider=LLMsProviders.OLLAMA, model_id=model_id,
+                                          base_url="http://localhost:11434/api/chat")
+
+    assert get_llm("model-a") is get_llm("model-a")
+    assert get_llm("model-a") is not get_llm("model-b")
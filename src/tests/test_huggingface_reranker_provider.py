@@ -0,0 +1,83 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+transformers = pytest.importorskip("transformers")
+
+from helpers.model_registry import ModelRegistry
+from stores.reranking.RerankingEnum import RerankingModelsProvidersEnums, HuggingFaceLocalModelIdsEnum
+from stores.reranking.providers.HuggingFaceRerankerProvider import HuggingFaceRerankerProvider
+
+MODEL_ID = HuggingFaceLocalModelIdsEnum.MiniLM_L6_V2_Reranker
+WORDS = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "paris", "capital", "france", "egypt"]
+
+@pytest.fixture
+def tiny_cross_encoder(tmp_path, monkeypatch):
+    """Fixture to register a tiny randomly initialised BERT cross-encoder in the reranking registry."""
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS))
+
+    torch.manual_seed(0)
+    tokenizer = transformers.BertTokenizerFast(vocab_file=str(vocab_file))
+    config = transformers.BertConfig(vocab_size=len(WORDS) + 5, hidden_size=16, num_hidden_layers=1,
+                                     num_attention_heads=2, intermediate_size=32, num_labels=1)
+    model = transformers.BertForSequenceClassification(config).eval()
+
+    forward_calls = []
+    original_forward = model.forward
+    def counting_forward(*args, **kwargs):
+        forward_calls.append(kwargs["input_ids"].shape)
+        return original_forward(*args, **kwargs)
+    monkeypatch.setattr(model, "forward", counting_forward)
+
+    registry = ModelRegistry(memory_budget_mb=1024)
+    registry.warm_up(RerankingModelsProvidersEnums.HuggingFaceLocal.value, MODEL_ID.value, lambda: (tokenizer, model))
+    monkeypatch.setattr("stores.reranking.providers.HuggingFaceRerankerProvider.get_reranking_model_registry",
+                        lambda: registry)
+    return tokenizer, model, forward_calls, registry
+
+def make_documents(count):
+    return [" ".join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(1 + i % 9)) for i in range(count)]
+
+def test_rerank_uses_few_forward_passes(tiny_cross_encoder):
+    """Test that 100 candidates are scored in ceil(100 / batch_size) forward passes."""
+    _, _, forward_calls, _ = tiny_cross_encoder
+    provider = HuggingFaceRerankerProvider(model_id=MODEL_ID, batch_size=32, max_length=64)
+
+    results = provider.rerank("capital of france", make_documents(100))
+
+    assert len(results) == 100
+    assert len(forward_calls) == 4
+
+def test_rerank_matches_unbatched_scores(tiny_cross_encoder):
+    """Test that batched, padded scoring gives the same scores as one pair at a time."""
+    tokenizer, model, _, _ = tiny_cross_encoder
+    provider = HuggingFaceRerankerProvider(model_id=MODEL_ID, batch_size=8, max_length=64)
+    query = "capital of france"
+    documents = make_documents(20)
+
+    batched = dict(provider.rerank(query, documents))
+
+    for doc in documents:
+        inputs = tokenizer(query, doc, return_tensors="pt", truncation=True, max_length=64)
+        with torch.no_grad():
+            expected = model(**inputs).logits.squeeze().item()
+        assert batched[doc] == pytest.approx(expected, abs=1e-4)
+
+def test_rerank_top_k(tiny_cross_encoder):
+    """Test that top_k returns only the best scoring documents, in order."""
+    provider = HuggingFaceRerankerProvider(model_id=MODEL_ID, batch_size=16, max_length=64)
+    documents = make_documents(30)
+
+    full = provider.rerank("quick fox", documents)
+    top = provider.rerank("quick fox", documents, top_k=5)
+
+    assert [doc for doc, _ in top] == [doc for doc, _ in full[:5]]
+
+def test_providers_share_loaded_model(tiny_cross_encoder):
+    """Test that providers created per request reuse the same model instance."""
+    _, _, _, registry = tiny_cross_encoder
+    first = HuggingFaceRerankerProvider(model_id=MODEL_ID, batch_size=8, max_length=64)
+    second = HuggingFaceRerankerProvider(model_id=MODEL_ID, batch_size=8, max_length=64)
+
+    assert first.model is second.model
+    assert registry.stats()["loads"] == 1
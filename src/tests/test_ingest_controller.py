@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from controllers.EmbeddingController import EmbeddingController
+from controllers.IngestController import IngestController
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+from tests.test_embedding_controller import CountingEmbeddingClient, WideEmbeddingClient
+
+async def split_words(page):
+    return page.split()
+
+@pytest.fixture
+def vectordb(tmp_path):
+    """Fixture to provide a connected ChromaDB provider in a temporary directory."""
+    provider = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    provider.connect()
+    return provider
+
+def test_ingest_writes_batches_before_the_last_page(app_settings_env, vectordb):
+    """Test that the first batch is searchable before later pages are parsed."""
+    ids_seen_before_last_page = []
+    commits = []
+    apply_changes = vectordb.apply_changes
+    vectordb.apply_changes = lambda **kwargs: commits.append(apply_changes(**kwargs))
+
+    async def pages():
+        yield "alpha beta"
+        # Give the pipeline time to embed and write the first page
+        for _ in range(200):
+            if commits:
+                break
+            await asyncio.sleep(0.01)
+        ids_seen_before_last_page.extend(vectordb.get_ids("streamed_file"))
+        yield "gamma delta"
+
+    stats = asyncio.run(IngestController().ingest(vectordb, CountingEmbeddingClient(), "streamed_file",
+                                                  pages(), split_words, batch_size=2, queue_size=1))
+
+    assert sorted(ids_seen_before_last_page) == sorted(EmbeddingController.generate_chunk_ids(["alpha", "beta"]))
+    assert stats == {"pages": 2, "embedded": 4, "added": 4, "deleted": 0, "unchanged": 0}
+
+def test_ingest_skips_unchanged_and_deletes_stale_chunks(app_settings_env, vectordb):
+    """Test that re-ingesting only embeds new chunks and removes vanished ones."""
+    async def pages(*texts):
+        for text in texts:
+            yield text
+
+    controller = IngestController()
+    client = CountingEmbeddingClient()
+    asyncio.run(controller.ingest(vectordb, client, "streamed_file", pages("one two", "three"), split_words, batch_size=10))
+    stats = asyncio.run(controller.ingest(vectordb, client, "streamed_file", pages("one two", "four"), split_words, batch_size=10))
+
+    assert stats == {"pages": 2, "embedded": 1, "added": 1, "deleted": 1, "unchanged": 2}
+    assert client.calls[-1] == ["four"]
+    assert sorted(vectordb.get_ids("streamed_file")) == sorted(EmbeddingController.generate_chunk_ids(["one", "two", "four"]))
+
+def test_ingest_propagates_stage_errors(app_settings_env, vectordb):
+    """Test that a failing embedder stops the pipeline and surfaces the error."""
+    class FailingEmbeddingClient(CountingEmbeddingClient):
+        def generate_embedding(self, texts):
+            raise RuntimeError("embedding failed")
+
+    async def pages():
+        while True:
+            yield "endless page of words"
+
+    with pytest.raises(RuntimeError, match="embedding failed"):
+        asyncio.run(IngestController().ingest(vectordb, FailingEmbeddingClient(), "streamed_file",
+                                              pages(), split_words, batch_size=2, queue_size=1))
+
+def test_ingest_updates_pages_of_unchanged_chunks(app_settings_env, vectordb):
+    """Test that chunks moved to another page by an edit keep their vectors but get their new page and position."""
+    async def pages(*texts):
+        for text in texts:
+            yield text
+
+    controller = IngestController()
+    asyncio.run(controller.ingest(vectordb, CountingEmbeddingClient(), "streamed_file", pages("one", "two"), split_words))
+    asyncio.run(controller.ingest(vectordb, CountingEmbeddingClient(), "streamed_file", pages("zero", "one two"), split_words))
+
+    chunks = vectordb.get_collection("streamed_file").get(include=["documents", "metadatas"])
+    assert {document: (metadata["page"], metadata["chunk_index"]) for document, metadata in zip(chunks["documents"], chunks["metadatas"])} == {
+        "zero": (0, 0), "one": (1, 1), "two": (1, 2)
+    }
+
+def test_ingest_into_shared_collection_tags_and_scopes_chunks(app_settings_env, vectordb):
+    """Test that a shared collection keeps each file's chunks apart, with source, page and position metadata."""
+    async def pages(*texts):
+        for text in texts:
+            yield text
+
+    controller = IngestController()
+    client = CountingEmbeddingClient()
+    asyncio.run(controller.ingest(vectordb, client, "library", pages("one two", "three"), split_words,
+                                  source="a.pdf", shared=True))
+    asyncio.run(controller.ingest(vectordb, client, "library", pages("one"), split_words,
+                                  source="b.pdf", shared=True))
+    stats = asyncio.run(controller.ingest(vectordb, client, "library", pages("one two"), split_words,
+                                          source="a.pdf", shared=True))
+
+    assert stats["deleted"] == 1 and stats["unchanged"] == 2
+    assert len(vectordb.get_ids("library", where={"source": "b.pdf"})) == 1
+    chunks = vectordb.get_collection("library").get(where={"source": "a.pdf"}, include=["documents", "metadatas"])
+    metadata_by_chunk = {document: metadata for document, metadata in zip(chunks["documents"], chunks["metadatas"])}
+    assert {document: (metadata["page"], metadata["chunk_index"]) for document, metadata in metadata_by_chunk.items()} == {
+        "one": (0, 0), "two": (0, 1)
+    }
+
+def test_ingest_with_another_model_embeds_every_chunk(app_settings_env, vectordb):
+    """Test that re-ingesting with another embedding model replaces every vector, and removes vanished chunks."""
+    async def pages(*texts):
+        for text in texts:
+            yield text
+
+    controller = IngestController()
+    asyncio.run(controller.ingest(vectordb, CountingEmbeddingClient(), "streamed_file", pages("one two", "three"), split_words))
+    client = WideEmbeddingClient()
+    stats = asyncio.run(controller.ingest(vectordb, client, "streamed_file", pages("one two"), split_words, batch_size=10))
+
+    assert stats == {"pages": 1, "embedded": 2, "added": 2, "deleted": 1, "unchanged": 0}
+    assert client.calls == [["one", "two"]]
+    assert sorted(vectordb.get_ids("streamed_file")) == sorted(EmbeddingController.generate_chunk_ids(["one", "two"]))
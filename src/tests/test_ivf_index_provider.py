@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from stores.vectordb.providers.IVFIndexProvider import IVFIndexProvider
+from stores.vectordb.Quantizers import kmeans
+
+@pytest.fixture
+def provider(tmp_path):
+    """Fixture for a connected IVFIndexProvider that trains its lists after 200 rows."""
+    provider = IVFIndexProvider(path=str(tmp_path / "ivf"), nlist=16, nprobe=4, train_min_rows=200)
+    provider.connect()
+    return provider
+
+@pytest.fixture
+def clustered_vectors():
+    """Fixture for 1000 vectors drawn around 20 well separated centers."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 32)) * 10
+    return (centers[rng.integers(0, 20, 1000)] + rng.normal(size=(1000, 32))).astype(np.float32)
+
+def add(provider, vectors, collection_name="docs", start=0):
+    ids = [f"id-{i}" for i in range(start, start + len(vectors))]
+    provider.apply_changes(collection_name=collection_name, ids=ids,
+                           documents=[f"doc {i}" for i in range(start, start + len(vectors))],
+                           embeddings=vectors.tolist(),
+                           metadatas=[{"row": i} for i in range(start, start + len(vectors))])
+
+def test_query_returns_chroma_shaped_results(provider):
+    """Test that queries return the nearest rows with squared L2 distances in Chroma's result layout."""
+    vectors = np.eye(4, dtype=np.float32)
+    add(provider, vectors)
+
+    results = provider.query_embeddings([[1.0, 0.1, 0.0, 0.0], [0.0, 0.0, 0.0, 1.0]], n_results=2, collection_name="docs")
+
+    assert results["ids"][0] == ["id-0", "id-1"]
+    assert results["ids"][1][0] == "id-3"
+    assert results["documents"][0][0] == "doc 0"
+    assert results["metadatas"][0][0] == {"row": 0}
+    assert results["distances"][0][0] == pytest.approx(0.01, abs=1e-5)
+    assert provider.query_embeddings([[1.0, 0.0, 0.0, 0.0]], n_results=1, collection_name="missing") is None
+
+def test_ivf_search_matches_exact_search(provider, clustered_vectors):
+    """Test that the trained IVF index finds the same neighbors as an exact scan on clustered data."""
+    add(provider, clustered_vectors[:500])
+    add(provider, clustered_vectors[500:], start=500)
+    collection = provider.get_collection("docs")
+    assert collection._snapshot.index.centroids is not None
+
+    queries = clustered_vectors[::50] + 0.01
+    results = provider.query_embeddings(queries.tolist(), n_results=5, collection_name="docs")
+
+    for query, ids in zip(queries, results["ids"]):
+        exact = np.argsort(((clustered_vectors - query) ** 2).sum(axis=1))[:5]
+        assert set(ids) == {f"id-{i}" for i in exact}
+
+def test_apply_changes_replaces_and_deletes(provider):
+    """Test that apply_changes replaces rows with the same ID and removes deleted IDs."""
+    add(provider, np.eye(3, dtype=np.float32))
+    provider.apply_changes(collection_name="docs", ids=["id-1"], documents=["new doc"],
+                           embeddings=[[0.0, 0.0, 5.0]], delete_ids=["id-2"])
+
+    assert sorted(provider.get_ids("docs")) == ["id-0", "id-1"]
+    results = provider.query_embeddings([[0.0, 0.0, 5.0]], n_results=3, collection_name="docs")
+    assert results["ids"][0] == ["id-1", "id-0"]
+    assert results["documents"][0][0] == "new doc"
+
+def test_collection_persists_across_providers(tmp_path, provider, clustered_vectors):
+    """Test that rows, deletions and trained lists are reloaded from disk by a new provider."""
+    add(provider, clustered_vectors[:300])
+    provider.apply_changes(collection_name="docs", ids=[], documents=[], embeddings=[], delete_ids=["id-0"])
+
+    reopened = IVFIndexProvider(path=str(tmp_path / "ivf"), nlist=16, nprobe=4, train_min_rows=200)
+    collection = reopened.get_collection("docs")
+
+    assert collection.count() == 299
+    assert collection._snapshot.index.centroids is not None
+    assert "id-0" not in reopened.get_ids("docs")
+    results = reopened.query_embeddings([clustered_vectors[1].tolist()], n_results=1, collection_name="docs")
+    assert results["ids"][0] == ["id-1"]
+
+def test_torn_write_is_ignored_on_load(tmp_path, provider):
+    """Test that a partial log line and unlogged vectors at the end of the files are dropped on load."""
+    add(provider, np.eye(2, dtype=np.float32))
+    directory = tmp_path / "ivf" / "docs"
+    with open(directory / "vectors.bin", "ab") as f:
+        f.write(np.ones(2, dtype=np.float32).tobytes())
+    with open(directory / "rows.jsonl", "a") as f:
+        f.write('{"op": "add", "id": "id-2"')
+
+    reopened = IVFIndexProvider(path=str(tmp_path / "ivf"))
+
+    assert sorted(reopened.get_ids("docs")) == ["id-0", "id-1"]
+    assert (directory / "vectors.bin").stat().st_size == 2 * 2 * 4
+
+def test_get_collection_supports_visualization_reads(provider):
+    """Test that collections expose get(include=...) and count() like a Chroma collection."""
+    add(provider, np.eye(3, dtype=np.float32))
+    collection = provider.get_collection("docs")
+
+    data = collection.get(include=["embeddings", "documents"])
+
+    assert data["embeddings"].shape == (3, 3)
+    assert data["documents"] == ["doc 0", "doc 1", "doc 2"]
+    assert collection.count() == 3
+    assert provider.get_collection_info("docs")["num_vectors"] == 3
+
+def test_delete_collection(provider):
+    """Test that deleting a collection removes it from disk."""
+    add(provider, np.eye(2, dtype=np.float32))
+    provider.delete_collection("docs")
+
+    assert not provider.collection_exists_flg("docs")
+    assert provider.get_collection("docs") is None
+
+def test_kmeans_separates_clusters(clustered_vectors):
+    """Test that k-means puts one centroid near each of the well separated centers."""
+    centroids = kmeans(clustered_vectors, 20, n_iterations=20)
+    distances = ((clustered_vectors[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    assert distances.mean() < 64
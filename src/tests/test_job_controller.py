@@ -0,0 +1,169 @@
+import asyncio
+import pytest
+from controllers.JobController import JobController
+from models.JobModel import JobModel
+from models.enums.JobStatusEnum import JobStatusEnum
+from helpers.executors import PoolSaturatedError
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+from tests.test_embedding_controller import CountingEmbeddingClient
+
+class FakeJobController(JobController):
+    """JobController reading pages from the job parameters instead of an uploaded PDF."""
+
+    def __init__(self, *args, page_delay=0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_delay = page_delay
+        self.embedding_client = CountingEmbeddingClient()
+
+    async def iter_job_pages(self, job):
+        for page in job.params["pages"]:
+            await asyncio.sleep(self.page_delay)
+            yield page
+
+    def get_job_chunker(self, job):
+        async def split_words(page):
+            if page == "corrupt":
+                raise ValueError("unreadable page")
+            if page == "busy" and job.attempts == 1:
+                raise PoolSaturatedError("Worker pool 'cpu' is saturated.")
+            return page.split()
+        return split_words
+
+    def get_job_embedding_client(self, job):
+        return self.embedding_client
+
+@pytest.fixture
+def vectordb(tmp_path):
+    """Fixture to provide a connected ChromaDB provider in a temporary directory."""
+    provider = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    provider.connect()
+    return provider
+
+@pytest.fixture
+def jobs_db_path(tmp_path):
+    """Fixture to provide a temporary SQLite path for the job store."""
+    return str(tmp_path / "jobs" / "jobs.sqlite")
+
+async def wait_for_status(controller, job_id, statuses, timeout=10.0):
+    async def poll():
+        while (job := await controller.get_job(job_id)).status not in statuses:
+            await asyncio.sleep(0.01)
+        return job
+    return await asyncio.wait_for(poll(), timeout)
+
+def test_submitted_job_completes_with_progress(app_settings_env, vectordb, jobs_db_path):
+    """Test that a submitted job runs in the background and records its progress."""
+    async def scenario():
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1)
+        await controller.start()
+        job = await controller.submit({"file_name": "report.pdf", "pages": ["one two", "three"]})
+        finished = await wait_for_status(controller, job.job_id, [JobStatusEnum.COMPLETED])
+        await controller.stop()
+        return finished
+
+    job = asyncio.run(scenario())
+
+    assert job.attempts == 1
+    assert job.progress["pages"] == 2
+    assert job.progress["embedded"] == 3
+    assert job.progress["added"] == 3
+    assert len(vectordb.get_ids("report")) == 3
+
+def test_cancel_and_retry(app_settings_env, vectordb, jobs_db_path):
+    """Test that a running job can be cancelled and then retried to completion."""
+    async def scenario():
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1, page_delay=0.05)
+        await controller.start()
+        job = await controller.submit({"file_name": "slow_file.pdf", "pages": ["word"] * 100})
+        await wait_for_status(controller, job.job_id, [JobStatusEnum.RUNNING])
+
+        cancelled = await controller.cancel(job.job_id)
+        with pytest.raises(ValueError):
+            await controller.cancel(job.job_id)
+
+        controller.page_delay = 0.0
+        await controller.retry(job.job_id)
+        finished = await wait_for_status(controller, job.job_id, [JobStatusEnum.COMPLETED])
+        await controller.stop()
+        return cancelled, finished
+
+    cancelled, finished = asyncio.run(scenario())
+
+    assert cancelled.status == JobStatusEnum.CANCELLED
+    assert finished.attempts == 2
+    assert finished.progress["pages"] == 100
+
+def test_failed_job_records_error(app_settings_env, vectordb, jobs_db_path):
+    """Test that an error inside the pipeline marks the job as failed."""
+    async def scenario():
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1)
+        await controller.start()
+        job = await controller.submit({"file_name": "broken.pdf", "pages": ["fine", "corrupt"]})
+        failed = await wait_for_status(controller, job.job_id, [JobStatusEnum.FAILED])
+        await controller.stop()
+        return failed
+
+    job = asyncio.run(scenario())
+
+    assert job.error == "unreadable page"
+
+def test_unfinished_jobs_resume_after_restart(app_settings_env, vectordb, jobs_db_path):
+    """Test that a job interrupted by shutdown is resumed by the next start."""
+    async def first_run():
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1, page_delay=0.05)
+        await controller.start()
+        job = await controller.submit({"file_name": "long_file.pdf", "pages": [f"page{i}" for i in range(40)]})
+        await wait_for_status(controller, job.job_id, [JobStatusEnum.RUNNING])
+        await asyncio.sleep(0.2)
+        await controller.stop()
+        return job.job_id
+
+    async def second_run(job_id):
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1)
+        assert (await controller.get_job(job_id)).status == JobStatusEnum.RUNNING
+        await controller.start()
+        finished = await wait_for_status(controller, job_id, [JobStatusEnum.COMPLETED])
+        await controller.stop()
+        return finished
+
+    job_id = asyncio.run(first_run())
+    job = asyncio.run(second_run(job_id))
+
+    assert job.attempts == 2
+    assert job.progress["pages"] == 40
+    assert len(vectordb.get_ids("long_file")) == 40
+
+def test_job_turned_away_by_a_saturated_pool_runs_again(app_settings_env, vectordb, jobs_db_path):
+    """Test that a job hitting a saturated worker pool is queued again instead of failing."""
+    async def scenario():
+        controller = FakeJobController(JobModel(jobs_db_path), vectordb, workers=1, retry_delay=0.01)
+        await controller.start()
+        job = await controller.submit({"file_name": "busy_file.pdf", "pages": ["busy"]})
+        finished = await wait_for_status(controller, job.job_id, [JobStatusEnum.COMPLETED, JobStatusEnum.FAILED])
+        await controller.stop()
+        return finished
+
+    job = asyncio.run(scenario())
+
+    assert job.status == JobStatusEnum.COMPLETED
+    assert job.attempts == 2
+
+def test_worker_survives_a_job_store_error(app_settings_env, vectordb, jobs_db_path, monkeypatch):
+    """Test that an error outside the ingestion itself doesn't stop the worker from taking the next job."""
+    async def scenario():
+        job_model = JobModel(jobs_db_path)
+        controller = FakeJobController(job_model, vectordb, workers=1)
+        get_job = job_model.get_job
+        async def failing_get_job(job_id):
+            monkeypatch.setattr(job_model, "get_job", get_job)
+            raise RuntimeError("database is locked")
+        monkeypatch.setattr(job_model, "get_job", failing_get_job)
+
+        await controller.start()
+        await controller.submit({"file_name": "lost.pdf", "pages": ["one"]})
+        job = await controller.submit({"file_name": "next.pdf", "pages": ["two"]})
+        finished = await wait_for_status(controller, job.job_id, [JobStatusEnum.COMPLETED])
+        await controller.stop()
+        return finished
+
+    assert asyncio.run(scenario()).progress["pages"] == 1
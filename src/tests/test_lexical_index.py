@@ -0,0 +1,72 @@
+import pytest
+from stores.lexical.LexicalIndex import LexicalIndex, LexicalIndexStore, tokenize
+from stores.lexical.LexicalEnum import LexicalScoringEnum
+
+@pytest.fixture
+def index():
+    """Fixture providing a small committed lexical index."""
+    lexical_index = LexicalIndex()
+    lexical_index.add_documents(
+        ["cats", "dogs", "pets", "cars"],
+        ["Cats purr and cats sleep.", "Dogs bark at night.", "Cats and dogs are popular pets.", "Cars need fuel."],
+    )
+    lexical_index.commit()
+    return lexical_index
+
+def test_tokenize():
+    """Test that tokens are lowercased words without punctuation."""
+    assert tokenize("Hello, World! It's 2024.") == ["hello", "world", "it", "s", "2024"]
+
+@pytest.mark.parametrize("scoring", list(LexicalScoringEnum))
+def test_search_ranks_matching_documents(index, scoring):
+    """Test that documents are ranked by term relevance and non-matching ones are left out."""
+    results = index.search("cats", n_results=10, scoring=scoring)
+
+    assert [result["id"] for result in results] == ["cats", "pets"]
+    assert results[0]["document"] == "Cats purr and cats sleep."
+    assert results[0]["score"] > results[1]["score"] > 0
+
+def test_search_limits_results_and_ignores_unknown_terms(index):
+    """Test that n_results caps the results and unknown terms match nothing."""
+    assert len(index.search("cats dogs", n_results=1)) == 1
+    assert index.search("unicorns", n_results=5) == []
+
+def test_updates_are_applied_on_search(index):
+    """Test that added, replaced and removed documents are visible to the next search."""
+    index.add_documents(["boats"], ["Boats float."])
+    index.add_documents(["cars"], ["Cars and boats need fuel."])
+    index.remove_documents(["dogs"])
+
+    assert index.dirty
+    assert [result["id"] for result in index.search("boats", n_results=5)] == ["boats", "cars"]
+    assert index.search("bark", n_results=5) == []
+    assert len(index) == 4
+    assert "dogs" not in index and "boats" in index
+
+def test_save_and_load(index, tmp_path):
+    """Test that a saved index answers queries identically after loading."""
+    directory = str(tmp_path / "collection")
+    index.save(directory)
+    index.add_documents(["boats"], ["Boats float."])
+    index.save(directory)
+
+    loaded = LexicalIndex.load(directory)
+
+    for query in ["cats", "dogs pets", "boats"]:
+        assert loaded.search(query, n_results=5) == index.search(query, n_results=5)
+
+def test_store_persists_indexes_per_collection(tmp_path):
+    """Test that the store saves each collection and reloads it in a new store."""
+    store = LexicalIndexStore(str(tmp_path / "lexical"))
+    store.get_index("first").add_documents(["a"], ["alpha"])
+    store.get_index("second").add_documents(["b"], ["beta"])
+    store.save_index("first")
+    store.save_index("second")
+
+    reloaded = LexicalIndexStore(str(tmp_path / "lexical"))
+
+    assert [result["id"] for result in reloaded.get_index("first").search("alpha", 5)] == ["a"]
+    assert reloaded.get_index("first").search("beta", 5) == []
+
+    reloaded.delete_index("first")
+    assert len(LexicalIndexStore(str(tmp_path / "lexical")).get_index("first")) == 0
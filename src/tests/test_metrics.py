@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from controllers.NLPController import NLPController
+from helpers.metrics import MetricsRegistry, MetricsMiddleware, HTTP_REQUEST_DURATION, STAGE_DURATION, STAGE_ERRORS, time_stage
+from models.enums.PipelineStageEnum import PipelineStageEnum
+from routes.metrics import metrics_router
+
+class ReversingReranker:
+    """Reranker returning the documents in reverse order."""
+
+    def rerank(self, query, documents, top_k=None):
+        return list(reversed(documents))[:top_k]
+
+def test_histograms_render_cumulative_buckets():
+    """Test that histograms render cumulative buckets, sum and count in the Prometheus text format."""
+    registry = MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, stage='say "hi"')
+
+    lines = registry.render().splitlines()
+
+    assert lines[:2] == ["# HELP test_seconds Test latency.", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1',
+        'test_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 2',
+        'test_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 3',
+        'test_seconds_sum{stage="say \\"hi\\""} 5.55',
+        'test_seconds_count{stage="say \\"hi\\""} 3',
+    ]
+
+def test_metrics_reject_unknown_labels():
+    """Test that observing with the wrong labels fails instead of creating a stray series."""
+    histogram = MetricsRegistry().histogram("test_seconds", "Test latency.", ("stage",))
+    with pytest.raises(ValueError, match="takes labels"):
+        histogram.observe(1.0, route="/")
+
+def test_failed_stages_are_counted_not_timed():
+    """Test that a stage that raises counts as an error and adds no latency sample."""
+    timed, failed = STAGE_DURATION.count(stage="test_stage"), STAGE_ERRORS.value(stage="test_stage")
+
+    with time_stage("test_stage"):
+        pass
+    with pytest.raises(RuntimeError):
+        with time_stage("test_stage"):
+            raise RuntimeError("boom")
+
+    assert STAGE_DURATION.count(stage="test_stage") == timed + 1
+    assert STAGE_ERRORS.value(stage="test_stage") == failed + 1
+
+def test_controller_stages_are_timed(app_settings_env):
+    """Test that reranking through the NLP controller records a reranking sample."""
+    before = STAGE_DURATION.count(stage=PipelineStageEnum.RERANKING.value)
+
+    results = asyncio.run(NLPController().rerank(ReversingReranker(), "query", ["a", "b"]))
+
+    assert results == ["b", "a"]
+    assert STAGE_DURATION.count(stage=PipelineStageEnum.RERANKING.value) == before + 1
+
+def test_requests_are_labelled_by_route_template(app_settings_env):
+    """Test that request latencies are labelled with the route template and exposed on /metrics."""
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"item_id": item_id}
+
+    labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+    before = HTTP_REQUEST_DURATION.count(**labels)
+
+    with TestClient(app) as client:
+        client.get("/items/1")
+        client.get("/items/2")
+        client.get("/missing")
+        response = client.get("/metrics")
+
+    assert HTTP_REQUEST_DURATION.count(**labels) == before + 2
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'route="/items/{item_id}",status="200"' in response.text
+    assert 'route="unmatched",status="404"' in response.text
+    assert 'route="/items/1"' not in response.text
+    assert "# TYPE rag_stage_duration_seconds histogram" in response.text
@@ -0,0 +1,101 @@
+import threading
+import pytest
+from helpers.model_registry import ModelRegistry
+
+MB = 1024 * 1024
+
+class FakeModel:
+    def __init__(self, name, size_bytes):
+        self.name = name
+        self.size_bytes = size_bytes
+
+@pytest.fixture
+def registry():
+    """Fixture to create a registry with a 10MB budget that sizes FakeModel by its attribute."""
+    return ModelRegistry(memory_budget_mb=10, size_estimator=lambda model: model.size_bytes)
+
+def counting_loader(name, size_bytes, calls):
+    def loader():
+        calls.append(name)
+        return FakeModel(name, size_bytes)
+    return loader
+
+def test_acquire_reuses_loaded_model(registry):
+    """Test that repeated acquires for the same (provider, model_id) load the model once."""
+    calls = []
+    first = registry.acquire("hugging_face", "model-a", counting_loader("model-a", MB, calls))
+    second = registry.acquire("hugging_face", "model-a", counting_loader("model-a", MB, calls))
+
+    assert first is second
+    assert calls == ["model-a"]
+    assert registry.stats()["hits"] == 1
+
+def test_models_are_keyed_by_provider_and_model_id(registry):
+    """Test that the same model_id under another provider is a separate entry."""
+    calls = []
+    registry.acquire("hugging_face", "model-a", counting_loader("hf", MB, calls))
+    registry.acquire("openai", "model-a", counting_loader("openai", MB, calls))
+
+    assert calls == ["hf", "openai"]
+
+def test_lru_eviction_skips_referenced_models(registry):
+    """Test that only unreferenced models are evicted, least recently used first."""
+    calls = []
+    registry.acquire("hugging_face", "model-a", counting_loader("model-a", 4 * MB, calls))
+    registry.warm_up("hugging_face", "model-b", counting_loader("model-b", 4 * MB, calls))
+
+    # model-a is still referenced, so loading model-c over budget must evict model-b
+    registry.acquire("hugging_face", "model-c", counting_loader("model-c", 4 * MB, calls))
+
+    assert registry.is_loaded("hugging_face", "model-a")
+    assert not registry.is_loaded("hugging_face", "model-b")
+    assert registry.is_loaded("hugging_face", "model-c")
+    assert registry.stats()["evictions"] == 1
+
+def test_release_makes_model_evictable(registry):
+    """Test that a released model is evicted once the budget is exceeded."""
+    calls = []
+    registry.acquire("hugging_face", "model-a", counting_loader("model-a", 6 * MB, calls))
+    registry.release("hugging_face", "model-a")
+    registry.acquire("hugging_face", "model-b", counting_loader("model-b", 6 * MB, calls))
+
+    assert not registry.is_loaded("hugging_face", "model-a")
+    assert registry.total_size_bytes() == 6 * MB
+
+def test_concurrent_acquires_load_once(registry):
+    """Test that threads racing on the same model trigger a single load."""
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def worker():
+        barrier.wait()
+        registry.acquire("hugging_face", "model-a", counting_loader("model-a", MB, calls))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == ["model-a"]
+    assert registry.stats()["loaded_models"][0]["ref_count"] == 8
+
+def test_acquired_model_is_referenced_before_other_loads_can_evict_it(registry):
+    """Test that a model is referenced as soon as acquire finds it, even if another load fills the budget right after."""
+    calls = []
+    registry.warm_up("hugging_face", "model-a", counting_loader("model-a", 6 * MB, calls))
+
+    get_or_load = registry._get_or_load
+    def racing_get_or_load(key, loader, references=0):
+        entry = get_or_load(key, loader, references)
+        if key[1] == "model-a":
+            # Another request warms up a model in between
+            registry.warm_up("hugging_face", "model-b", counting_loader("model-b", 6 * MB, calls))
+        return entry
+    registry._get_or_load = racing_get_or_load
+
+    registry.acquire("hugging_face", "model-a", counting_loader("model-a", 6 * MB, calls))
+
+    assert registry.is_loaded("hugging_face", "model-a")
+    assert not registry.is_loaded("hugging_face", "model-b")
+    assert registry.stats()["loaded_models"][0]["ref_count"] == 1
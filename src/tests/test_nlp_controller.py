@@ -0,0 +1,130 @@
+import asyncio
+import pytest
+from controllers.EmbeddingController import EmbeddingController
+from controllers.NLPController import NLPController, reciprocal_rank_fusion
+from models.enums.SearchTechniqueEnum import SearchTechniqueEnums
+from stores.vectordb.providers.ChromaDBProvider import ChromaDBProvider
+from stores.lexical.LexicalIndex import get_lexical_index_store
+from helpers.config import reload_settings
+
+class AxisEmbeddingClient:
+    """Embeds known words onto distinct axes and records every call."""
+
+    AXES = {"apple": [1.0, 0.0, 0.0], "banana": [0.0, 1.0, 0.0], "cherry": [0.0, 0.0, 1.0]}
+
+    def __init__(self):
+        self.model_id = "axis-model"
+        self.calls = []
+
+    def generate_embedding(self, texts):
+        self.calls.append(list(texts))
+        return [self.AXES[text] for text in texts]
+
+@pytest.fixture
+def vectordb(tmp_path):
+    """Fixture to provide a ChromaDB provider with two fruit collections, counting queries."""
+    provider = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    provider.connect()
+    for collection_name, words in {"fruits_one": ["apple", "banana"], "fruits_two": ["cherry", "banana"]}.items():
+        provider.apply_changes(collection_name=collection_name, ids=words, documents=words,
+                               embeddings=[AxisEmbeddingClient.AXES[word] for word in words],
+                               metadatas=[{"word": word} for word in words])
+
+    provider.query_calls = []
+    query_embeddings = provider.query_embeddings
+    def counting_query_embeddings(**kwargs):
+        provider.query_calls.append(kwargs)
+        return query_embeddings(**kwargs)
+    provider.query_embeddings = counting_query_embeddings
+    return provider
+
+def test_batch_semantic_search(app_settings_env, vectordb):
+    """Test that a batch embeds once, queries each collection once and keeps query order."""
+    client = AxisEmbeddingClient()
+    queries = [("fruits_one", "apple"), ("fruits_two", "cherry"), ("fruits_one", "banana"),
+               ("fruits_two", "banana"), ("missing_fruits", "apple")]
+
+    results = asyncio.run(NLPController().batch_semantic_search(vectordb, client, queries, n_results=1))
+
+    assert client.calls == [["apple", "cherry", "banana"]]
+    assert sorted(call["collection_name"] for call in vectordb.query_calls) == ["fruits_one", "fruits_two", "missing_fruits"]
+    assert [[result["id"] for result in query_results] for query_results in results] == [
+        ["apple"], ["cherry"], ["banana"], ["banana"], []
+    ]
+    assert results[0][0]["metadata"] == {"word": "apple"}
+    assert results[0][0]["distance"] == pytest.approx(0.0)
+
+def test_reciprocal_rank_fusion():
+    """Test that results ranked well in both lists come first."""
+    dense = [{"id": "a", "document": "A"}, {"id": "b", "document": "B"}, {"id": "c", "document": "C"}]
+    lexical = [{"id": "b", "document": "B"}, {"id": "d", "document": "D"}, {"id": "a", "document": "A"}]
+
+    fused = reciprocal_rank_fusion([dense, lexical], k=60)
+
+    assert [result["id"] for result in fused] == ["b", "a", "d", "c"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+
+def test_lexical_and_hybrid_search_after_reindex(app_settings_env, tmp_path):
+    """Test that reindexed chunks are searchable lexically without embedding the query."""
+    vectordb = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    vectordb.connect()
+    client = AxisEmbeddingClient()
+    asyncio.run(EmbeddingController().reindex_collection(vectordb, client, "fruit_basket", ["apple", "banana", "cherry"]))
+    client.calls.clear()
+    controller = NLPController()
+
+    lexical = asyncio.run(controller.search(vectordb, None, [("fruit_basket", "banana")], 2, SearchTechniqueEnums.BM25))
+    hybrid = asyncio.run(controller.search(vectordb, client, [("fruit_basket", "cherry")], 2, SearchTechniqueEnums.HYBRID))
+
+    assert [result["document"] for result in lexical[0]] == ["banana"]
+    assert hybrid[0][0]["document"] == "cherry"
+    assert len(hybrid[0]) == 2
+    assert client.calls == [["cherry"]]
+
+def test_search_across_collections_merges_by_distance(app_settings_env, vectordb):
+    """Test that a query over several per-file collections queries each once and merges the closest results."""
+    client = AxisEmbeddingClient()
+    controller = NLPController()
+    targets = controller.get_search_targets(["fruits_one.pdf", "fruits_two.pdf"])
+
+    results = asyncio.run(controller.search_across(vectordb, client, targets, "cherry", 2, SearchTechniqueEnums.SEMANTIC_SEARCH))
+
+    assert sorted(call["collection_name"] for call in vectordb.query_calls) == ["fruits_one", "fruits_two"]
+    assert results[0]["id"] == "cherry"
+    assert [result["distance"] for result in results] == sorted(result["distance"] for result in results)
+    assert client.calls == [["cherry"]]
+
+def test_shared_collection_searches_files_in_one_query(app_settings_env, monkeypatch, tmp_path):
+    """Test that files in a shared collection are searched with one filtered query, semantically and lexically."""
+    monkeypatch.setenv("VECTORDB_SHARED_COLLECTION", "library")
+    reload_settings()
+    vectordb = ChromaDBProvider(path=str(tmp_path / "chromadb"))
+    vectordb.connect()
+    client = AxisEmbeddingClient()
+    for file_name, words in {"one.pdf": ["apple", "banana"], "two.pdf": ["banana"], "three.pdf": ["cherry"]}.items():
+        asyncio.run(EmbeddingController().reindex_collection(vectordb, client, "library", words, source=file_name, shared=True))
+    controller = NLPController()
+    targets = controller.get_search_targets(["one.pdf", "two.pdf"])
+
+    semantic = asyncio.run(controller.search_across(vectordb, client, targets, "banana", 5, SearchTechniqueEnums.SEMANTIC_SEARCH))
+    lexical = asyncio.run(controller.search_across(vectordb, None, targets, "banana", 5, SearchTechniqueEnums.BM25))
+
+    assert len(targets) == 1
+    assert sorted(result["metadata"]["source"] for result in semantic) == ["one.pdf", "one.pdf", "two.pdf"]
+    assert [result["document"] for result in lexical] == ["banana", "banana"]
+
+def test_lexical_search_across_files_fuses_ranks(app_settings_env):
+    """Test that lexical results of per-file indexes are fused by rank, not by scores from different corpus statistics."""
+    # A rare query term in the small file inflates its BM25 scores over the big file's
+    corpora = {"small": ["banana apple", "banana", "kiwi", "fig", "date", "plum", "lime", "pear"],
+               "big": ["banana apple", "banana", "banana kiwi", "apple pear banana", "banana fig"]}
+    for name, documents in corpora.items():
+        lexical_index = get_lexical_index_store().get_index(name)
+        lexical_index.add_documents([f"{name}-{i}" for i in range(len(documents))], documents)
+        lexical_index.commit()
+    controller = NLPController()
+
+    results = asyncio.run(controller.search_across(None, None, controller.get_search_targets(["small.pdf", "big.pdf"]),
+                                                   "banana apple", 2, SearchTechniqueEnums.BM25))
+
+    assert [result["id"] for result in results] == ["small-0", "big-0"]
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from routes.generate import generate_router
+from stores.llm.providers.OllamaLLMProvider import OllamaLLMProvider
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    """Local server answering /api/chat like Ollama, one NDJSON line per token."""
+
+    def __init__(self, tokens, delay=0.0, error=None):
+        super().__init__(("127.0.0.1", 0), FakeOllamaHandler)
+        self.tokens = tokens
+        self.delay = delay
+        self.error = error
+        self.requests = []
+        self.sent = 0
+        self.disconnected = False
+        self.finished = threading.Event()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/chat"
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        server = self.server
+        server.requests.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            if server.error:
+                self.wfile.write((json.dumps({"error": server.error}) + "\n").encode())
+                return
+            for token in server.tokens:
+                self.wfile.write((json.dumps({"message": {"role": "assistant", "content": token}, "done": False}) + "\n").encode())
+                self.wfile.flush()
+                server.sent += 1
+                time.sleep(server.delay)
+            self.wfile.write((json.dumps({"message": {"role": "assistant", "content": ""}, "done": True}) + "\n").encode())
+        except (BrokenPipeError, ConnectionResetError):
+            server.disconnected = True
+        finally:
+            server.finished.set()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def ollama_server(request):
+    """Fixture to run a fake Ollama server; parametrize indirectly with its keyword arguments."""
+    server = FakeOllamaServer(**getattr(request, "param", {"tokens": ["Hel", "lo", " world"]}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+async def collect(tokens):
+    return [token async for token in tokens]
+
+def test_stream_response_yields_tokens_in_order(ollama_server):
+    """Test that streamed tokens arrive in order and the request asks Ollama to stream."""
+    provider = OllamaLLMProvider(base_url=ollama_server.url, model="fake-model", system_prompt="Be brief.")
+
+    tokens = asyncio.run(collect(provider.stream_response("Hi")))
+
+    assert tokens == ["Hel", "lo", " world"]
+    assert ollama_server.requests[0]["stream"] is True
+    assert ollama_server.requests[0]["messages"] == [{"role": "system", "content": "Be brief."}, {"role": "user", "content": "Hi"}]
+
+@pytest.mark.parametrize("ollama_server", [{"tokens": ["token "] * 500, "delay": 0.01}], indirect=True)
+def test_closing_the_stream_cancels_the_request(ollama_server):
+    """Test that closing the iterator after the first token closes the connection to Ollama."""
+    provider = OllamaLLMProvider(base_url=ollama_server.url, model="fake-model")
+
+    async def first_token():
+        tokens = provider.stream_response("Hi")
+        token = await tokens.__anext__()
+        await tokens.aclose()
+        return token
+
+    assert asyncio.run(first_token()) == "token "
+    assert ollama_server.finished.wait(timeout=5)
+    assert ollama_server.disconnected
+    assert ollama_server.sent < 500
+
+@pytest.mark.parametrize("ollama_server", [{"tokens": [], "error": "model not found"}], indirect=True)
+def test_stream_surfaces_ollama_errors(ollama_server):
+    """Test that an error line in the stream raises instead of ending silently."""
+    provider = OllamaLLMProvider(base_url=ollama_server.url, model="missing-model")
+    with pytest.raises(RuntimeError, match="model not found"):
+        asyncio.run(collect(provider.stream_response("Hi")))
+
+def test_generate_route_streams_server_sent_events(app_settings_env, ollama_server):
+    """Test that /api/v1/generate relays tokens as server-sent events when asked to stream."""
+    app = FastAPI()
+    app.include_router(generate_router)
+    body = {"query": "Hi", "docs": ["context"], "provider": "ollama", "base_url": ollama_server.url,
+            "model_id": "fake-model", "stream": True}
+
+    with TestClient(app) as client:
+        with client.stream("POST", "/api/v1/generate/", json=body) as response:
+            events = [event for event in response.read().decode().split("\n\n") if event]
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert [json.loads(event.removeprefix("data: "))["token"] for event in events[:-1]] == ["Hel", "lo", " world"]
+    assert events[-1] == "event: done\ndata: {}"
@@ -1,12 +1,82 @@
 from stores.embedding.providers.OpenAIEmbeddingProvider import OpenAIEmbeddingProvider
 import os
+import json
+import random
+import threading
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock
 from dotenv import load_dotenv
 
 # Load environment variables from .env
 load_dotenv()
 
+class FakeEmbeddingsServer:
+    """Local stand-in for the OpenAI /v1/embeddings endpoint."""
+
+    def __init__(self, rate_limited_requests=0):
+        self.requests = []
+        self.rate_limited_requests = rate_limited_requests
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with server.lock:
+                    server.requests.append(body["input"])
+                    rate_limited = len(server.requests) <= server.rate_limited_requests
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+
+                try:
+                    if rate_limited:
+                        self.send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                                       headers={"retry-after": "0"})
+                        return
+
+                    threading.Event().wait(0.02)  # Let concurrent batches overlap
+                    data = [{"object": "embedding", "index": i, "embedding": FakeEmbeddingsServer.embed(text)}
+                            for i, text in enumerate(body["input"])]
+                    random.shuffle(data)  # The API does not guarantee ordering by index
+                    self.send_json(200, {"object": "list", "data": data, "model": body["model"],
+                                         "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+                finally:
+                    with server.lock:
+                        server.in_flight -= 1
+
+            def send_json(self, status, payload, headers=None):
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @staticmethod
+    def embed(text):
+        return [float(len(text)), float(sum(map(ord, text)) % 997)]
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
 @pytest.fixture
 def openai_provider(mocker):
     """Fixture to create an OpenAIEmbeddingProvider with a mocked API client."""
@@ -22,31 +92,70 @@ def openai_provider(mocker):
     provider.client = mock_client  # Use the mocked client
     return provider
 
-def test_generate_embedding_valid_text(openai_provider):
+def make_provider(server, **kwargs):
+    return OpenAIEmbeddingProvider(model_id="text-embedding-3-small", max_input_token=512,
+                                   api_key="test-key", base_url=server.base_url, **kwargs)
+
+def test_generate_embedding_valid_text():
     """Test embedding generation for valid input text."""
-    openai_provider.client.embeddings.create.return_value.data = [{"embedding": [0.1, 0.2, 0.3]}]
+    with FakeEmbeddingsServer() as server:
+        embeddings = make_provider(server).generate_embedding(["Hello, world!"])
+
+    assert embeddings == [FakeEmbeddingsServer.embed("Hello, world!")]
+
+def test_generate_embedding_batches_and_preserves_order():
+    """Test that many texts are split into token-budgeted batches and reassembled in order."""
+    texts = [f"chunk number {i} " + "word " * (i % 7) for i in range(200)]
+
+    with FakeEmbeddingsServer() as server:
+        provider = make_provider(server, max_batch_tokens=150, max_batch_size=32, max_concurrency=4)
+        embeddings = provider.generate_embedding(texts)
+
+    assert embeddings == [FakeEmbeddingsServer.embed(text) for text in texts]
+    assert len(server.requests) > 1
+    assert all(len(batch) <= 32 for batch in server.requests)
+    assert sorted(text for batch in server.requests for text in batch) == sorted(texts)
+    assert 1 < server.max_in_flight <= 4
+
+def test_generate_embedding_retries_rate_limits():
+    """Test that 429 responses are retried with backoff until the batch succeeds."""
+    with FakeEmbeddingsServer(rate_limited_requests=2) as server:
+        provider = make_provider(server, max_retries=3, retry_base_delay=0.01)
+        embeddings = provider.generate_embedding(["first", "second"])
+
+    assert embeddings == [FakeEmbeddingsServer.embed("first"), FakeEmbeddingsServer.embed("second")]
+    assert len(server.requests) == 3
+
+def test_generate_embedding_gives_up_after_max_retries():
+    """Test that persistent rate limiting surfaces as an error."""
+    with FakeEmbeddingsServer(rate_limited_requests=10) as server:
+        provider = make_provider(server, max_retries=1, retry_base_delay=0.01)
+        with pytest.raises(Exception, match="Error generating embedding"):
+            provider.generate_embedding(["text"])
+
+    assert len(server.requests) == 2
 
-    embedding = openai_provider.generate_embedding("Hello, world!")
-    assert isinstance(embedding, list)
-    assert len(embedding) == 3  # Mocked response has 3 values
-    assert embedding == [0.1, 0.2, 0.3]
+def test_generate_embedding_empty_list(openai_provider):
+    """Test that no request is sent for an empty input list."""
+    assert openai_provider.generate_embedding([]) == []
+    openai_provider.client.embeddings.create.assert_not_called()
 
 def test_generate_embedding_empty_text(openai_provider):
     """Test that empty input raises ValueError."""
     with pytest.raises(ValueError, match="Input text must be a non-empty string"):
-        openai_provider.generate_embedding("")
+        openai_provider.generate_embedding([""])
 
 def test_generate_embedding_exceeds_max_tokens(openai_provider):
     """Test that input exceeding max tokens raises ValueError."""
     long_text = "word " * 600  # More than max_input_token=512
-    with pytest.raises(ValueError, match="Input text exceeds max tokens"):
-        openai_provider.generate_embedding(long_text)
+    with pytest.raises(ValueError, match="exceeds the max token limit"):
+        openai_provider.generate_embedding([long_text])
 
 def test_generate_embedding_api_error(openai_provider):
     """Test handling of API errors."""
     openai_provider.client.embeddings.create.side_effect = Exception("API error")
     with pytest.raises(Exception, match="Error generating embedding: API error"):
-        openai_provider.generate_embedding("Valid input")
+        openai_provider.generate_embedding(["Valid input"])
 
 def test_set_embedding_settings(openai_provider):
     """Test updating embedding model and token limit."""
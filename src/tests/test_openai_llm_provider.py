@@ -33,9 +33,9 @@ def test_validate_token_limit(llm_provider):
     short_message = ["Hello"]
     long_message = ["This is a long message exceeding the token limit."] * 10
     
-    # Mock token encoding
-    with patch("tiktoken.encoding_for_model") as mock_encoding:
-        mock_encoding.return_value.encode.side_effect = lambda x: x.split()
+    # Mock the shared token encoding
+    with patch("helpers.token_counter.get_token_encoding") as mock_encoding:
+        mock_encoding.return_value.encode.side_effect = lambda x, **kwargs: x.split()
         
         # Short message should pass
         llm_provider.validate_token_limit(short_message)
@@ -0,0 +1,81 @@
+import asyncio
+import random
+import pytest
+from nltk.tokenize.punkt import PunktSentenceTokenizer
+from controllers import ChunkController as chunk_module
+from controllers.ChunkController import ChunkController, recursive_chunking, split_text_for_chunking
+from helpers import text_tokenizers
+from helpers.config import reload_settings
+from helpers.executors import shutdown_worker_pools
+
+WORDS = ["Dr.", "U.S.", "etc.", "alpha", "beta", "(gamma.)", '"delta."', "eps!", "zeta?", "eta", "theta.",
+         "e.g.", "3.14", "Kappa", "lambda,", "mu;", "nu...", "'xi.'"]
+SEPARATORS = [" ", " ", " ", " ", "\n", "\n\n", "  ", " \n", "\n \n\n"]
+
+def random_text(rng, n_words):
+    return "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(n_words))
+
+@pytest.fixture
+def punkt_tokenizer(monkeypatch):
+    """Fixture to tokenize sentences with an untrained Punkt tokenizer, so no NLTK data is needed."""
+    tokenizer = PunktSentenceTokenizer()
+    monkeypatch.setattr(text_tokenizers, "get_sentence_tokenizer", lambda language="english": tokenizer)
+    monkeypatch.setattr(chunk_module, "get_sentence_tokenizer", lambda language="english": tokenizer)
+    return tokenizer
+
+def test_recursive_pieces_chunk_like_the_whole_text():
+    """Test that recursively chunking the pieces gives exactly the chunks of the whole text, overlap included."""
+    rng = random.Random(0)
+    split_texts = 0
+    for _ in range(150):
+        text = random_text(rng, rng.randint(50, 2000))
+        chunk_size = rng.choice([20, 50, 100, 300, 1000])
+        chunk_overlap = rng.choice([0, chunk_size // 5])
+
+        pieces = split_text_for_chunking(text, "recursive", chunk_size, n_pieces=rng.randint(2, 6))
+        split_texts += len(pieces) > 1
+
+        assert "".join(pieces) == text
+        assert [chunk for piece in pieces for chunk in recursive_chunking(piece, chunk_size, chunk_overlap)] == \
+            recursive_chunking(text, chunk_size, chunk_overlap)
+    assert split_texts > 50
+
+def test_sentence_pieces_tokenize_like_the_whole_text(punkt_tokenizer):
+    """Test that tokenizing the pieces gives exactly the sentences and words of the whole text."""
+    rng = random.Random(1)
+    for _ in range(30):
+        text = random_text(rng, rng.randint(50, 1000))
+
+        pieces = split_text_for_chunking(text, "sentence", 100, n_pieces=rng.randint(2, 6))
+
+        assert len(pieces) > 1 and "".join(pieces) == text
+        assert [s for piece in pieces for s in text_tokenizers.sent_tokenize(piece)] == text_tokenizers.sent_tokenize(text)
+        assert [w for piece in pieces for w in text_tokenizers.word_tokenize(piece)] == text_tokenizers.word_tokenize(text)
+
+def test_parallel_chunking_is_identical_to_serial(app_settings_env, monkeypatch):
+    """Test that chunking a long text on the CPU worker pool returns byte-identical chunks."""
+    monkeypatch.setenv("CPU_POOL_WORKERS", "3")
+    reload_settings()
+    rng = random.Random(2)
+    text = "\n\n".join(" ".join(rng.choices(WORDS, k=rng.randint(20, 80))) for _ in range(100))
+    controller = ChunkController()
+    assert len(split_text_for_chunking(text, "recursive", 200, n_pieces=3)) == 3
+
+    async def chunk(parallel):
+        return await controller.chunk_text(text, chunk_size=200, chunk_overlap=40, method="recursive", parallel=parallel)
+
+    try:
+        assert asyncio.run(chunk(parallel=True)) == asyncio.run(chunk(parallel=False))
+    finally:
+        shutdown_worker_pools()
+
+def test_short_texts_are_chunked_serially(app_settings_env, monkeypatch):
+    """Test that texts under CHUNKING_PARALLEL_MIN_CHARS never reach the worker pool."""
+    async def no_pool(*args, **kwargs):
+        raise AssertionError("the worker pool was used")
+
+    monkeypatch.setattr(chunk_module, "run_in_pool", no_pool)
+
+    chunks = asyncio.run(ChunkController().chunk_text("First part.\n\nSecond part.", chunk_size=20, chunk_overlap=0))
+
+    assert chunks == ["First part.", "Second part."]
@@ -0,0 +1,121 @@
+import numpy as np
+import pytest
+from stores.vectordb.Quantizers import ScalarQuantizer, ProductQuantizer, save_quantizer, load_quantizer
+from stores.vectordb.providers.ExactSearchProvider import ExactSearchProvider
+from stores.vectordb.providers.IVFIndexProvider import IVFIndexProvider
+
+@pytest.fixture
+def clustered_vectors():
+    """Fixture for 2000 64-dimensional vectors drawn around 50 centers."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(50, 64)).astype(np.float32)
+    return (centers[rng.integers(0, 50, 2000)] + 0.5 * rng.normal(size=(2000, 64))).astype(np.float32)
+
+def add(provider, vectors, collection_name="docs", start=0):
+    provider.apply_changes(collection_name=collection_name,
+                           ids=[f"id-{i}" for i in range(start, start + len(vectors))],
+                           documents=[f"doc {i}" for i in range(start, start + len(vectors))],
+                           embeddings=vectors)
+
+def recall(results, vectors, queries, n_results, metric):
+    hits = 0
+    for query, ids in zip(queries, results["ids"]):
+        if metric == "cosine":
+            normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+            truth = np.argsort(-(normalized @ query))[:n_results]
+        else:
+            truth = np.argsort(((vectors - query) ** 2).sum(axis=1))[:n_results]
+        hits += len({f"id-{i}" for i in truth} & set(ids))
+    return hits / (len(queries) * n_results)
+
+@pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(n_subvectors=8)])
+def test_asymmetric_distances_match_decoded_rows(clustered_vectors, quantizer):
+    """Test that asymmetric distances equal the distances to the decoded rows, and codes are one byte per slice."""
+    quantizer.train(clustered_vectors)
+    codes = quantizer.encode(clustered_vectors)
+    queries = clustered_vectors[:3] + 0.1
+
+    expected = ((quantizer.decode(codes)[None, :, :] - queries[:, None, :]) ** 2).sum(axis=2)
+
+    assert codes.dtype == np.uint8
+    assert codes.shape == (len(clustered_vectors), quantizer.code_size(64))
+    np.testing.assert_allclose(quantizer.distances(queries, codes), expected, rtol=1e-3, atol=1e-2)
+
+def test_product_quantizer_uses_a_divisor_of_the_dimension(clustered_vectors):
+    """Test that the slice count falls back to the largest divisor of the dimension."""
+    quantizer = ProductQuantizer(n_subvectors=12)
+    quantizer.train(clustered_vectors[:300])
+    assert quantizer.n_subvectors == 8
+
+@pytest.mark.parametrize("quantizer", [ScalarQuantizer(), ProductQuantizer(n_subvectors=8)])
+def test_quantizer_round_trips_through_disk(tmp_path, clustered_vectors, quantizer):
+    """Test that a saved quantizer encodes the same codes after loading."""
+    quantizer.train(clustered_vectors)
+    save_quantizer(quantizer, str(tmp_path / "quantizer.npz"))
+    loaded = load_quantizer(str(tmp_path / "quantizer.npz"))
+    np.testing.assert_array_equal(loaded.encode(clustered_vectors), quantizer.encode(clustered_vectors))
+
+@pytest.mark.parametrize("provider_class, metric", [(ExactSearchProvider, "cosine"), (IVFIndexProvider, "l2")])
+def test_rescoring_keeps_recall_of_pq_collections(tmp_path, clustered_vectors, provider_class, metric):
+    """Test that PQ collections calibrate at insert time and rescoring brings recall back near exact search."""
+    provider = provider_class(path=str(tmp_path / "db"), calibration_rows=1000)
+    provider.create_collection("rescored", quantization="pq", pq_subvectors=8, rescore_factor=10)
+    provider.create_collection("codes_only", quantization="pq", pq_subvectors=8, rescore_factor=0)
+    for name in ("rescored", "codes_only"):
+        add(provider, clustered_vectors[:1200], collection_name=name)
+        add(provider, clustered_vectors[1200:], collection_name=name, start=1200)
+
+    queries = clustered_vectors[:20] + 0.05
+    rescored = provider.query_embeddings(queries, n_results=10, collection_name="rescored")
+    codes_only = provider.query_embeddings(queries, n_results=10, collection_name="codes_only")
+
+    assert provider.get_collection("rescored")._snapshot.codes.shape == (2000, 8)
+    assert recall(rescored, clustered_vectors, queries, 10, metric) >= 0.95
+    assert recall(rescored, clustered_vectors, queries, 10, metric) >= recall(codes_only, clustered_vectors, queries, 10, metric)
+
+def test_quantization_is_configured_per_collection(tmp_path, clustered_vectors):
+    """Test that per-collection settings override the provider defaults and survive a reopen."""
+    provider = ExactSearchProvider(path=str(tmp_path / "db"), quantization="scalar", calibration_rows=100)
+    provider.create_collection("plain", quantization="none")
+    add(provider, clustered_vectors[:200], collection_name="plain")
+    add(provider, clustered_vectors[:200], collection_name="scalar")
+
+    reopened = ExactSearchProvider(path=str(tmp_path / "db"))
+
+    assert reopened.get_collection("plain")._snapshot.codes is None
+    assert reopened.get_collection("scalar")._snapshot.codes.shape == (200, 64)
+    assert reopened.get_collection_info("scalar")["config"]["quantization"] == "scalar"
+
+def test_missing_codes_are_rebuilt_on_load(tmp_path, clustered_vectors):
+    """Test that rows whose codes were not written yet are encoded when the collection is loaded."""
+    provider = ExactSearchProvider(path=str(tmp_path / "db"), quantization="scalar", calibration_rows=100)
+    add(provider, clustered_vectors[:200])
+    codes_path = tmp_path / "db" / "docs" / "codes.bin"
+    expected = codes_path.read_bytes()
+    with open(codes_path, "r+b") as f:
+        f.truncate(150 * 64 + 10)
+
+    reopened = ExactSearchProvider(path=str(tmp_path / "db"))
+
+    assert reopened.get_collection("docs")._snapshot.codes.shape == (200, 64)
+    assert codes_path.read_bytes() == expected
+
+def test_scalar_scans_use_stored_norms_in_bounded_blocks(tmp_path, clustered_vectors, monkeypatch):
+    """Test that scalar codes keep their squared norms as rows are added and are scanned in capped blocks."""
+    monkeypatch.setattr("stores.vectordb.providers.ExactSearchProvider.QUANTIZED_BLOCK_ROWS", 256)
+    provider = ExactSearchProvider(path=str(tmp_path / "db"), quantization="scalar", calibration_rows=500, rescore_factor=0)
+    add(provider, clustered_vectors[:600])
+    add(provider, clustered_vectors[600:], start=600)
+
+    collection = provider.get_collection("docs")
+    snapshot = collection._snapshot
+    np.testing.assert_allclose(snapshot.code_norms, collection.quantizer.code_norms(snapshot.codes), rtol=1e-5)
+
+    block_rows = []
+    distances = collection.quantizer.distances
+    monkeypatch.setattr(collection.quantizer, "distances",
+                        lambda queries, codes, code_norms=None: block_rows.append(len(code_norms)) or distances(queries, codes, code_norms))
+    results = provider.query_embeddings(clustered_vectors[:1], n_results=1, collection_name="docs")
+
+    assert max(block_rows) == 256 and sum(block_rows) == 2000
+    assert results["ids"][0] == ["id-0"]
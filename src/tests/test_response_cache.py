@@ -0,0 +1,142 @@
+import asyncio
+from controllers.NLPController import NLPController, format_generation_query
+from stores.llm.ResponseCache import ResponseCache, response_cache_key
+from helpers.config import reload_settings
+from helpers.token_counter import count_tokens
+
+class FakeClock:
+    """Clock advanced by hand to test expiry."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingLLM:
+    """LLM client that numbers its responses and records every prompt."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_response(self, prompt):
+        self.prompts.append(prompt)
+        return f"answer {len(self.prompts)}"
+
+class KeywordEmbeddingClient:
+    """Embeds a question as counts of a few keywords, so paraphrases land close together."""
+    keywords = ("refund", "policy", "shipping", "days")
+
+    def generate_embedding(self, texts):
+        return [[float(text.lower().count(keyword)) for keyword in self.keywords] for text in texts]
+
+def key(question, docs=("doc a", "doc b"), model_id="model-a"):
+    return response_cache_key("ollama", model_id, "http://localhost:11434/api/chat", "Be brief.", list(docs), question)
+
+def test_exact_hits_ignore_whitespace():
+    """Test that the same question over the same passages hits, whatever the spacing."""
+    cache = ResponseCache()
+    cache.put(key("What is the refund policy?"), "30 days")
+
+    assert cache.get(key("  What is the  refund policy? ")) == "30 days"
+    assert cache.get(key("What is the refund policy?", docs=("doc a ", "doc b"))) == "30 days"
+    assert cache.stats()["exact_hits"] == 2
+
+def test_passage_order_is_part_of_the_key():
+    """Test that the same passages in another prompt order miss, as the prompt differs."""
+    cache = ResponseCache()
+    cache.put(key("What is the refund policy?"), "30 days")
+
+    assert cache.get(key("What is the refund policy?", docs=("doc b", "doc a"))) is None
+
+def test_other_context_or_configuration_misses():
+    """Test that other documents, models or questions never share a cached response."""
+    cache = ResponseCache()
+    cache.put(key("What is the refund policy?"), "30 days")
+
+    assert cache.get(key("What is the refund policy?", docs=("doc a",))) is None
+    assert cache.get(key("What is the refund policy?", model_id="model-b")) is None
+    assert cache.get(key("What is the shipping policy?")) is None
+    assert cache.stats()["misses"] == 3
+
+def test_near_duplicate_questions_hit_within_the_threshold():
+    """Test that a question embedded close to a cached one hits only above the similarity threshold."""
+    cache = ResponseCache(similarity_threshold=0.95)
+    cache.put(key("refund policy?"), "30 days", embedding=[1.0, 1.0, 0.0])
+
+    assert cache.get(key("what's the refund policy"), embedding=[1.0, 1.05, 0.0]) == "30 days"
+    assert cache.get(key("refund policy for shipping"), embedding=[1.0, 1.0, 1.0]) is None
+    assert cache.get(key("what's the refund policy", docs=("doc c",)), embedding=[1.0, 1.05, 0.0]) is None
+    assert cache.stats()["similar_hits"] == 1
+
+def test_entries_expire_after_the_ttl():
+    """Test that an entry is served until its TTL passes and dropped afterwards."""
+    clock = FakeClock()
+    cache = ResponseCache(ttl_seconds=60, clock=clock)
+    cache.put(key("refund policy?"), "30 days", embedding=[1.0, 0.0])
+
+    clock.now = 59
+    assert cache.get(key("refund policy?")) == "30 days"
+    clock.now = 61
+    assert cache.get(key("refund policy?"), embedding=[1.0, 0.0]) is None
+    assert cache.stats()["expirations"] == 1
+    assert cache.stats()["items"] == 0
+
+def test_least_recently_used_entries_are_evicted():
+    """Test that the cache stays within max_items by evicting the least recently used entry."""
+    cache = ResponseCache(max_items=2)
+    cache.put(key("one"), "1")
+    cache.put(key("two"), "2")
+    cache.get(key("one"))
+    cache.put(key("three"), "3")
+
+    assert cache.get(key("two")) is None
+    assert cache.get(key("one")) == "1"
+    assert cache.get(key("three")) == "3"
+    assert cache.stats()["evictions"] == 1
+
+def test_generate_response_calls_the_llm_once_for_paraphrases(app_settings_env):
+    """Test that the controller answers repeated and paraphrased questions from the cache."""
+    controller, llm = NLPController(), CountingLLM()
+
+    async def ask(question):
+        query = await controller.create_generation_query(question=question, docs=["doc a"])
+        return await controller.generate_response(llm, query, cache_key=key(question, docs=("doc a",)),
+                                                  embedding_client=KeywordEmbeddingClient())
+
+    answers = [asyncio.run(ask(question)) for question in
+               ["What is the refund policy?", "What is the refund policy?", "Refund policy - what is it?",
+                "How many days does shipping take?"]]
+
+    assert answers == ["answer 1", "answer 1", "answer 1", "answer 2"]
+    assert len(llm.prompts) == 2
+
+def test_generate_response_skips_a_disabled_cache(app_settings_env, monkeypatch):
+    """Test that with RESPONSE_CACHE_ENABLED off every call reaches the LLM."""
+    monkeypatch.setenv("RESPONSE_CACHE_ENABLED", "false")
+    reload_settings()
+    controller, llm = NLPController(), CountingLLM()
+
+    for _ in range(2):
+        asyncio.run(controller.generate_response(llm, "prompt", cache_key=key("question")))
+
+    assert len(llm.prompts) == 2
+
+def test_score_orderings_selecting_other_contexts_miss(app_settings_env, monkeypatch):
+    """Test that documents scored so that another passage fits the budget never share a response."""
+    monkeypatch.setenv("GENERATION_CONTEXT_TOKEN_BUDGET", str(count_tokens("alpha beta gamma")))
+    reload_settings()
+    controller, llm = NLPController(), CountingLLM()
+    docs = ["alpha beta gamma", "delta epsilon zeta"]
+
+    async def ask(scores):
+        passages = controller.select_generation_context(docs, scores=scores)
+        cache_key = response_cache_key("ollama", "model-a", None, None, passages, "Which letters?")
+        return await controller.generate_response(llm, format_generation_query("Which letters?", passages),
+                                                  cache_key=cache_key)
+
+    answers = [asyncio.run(ask(scores)) for scores in ([0.9, 0.1], [0.1, 0.9], [0.9, 0.1])]
+
+    assert answers == ["answer 1", "answer 2", "answer 1"]
+    assert llm.prompts == ["Question: Which letters?\nContext: alpha beta gamma\nAnswer:",
+                           "Question: Which letters?\nContext: delta epsilon zeta\nAnswer:"]
@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+import pytest
+from helpers.config import get_settings, reload_settings
+from helpers.startup import StartupReport
+
+HEAVY_MODULES = ("torch", "transformers", "sentence_transformers", "sklearn", "plotly", "pandas", "chromadb",
+                 "nltk", "openai")
+
+def test_settings_are_read_once_until_reloaded(app_settings_env, monkeypatch):
+    """Test that get_settings returns one cached object, and reload_settings picks up environment changes."""
+    settings = get_settings()
+    monkeypatch.setenv("APP_VERSION", "0.2")
+
+    assert get_settings() is settings
+    assert get_settings().APP_VERSION == "0.1"
+    assert reload_settings().APP_VERSION == "0.2"
+    assert get_settings() is not settings
+
+def test_startup_report_times_steps_in_order():
+    """Test that every step is recorded in the order it ran, failing steps included."""
+    report = StartupReport()
+    report.record("imports", 0.25)
+    with report.step("settings"):
+        pass
+    with pytest.raises(RuntimeError):
+        with report.step("vectordb"):
+            raise RuntimeError("unreachable")
+
+    assert list(report.steps) == ["imports", "settings", "vectordb"]
+    assert report.total_seconds >= 0.25
+    assert "imports" in report.format() and "250.0 ms" in report.format()
+
+def test_importing_the_app_skips_heavy_libraries():
+    """Test that importing main loads none of the ML, plotting, vector store or SDK libraries."""
+    src_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import sys, main; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+
+    result = subprocess.run([sys.executable, "-c", code], cwd=src_dir, capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == ""
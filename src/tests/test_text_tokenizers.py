@@ -0,0 +1,84 @@
+import asyncio
+import nltk
+import pytest
+from controllers.ChunkController import get_chunk_controller
+from helpers import text_tokenizers
+from helpers.config import reload_settings
+from helpers.text_tokenizers import ensure_nltk_resources, get_sentence_tokenizer
+
+@pytest.fixture
+def nltk_lookups(app_settings_env, monkeypatch):
+    """Fixture to count NLTK data lookups and downloads, with punkt_tab missing and downloads failing."""
+    calls = {"find": 0, "download": 0}
+
+    def find(resource):
+        calls["find"] += 1
+        raise LookupError(resource)
+
+    def download(*args, **kwargs):
+        calls["download"] += 1
+        return False
+
+    monkeypatch.setattr(nltk.data, "find", find)
+    monkeypatch.setattr(nltk, "download", download)
+    ensure_nltk_resources.cache_clear()
+    get_sentence_tokenizer.cache_clear()
+    yield calls
+    ensure_nltk_resources.cache_clear()
+    get_sentence_tokenizer.cache_clear()
+
+def test_resources_are_resolved_once(nltk_lookups):
+    """Test that a missing resource is looked up and downloaded once per process, not per controller or request."""
+    for _ in range(3):
+        get_chunk_controller()
+        assert ensure_nltk_resources() is False
+
+    assert nltk_lookups == {"find": 1, "download": 1}
+
+def test_offline_mode_never_downloads(nltk_lookups, monkeypatch):
+    """Test that with NLTK_OFFLINE a missing resource fails sentence chunking with a clear error and no download."""
+    monkeypatch.setenv("NLTK_OFFLINE", "true")
+    reload_settings()
+
+    with pytest.raises(LookupError, match="punkt_tab"):
+        asyncio.run(get_chunk_controller().chunk_text("One. Two.", chunk_size=5, method="sentence"))
+
+    assert nltk_lookups["download"] == 0
+
+def test_chunk_controller_is_shared(app_settings_env):
+    """Test that requests share one ChunkController."""
+    assert get_chunk_controller() is get_chunk_controller()
+
+def test_tokenizers_match_nltk(app_settings_env):
+    """Test that the cached tokenizers split text exactly like nltk.sent_tokenize and nltk.word_tokenize."""
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+    except LookupError:
+        pytest.skip("punkt_tab is not installed")
+    text = "Dr. Smith arrived at 5 p.m. He didn't stay long! Was it \"urgent\"? Nobody knew."
+
+    assert text_tokenizers.sent_tokenize(text) == nltk.sent_tokenize(text)
+    assert text_tokenizers.word_tokenize(text) == nltk.word_tokenize(text)
+
+def test_resources_installed_after_a_failure_are_picked_up(nltk_lookups, monkeypatch):
+    """Test that a failed lookup is not remembered, so sentence chunking works once the data is installed."""
+    with pytest.raises(LookupError, match="punkt_tab"):
+        get_sentence_tokenizer()
+
+    monkeypatch.setattr(nltk.data, "find", lambda resource: resource)
+    monkeypatch.setattr(nltk.tokenize, "PunktTokenizer", lambda language: f"punkt {language}")
+
+    assert get_sentence_tokenizer() == "punkt english"
+    assert nltk_lookups["download"] == 1
+
+def test_failed_downloads_are_retried_after_a_cooldown(nltk_lookups, monkeypatch):
+    """Test that after a failure requests only repeat the local lookup, until the retry cooldown has passed."""
+    for _ in range(3):
+        with pytest.raises(LookupError, match="punkt_tab"):
+            get_sentence_tokenizer()
+    assert nltk_lookups == {"find": 4, "download": 1}
+
+    monkeypatch.setattr(text_tokenizers, "DOWNLOAD_RETRY_SECONDS", 0.0)
+    with pytest.raises(LookupError, match="punkt_tab"):
+        get_sentence_tokenizer()
+    assert nltk_lookups["download"] == 2